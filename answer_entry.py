@@ -0,0 +1,171 @@
+"""표(st.data_editor) 한 개로 입력하는 정답/답안: 초기 표 구성, 답 문자열 해석, 한 번에 검증"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from grading import ACCEPTED_SEPARATOR, accepted_answers, normalize_choice
+from subjects import short_answer_questions
+
+# 오지선다 선택지 범위
+MIN_CHOICE = 1
+MAX_CHOICE = 5
+# 단답형 정답의 최댓값 (단답형 문항번호는 subjects.short_answer_questions)
+MAX_SHORT_ANSWER = 999
+# 답 문자열에서 빈 문항을 나타내는 문자
+BLANK_MARKS = {'-', '.', '_', '?'}
+# 배점 범위 (기존 입력 화면과 같음)
+MAX_POINT = 5
+
+
+# 입력 표의 답 열에 둘 최댓값 (단답형 문항이 하나라도 있으면 단답형 최댓값)
+def max_answer(exam_round, subject):
+    return MAX_SHORT_ANSWER if short_answer_questions(exam_round, subject) else MAX_CHOICE
+
+
+# 답 열 도움말: 단답형 문항번호 안내 (없으면 None)
+def short_answer_help(exam_round, subject):
+    questions = short_answer_questions(exam_round, subject)
+    if not questions:
+        return None
+    return f"{', '.join(map(str, questions))}번은 단답형({MIN_CHOICE}~{MAX_SHORT_ANSWER}), 나머지는 {MIN_CHOICE}~{MAX_CHOICE}"
+
+
+# 표의 행별 답 범위 검사: 객관식 문항과 단답형 문항을 나누어 오류 메시지 목록 반환
+def _invalid_answers(grid, column, label, exam_round, subject):
+    short_answer = grid['문항번호'].isin(short_answer_questions(exam_round, subject)).to_numpy()
+    max_values = np.where(short_answer, MAX_SHORT_ANSWER, MAX_CHOICE)
+    invalid = set(invalid_questions(grid, column, max_values))
+    errors = []
+    for is_short, max_value, kind in [(False, MAX_CHOICE, ""), (True, MAX_SHORT_ANSWER, "단답형 ")]:
+        questions = [q for q, s in zip(grid['문항번호'], short_answer) if s == is_short and q in invalid]
+        if questions:
+            errors.append(_invalid_message(f"{kind}{label}", questions, max_value))
+    return errors
+
+
+# 저장된 행을 문항번호 기준으로 정리 (같은 문항이 여러 번 있으면 마지막 값)
+def _by_question(rows):
+    rows = rows.assign(문항번호=pd.to_numeric(rows['문항번호'], errors='coerce')).dropna(subset=['문항번호'])
+    rows = rows.assign(문항번호=rows['문항번호'].astype(int))
+    return rows.drop_duplicates('문항번호', keep='last').set_index('문항번호')
+
+
+# 교사 정답 입력 표: 기존 정답(없으면 빈 칸), 복수정답(대표 정답 외에 인정하는 답), 배점(없으면 기본 배점)
+def answer_key_grid(existing_answers, num_questions, default_point):
+    question_numbers = np.arange(1, num_questions + 1)
+    existing = _by_question(existing_answers)
+    accepted = existing['정답'].map(accepted_answers).reindex(question_numbers)
+    return pd.DataFrame({
+        '문항번호': question_numbers,
+        '정답': pd.array([a[0] if isinstance(a, tuple) and a else None for a in accepted], dtype='Int64'),
+        '복수정답': [ACCEPTED_SEPARATOR.join(map(str, a[1:])) if isinstance(a, tuple) else '' for a in accepted],
+        '배점': pd.to_numeric(existing['배점'], errors='coerce').reindex(question_numbers)
+                  .fillna(default_point).astype(int).to_numpy(),
+    })
+
+
+# 학생 답안 입력 표: 기존 답안 (숫자가 아닌 예전 답은 빈 칸)
+def response_grid(existing_responses, num_questions):
+    question_numbers = np.arange(1, num_questions + 1)
+    existing = _by_question(existing_responses)
+    return pd.DataFrame({
+        '문항번호': question_numbers,
+        '입력답': normalize_choice(existing['입력답']).reindex(question_numbers).astype('Int64').to_numpy(),
+    })
+
+
+# "31425..." 처럼 붙여 쓴 문자열이나 쉼표/공백으로 구분한 문자열을 문항별 답 목록으로 변환 (빈 문항은 None)
+def parse_answer_string(text, num_questions):
+    text = text.strip()
+    if re.search(r'[\s,]', text):
+        tokens = [token for token in re.split(r'[\s,]+', text) if token]
+    else:
+        tokens = list(text)
+    if len(tokens) != num_questions:
+        raise ValueError(f"{num_questions}문항의 답이 필요합니다. (입력: {len(tokens)}개)")
+    return [None if token in BLANK_MARKS else token for token in tokens]
+
+
+# 빈 칸이 아니면서 1 ~ max_value 사이의 정수가 아닌 문항번호 목록
+def invalid_questions(grid, column, max_value, min_value=MIN_CHOICE):
+    values = grid[column]
+    filled = values.notna() & (values.astype(str).str.strip() != '')
+    numbers = pd.to_numeric(values, errors='coerce').astype(float)
+    invalid = filled & (numbers.isna() | (numbers % 1 != 0) | (numbers < min_value) | (numbers > max_value))
+    return grid.loc[invalid, '문항번호'].tolist()
+
+
+def _invalid_message(label, questions, max_value, min_value=MIN_CHOICE):
+    return f"{label}은 {min_value}~{max_value} 사이의 정수여야 합니다: {', '.join(map(str, questions))}번"
+
+
+# 복수정답 칸의 답 목록 ("/", 쉼표, 공백으로 구분)
+def _alternatives(text):
+    if text is None or (not isinstance(text, str) and pd.isna(text)):
+        return []
+    return [token for token in re.split(r'[/,\s]+', str(text).strip()) if token]
+
+
+# 복수정답은 정답을 입력한 문항에만, 정답과 같은 범위의 정수로
+def _invalid_alternatives(grid, exam_round, subject):
+    if '복수정답' not in grid.columns:
+        return []
+    short_answer = set(short_answer_questions(exam_round, subject))
+    invalid = []
+    for q_num, answer, text in zip(grid['문항번호'], grid['정답'], grid['복수정답']):
+        tokens = _alternatives(text)
+        max_value = MAX_SHORT_ANSWER if q_num in short_answer else MAX_CHOICE
+        if tokens and (pd.isna(answer) or not all(t.isdigit() and MIN_CHOICE <= int(t) <= max_value for t in tokens)):
+            invalid.append(q_num)
+    if not invalid:
+        return []
+    return [f"복수정답은 정답이 있는 문항에만 정답과 같은 범위의 정수를 {ACCEPTED_SEPARATOR} 로 구분해 입력해야 합니다: "
+            f"{', '.join(map(str, invalid))}번"]
+
+
+# 정답(1~5, 단답형 문항은 1~999), 복수정답, 배점(0~5)과 배점 총합을 한 번에 검사하여 오류 메시지 목록 반환
+def validate_answer_key(grid, exam_round, subject, max_score):
+    errors = _invalid_answers(grid, '정답', "정답", exam_round, subject)
+    errors += _invalid_alternatives(grid, exam_round, subject)
+    invalid = invalid_questions(grid, '배점', MAX_POINT, min_value=0) + grid.loc[grid['배점'].isna(), '문항번호'].tolist()
+    if invalid:
+        errors.append(_invalid_message("배점", sorted(invalid), MAX_POINT, min_value=0))
+    total_points = point_total(grid)
+    if abs(total_points - max_score) > 0.1:  # 부동소수점 오차 고려
+        errors.append(f"배점의 총합이 {max_score}점이 되어야 합니다. (현재: {total_points:.1f}점)")
+    return errors
+
+
+def validate_responses(grid, exam_round, subject):
+    return _invalid_answers(grid, '입력답', "답", exam_round, subject)
+
+
+def point_total(grid):
+    return float(pd.to_numeric(grid['배점'], errors='coerce').fillna(0).sum())
+
+
+# 표의 값을 문항별 문자열로 변환 (빈 칸은 "", 소수점 제거)
+def _as_strings(values):
+    numbers = pd.to_numeric(values, errors='coerce').astype(float)
+    return ['' if np.isnan(number) else str(int(number)) for number in numbers]
+
+
+# 검증한 정답 표를 answers 테이블 행으로 변환 (복수정답이 있으면 "대표 정답/추가 정답" 형식)
+def answer_key_rows(grid, exam_round, subject):
+    answers = _as_strings(grid['정답'])
+    if '복수정답' in grid.columns:
+        answers = [ACCEPTED_SEPARATOR.join(dict.fromkeys([answer] + [str(int(t)) for t in _alternatives(text)]))
+                   if answer else answer for answer, text in zip(answers, grid['복수정답'])]
+    return pd.DataFrame({
+        '회차': exam_round,
+        '과목': subject,
+        '문항번호': grid['문항번호'].astype(int).to_numpy(),
+        '정답': answers,
+        '배점': pd.to_numeric(grid['배점']).astype(int).to_numpy(),
+    })
+
+
+# 검증한 답안 표를 문항 순서대로의 답 목록으로 변환 (빈 문항은 "")
+def response_answers(grid):
+    return _as_strings(grid['입력답'])
@@ -0,0 +1,116 @@
+"""정답 버전 관리: 정답을 저장할 때마다 바뀐 문항만 answer_history 테이블에 한 버전으로 기록
+
+    버전 1   처음 저장한 정답 (모든 문항이 바뀐 문항). 이력이 생기기 전부터 있던 정답은 다음 저장 때 버전 1로 먼저 남김
+    버전 n   이전 정답과 인정하는 답(복수 정답 포함)이나 배점이 다른 문항만, 이전 값과 함께
+answers 테이블은 항상 최신 정답이고, 예전 버전의 정답은 이력을 차례로 적용해 다시 만든다(answer_key_at).
+정답 비교는 채점과 같은 규칙(인정하는 답의 집합, int(float()) 정규화)이므로 "3" 과 "3.0", "2/4" 와 "4/2" 는 같은 정답이다.
+"""
+import datetime
+
+import pandas as pd
+
+from grading import ACCEPTED_SEPARATOR, accepted_answers
+from storage import TABLES
+
+CHANGE_COLUMNS = ['문항번호', '이전 정답', '이전 배점', '정답', '배점']
+
+
+# 정답 행을 문항번호 기준으로 정리한 {문항번호: (정답, 배점)} (같은 문항이 여러 번 있으면 채점과 같이 마지막 값)
+def _by_question(rows):
+    q_nums = pd.to_numeric(rows['문항번호'], errors='coerce')
+    return {int(q_num): (answer, points)
+            for q_num, answer, points in zip(q_nums, rows['정답'], rows['배점']) if pd.notna(q_num)}
+
+
+# 배점 값 (빈 값이나 숫자가 아니면 0)
+def point_value(value):
+    value = pd.to_numeric(value, errors='coerce')
+    return 0.0 if pd.isna(value) else float(value)
+
+
+# 이력에 남길 정답 문자열 ("3", "2/4", 정답이 없으면 None)
+def _answer_text(value):
+    answers = accepted_answers(value)
+    return ACCEPTED_SEPARATOR.join(map(str, answers)) if answers else None
+
+
+# 이전 정답과 새 정답에서 채점 결과가 달라질 수 있는 문항 (인정하는 답의 집합이나 배점이 다름, 문항 추가/삭제)
+# CHANGE_COLUMNS 형식, 없어진 문항은 정답/배점이 빈 값
+def answer_key_changes(previous, rows):
+    previous = _by_question(previous)
+    rows = _by_question(pd.DataFrame(rows, columns=TABLES['answers']))
+    changes = []
+    for q_num in sorted(set(previous) | set(rows)):
+        before, after = previous.get(q_num), rows.get(q_num)
+        if before is not None and after is not None \
+                and set(accepted_answers(before[0])) == set(accepted_answers(after[0])) \
+                and point_value(before[1]) == point_value(after[1]):
+            continue
+        changes.append((
+            q_num,
+            _answer_text(before[0]) if before is not None else None,
+            before[1] if before is not None else None,
+            _answer_text(after[0]) if after is not None else None,
+            after[1] if after is not None else None,
+        ))
+    return pd.DataFrame(changes, columns=CHANGE_COLUMNS)
+
+
+# 바뀐 문항을 새 버전으로 기록하고 버전 번호 반환. 이력이 없는데 이전 정답이 있으면 그 정답을 먼저 버전 1로 남김
+def record_version(storage, exam_round, subject, previous, changes):
+    partition = {'회차': exam_round, '과목': subject}
+    history = storage.read('answer_history', where=partition)
+    version = int(pd.to_numeric(history['버전']).max()) if not history.empty else 0
+    saved_at = datetime.datetime.now().isoformat(timespec='seconds')
+    versions = []
+    if version == 0 and not previous.empty:
+        versions.append(answer_key_changes(previous.iloc[0:0], previous))
+    versions.append(changes)
+    replacements = []
+    for rows in versions:
+        version += 1
+        replacements.append(({**partition, '버전': version},
+                             rows.assign(회차=exam_round, 과목=subject, 버전=version, **{'저장 시각': saved_at})))
+    storage.replace_many('answer_history', replacements)
+    return version
+
+
+# (회차, 과목)의 버전 목록: 버전, 저장 시각, 바뀐 문항 수, 바뀐 문항
+def answer_versions(storage, exam_round, subject):
+    history = storage.read('answer_history', where={'회차': exam_round, '과목': subject})
+    columns = ['버전', '저장 시각', '바뀐 문항 수', '바뀐 문항']
+    if history.empty:
+        return pd.DataFrame(columns=columns)
+    history = history.assign(버전=pd.to_numeric(history['버전']).astype(int),
+                             문항번호=pd.to_numeric(history['문항번호']).astype(int))
+    grouped = history.sort_values(['버전', '문항번호']).groupby('버전', sort=True)
+    return pd.DataFrame({
+        '버전': list(grouped.groups),
+        '저장 시각': grouped['저장 시각'].first().astype(str).to_numpy(),
+        '바뀐 문항 수': grouped.size().to_numpy(),
+        '바뀐 문항': grouped['문항번호'].agg(lambda q: ', '.join(map(str, q))).to_numpy(),
+    }, columns=columns)
+
+
+# 한 버전에서 바뀐 문항 (CHANGE_COLUMNS 형식). CSV 에서 숫자로 읽힌 정답도 "3", "2/4" 형식으로 표시
+def version_changes(storage, exam_round, subject, version):
+    rows = storage.read('answer_history', where={'회차': exam_round, '과목': subject, '버전': version})
+    rows = rows.assign(**{column: rows[column].map(_answer_text) for column in ['이전 정답', '정답']})
+    return rows[CHANGE_COLUMNS].sort_values('문항번호', ignore_index=True)
+
+
+# version 까지의 변경을 차례로 적용한 정답 (answers 테이블 형식)
+def answer_key_at(storage, exam_round, subject, version):
+    history = storage.read('answer_history', where={'회차': exam_round, '과목': subject})
+    history = history[pd.to_numeric(history['버전']) <= version]
+    history = history.assign(버전=pd.to_numeric(history['버전'])).sort_values('버전', kind='stable')
+    # 문항마다 마지막으로 바뀐 값이 그 버전의 정답 (정답과 배점이 모두 비어 있으면 없어진 문항)
+    latest = history.drop_duplicates('문항번호', keep='last')
+    latest = latest[latest['정답'].notna() | latest['배점'].notna()]
+    return pd.DataFrame({
+        '회차': exam_round,
+        '과목': subject,
+        '문항번호': pd.to_numeric(latest['문항번호']).astype(int).to_numpy(),
+        '정답': latest['정답'].map(_answer_text).to_numpy(),
+        '배점': latest['배점'].to_numpy(),
+    }, columns=TABLES['answers']).sort_values('문항번호', ignore_index=True)
@@ -1,13 +1,31 @@
 import streamlit as st
 import pandas as pd
 import os
-import plotly.express as px
-import plotly.graph_objects as go
-import streamlit_authenticator as stauth
+import tempfile
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from dotenv import load_dotenv
-import yaml
-from yaml.loader import SafeLoader
-import bcrypt
+import instrumentation
+from storage import SqliteStorage, get_storage
+from grading import get_compiled_key, grade_submission, NO_ANSWER
+from response_matrix import CHOICES
+from answer_entry import (answer_key_grid, response_grid, parse_answer_string, validate_answer_key,
+                          validate_responses, answer_key_rows, response_answers, point_total, max_answer,
+                          short_answer_help)
+from submission_queue import get_submission_queue
+from item_analysis import item_analysis, choice_heatmap_frame
+from student_history import student_history, repeated_wrong
+from score_index import (standing as score_standing, standings as score_standings,
+                         distribution as score_distribution, check_index, invalidate_index)
+from correctness_table import (FORMATS as EXPORT_FORMATS, export as export_correctness_table, round_subjects,
+                               student_names, xlsx_available)
+from subjects import ROUNDS, CORE_SUBJECTS, SUBJECTS, ELECTIVE_SUBJECTS, SCHEMA_VERSION, subject_spec
+from credentials import (load_config, make_authenticator, add_accounts, read_roster, validate_roster,
+                         roster_accounts, ROSTER_COLUMNS)
+from answer_versions import answer_versions, version_changes, answer_key_at
+from partitions import (ROLE_LABELS, account_role, account_partitions, account_fields, all_partitions,
+                        invalid_accounts, partition_label, rollup)
+from summary import (ensure_built, record_answer_key, student_results,
+                     question_accuracy, summary_statistics, check_consistency, rebuild)
 
 # 환경 변수 로드
 load_dotenv()
@@ -19,45 +37,52 @@ st.set_page_config(
     layout="wide"
 )
 
-# 데이터 디렉토리 생성
-if not os.path.exists('data'):
-    os.makedirs('data')
+# 답안 저장 완료를 기다리는 최대 시간(초). 넘으면 접수 안내만 표시 (저장은 계속 진행됨)
+SUBMISSION_TIMEOUT_SECONDS = 30
 
-# 인증 설정
-def load_config():
-    if os.path.exists('config.yaml'):
-        with open('config.yaml') as file:
-            return yaml.load(file, Loader=SafeLoader)
-    return {
-        'credentials': {
-            'usernames': {
-                'admin': {
-                    'email': 'admin@example.com',
-                    'name': '관리자',
-                    'password': 'admin123'
-                }
-            }
-        },
-        'cookie': {
-            'expiry_days': 30,
-            'key': 'yeonhap_test_key_123',
-            'name': 'yeonhap_test_cookie'
-        }
-    }
+# 재실행 구간 계측 시작 (관리자 "시스템 설정"에서 켜고 끔, 꺼져 있으면 기록하지 않음)
+instrumentation.begin_rerun()
 
-config = load_config()
+# 인증 설정 (프로세스마다 한 번 읽어 config.yaml 이 바뀔 때까지 재사용, 비밀번호는 bcrypt 해시로만 보관)
+with instrumentation.stage('config'):
+    config = load_config()
 
-# 설정 파일 저장
-def save_config():
-    with open('config.yaml', 'w') as file:
-        yaml.dump(config, file, allow_unicode=True)
+# 정답 변경 이력의 "되돌리기" 버튼 콜백: 화면을 그리기 전에 실행되므로 이력 표에 새 버전이 바로 보임
+def restore_answer_version(partition, exam_round, subject, version):
+    storage = get_storage(partition)
+    regrade = record_answer_key(storage, exam_round, subject, answer_key_at(storage, exam_round, subject, version))
+    st.session_state['answer_restore_message'] = (f"버전 {version}의 정답으로 되돌렸습니다. "
+                                                  f"학생 {regrade.students}명의 점수가 바뀌었습니다.")
 
-authenticator = stauth.Authenticate(
-    config['credentials'],
-    config['cookie']['name'],
-    config['cookie']['key'],
-    config['cookie']['expiry_days']
-)
+# 통계 분석 화면의 집계와 차트 생성 (storage.derived 로 score_summary 가 바뀔 때까지 재사용)
+def build_statistics_view(summary_df):
+    # plotly 는 불러오는 데 0.5초 이상 걸리므로 모듈 맨 위가 아니라 차트를 그리는 화면에서 처음 필요할 때 불러옴
+    # (학생 로그인부터 답안 입력 화면까지는 불러오지 않음)
+    import plotly.express as px
+    
+    with instrumentation.stage('statistics', 'summary') as s:
+        statistics = summary_statistics(summary_df)
+        s.record(rows=len(summary_df))
+    
+    figures = {}
+    with instrumentation.stage('chart', 'statistics'):
+        if not statistics['subject'].empty:
+            figures['subject'] = px.bar(statistics['subject'], x='과목', y='평균정답률',
+                                        title='과목별 평균 정답률',
+                                        labels={'과목': '과목', '평균정답률': '평균 정답률 (%)'})
+        if not statistics['round'].empty:
+            figures['round'] = px.line(statistics['round'], x='회차', y='평균정답률',
+                                       title='회차별 평균 정답률 추이',
+                                       labels={'회차': '회차', '평균정답률': '평균 정답률 (%)'})
+        if not statistics['subject_round'].empty:
+            figures['subject_round'] = px.line(statistics['subject_round'], x='회차', y='평균정답률', color='과목',
+                                               markers=True,
+                                               title='과목별 회차 추이',
+                                               labels={'회차': '회차', '평균정답률': '평균 정답률 (%)'})
+    return statistics, figures
+
+with instrumentation.stage('auth', 'setup'):
+    authenticator = make_authenticator(config)
 
 # 세션 상태 초기화
 if 'authentication_status' not in st.session_state:
@@ -69,7 +94,8 @@ if 'username' not in st.session_state:
 
 # 인증
 try:
-    name, authentication_status, username = authenticator.login(fields=['username', 'password'])
+    with instrumentation.stage('auth', 'login'):
+        name, authentication_status, username = authenticator.login(fields=['username', 'password'])
     
     if authentication_status:
         st.success(f"환영합니다 {name}님!")
@@ -80,166 +106,214 @@ try:
         # 제목
         st.title(f"📝 모의고사 자가채점 시스템 - {name}님 환영합니다")
         
-        # 데이터 파일 경로
-        ANSWERS_FILE = "data/answers.csv"
-        RESPONSES_FILE = "data/responses.csv"
-        STUDENT_ANSWERS_FILE = "data/student_answers.csv"
-        STUDENT_SUBJECTS_FILE = "data/student_subjects.csv"  # 학생별 과목 선택 파일 추가
+        # 역할과 반 (config.yaml 계정 항목, 없으면 아이디 admin/teacher 는 그 역할이고 나머지는 학생)
+        account = config['credentials']['usernames'].get(username, {})
+        role = account_role(username, account)
+        instrumentation.set_role(role)
         
-        # 데이터 파일이 없으면 생성
-        def initialize_data_files():
-            if not os.path.exists(ANSWERS_FILE):
-                pd.DataFrame({
-                    '회차': [],
-                    '과목': [],
-                    '문항번호': [],
-                    '정답': [],
-                    '배점': []
-                }).to_csv(ANSWERS_FILE, index=False)
-            
-            if not os.path.exists(RESPONSES_FILE):
-                pd.DataFrame({
-                    '학생ID': [],
-                    '회차': [],
-                    '과목': [],
-                    '문항번호': [],
-                    '입력답': []
-                }).to_csv(RESPONSES_FILE, index=False)
-            
-            if not os.path.exists(STUDENT_ANSWERS_FILE):
-                pd.DataFrame({
-                    '학생ID': [],
-                    '회차': [],
-                    '과목': [],
-                    '문항번호': [],
-                    '정답': []
-                }).to_csv(STUDENT_ANSWERS_FILE, index=False)
-                
-            if not os.path.exists(STUDENT_SUBJECTS_FILE):
-                pd.DataFrame({
-                    '학생ID': [],
-                    '회차': [],
-                    '탐구1': [],
-                    '탐구2': []
-                }).to_csv(STUDENT_SUBJECTS_FILE, index=False)
-        
-        initialize_data_files()
+        # 데이터 저장소 (STORAGE_BACKEND 환경 변수로 csv/sqlite/parquet 선택, 데이터 파일이 없으면 생성)
+        # 학생은 자기 반, 교사는 선택한 담당 반, 관리자와 반이 없는 계정은 기본 분할의 저장소만 읽고 씀
+        try:
+            partitions = account_partitions(username, account)
+        except ValueError as e:
+            st.error(f"계정의 반 설정이 잘못되었습니다: {e} 관리자에게 문의해주세요.")
+            st.stop()
+        if role == 'teacher' and len(partitions) > 1:
+            labels = {partition_label(p): p for p in partitions}
+            partition = labels[st.sidebar.selectbox("반 선택", list(labels), key='teacher_class')]
+        else:
+            partition = partitions[0]
+        storage = get_storage(partition)
+        ensure_built(storage)  # 채점 결과 요약 테이블 (제출/정답 저장 시 증분 갱신)
         
         # 메인 컨텐츠
-        if username == 'admin':
+        if role == 'admin':
             st.header("관리자 설정")
             
+            # config.yaml 을 손으로 고쳐 반 형식이 잘못된 계정 (해당 계정의 반은 점검/통계에서 빠짐)
+            invalid = invalid_accounts(config)
+            if invalid:
+                st.warning("반 형식이 잘못된 계정이 있어 학교/반 점검과 통계에서 제외했습니다. config.yaml 을 고쳐주세요: "
+                           + "; ".join(f"{username} ({error})" for username, error in invalid.items()))
+            
             # 탭 생성
-            tab1, tab2 = st.tabs(["계정 관리", "시스템 설정"])
+            tab1, tab2, tab3 = st.tabs(["계정 관리", "시스템 설정", "학교/반 통계"])
             
-            with tab1:
+            with tab1, instrumentation.section("계정 관리"):
                 st.subheader("계정 추가")
                 new_username = st.text_input("아이디")
                 new_name = st.text_input("이름")
                 new_email = st.text_input("이메일")
                 new_password = st.text_input("비밀번호", type="password")
                 account_type = st.selectbox("계정 유형", ["교사", "학생"])
+                new_classes = st.text_input("반 (선택)", placeholder="예: 한빛고/3-1 (교사는 쉼표로 여러 반)",
+                                            help="비워 두면 기본 분할의 데이터를 사용합니다.")
                 
                 if st.button("계정 추가"):
                     if new_username and new_name and new_email and new_password:
-                        if new_username not in config['credentials']['usernames']:
-                            config['credentials']['usernames'][new_username] = {
-                                'email': new_email,
-                                'name': new_name,
-                                'password': new_password
-                            }
-                            save_config()
-                            st.success("계정이 추가되었습니다!")
+                        if new_username.strip().lower() not in config['credentials']['usernames']:
+                            try:
+                                fields = account_fields('teacher' if account_type == "교사" else 'student', new_classes)
+                            except ValueError as e:
+                                st.error(str(e))
+                            else:
+                                config = add_accounts([{'username': new_username, 'name': new_name,
+                                                        'email': new_email, 'password': new_password, **fields}])
+                                st.success("계정이 추가되었습니다!")
                         else:
                             st.error("이미 존재하는 아이디입니다.")
                     else:
                         st.error("모든 필드를 입력해주세요.")
                 
+                # 명단 일괄 등록 (비밀번호는 여러 프로세스에서 나누어 해시하고 설정 파일은 한 번만 씀)
+                st.subheader("명단 일괄 등록")
+                roster_file = st.file_uploader(f"명단 CSV ({', '.join(ROSTER_COLUMNS)} 열, 선택: 역할, 반)", type='csv')
+                if roster_file is not None and st.button("명단 등록"):
+                    roster = read_roster(roster_file)
+                    errors = validate_roster(roster, config['credentials']['usernames'])
+                    if errors:
+                        st.error("\n\n".join(errors))
+                    else:
+                        with st.spinner(f"계정 {len(roster)}개를 등록하는 중입니다..."):
+                            config = add_accounts(roster_accounts(roster))
+                        st.success(f"계정 {len(roster)}개가 추가되었습니다!")
+                
                 st.subheader("계정 목록")
                 accounts_df = pd.DataFrame([
                     {
                         '아이디': username,
                         '이름': info['name'],
-                        '이메일': info['email']
+                        '이메일': info['email'],
+                        '역할': ROLE_LABELS[account_role(username, info)],
+                        '반': (f"형식 오류: {invalid[username]}" if username in invalid
+                              else ", ".join(map(partition_label, account_partitions(username, info))))
                     }
                     for username, info in config['credentials']['usernames'].items()
                 ])
                 st.dataframe(accounts_df)
             
-            with tab2:
+            with tab2, instrumentation.section("시스템 설정"):
                 st.subheader("시스템 설정")
-                st.write("추가 설정 옵션은 여기에 구현될 예정입니다.")
+                
+                # 채점 결과 요약 테이블 점검 (모든 학교/반 분할)
+                st.write("채점 결과 요약 테이블")
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("요약 테이블 점검"):
+                        mismatches = {}
+                        for data_partition in all_partitions(config):
+                            counts = check_consistency(get_storage(data_partition))
+                            if sum(counts.values()):
+                                mismatches[partition_label(data_partition)] = counts
+                        if not mismatches:
+                            st.success("요약 테이블이 원본 응답과 일치합니다.")
+                        else:
+                            st.warning(f"불일치 행: {mismatches}")
+                with col2:
+                    if st.button("요약 테이블 재구성"):
+                        counts = {partition_label(data_partition): rebuild(get_storage(data_partition))
+                                  for data_partition in all_partitions(config)}
+                        st.success(f"요약 테이블을 다시 만들었습니다: {counts}")
+
+                # 점수 순위 색인 점검 (증분 갱신한 색인을 요약 테이블로 새로 만든 색인과 비교)
+                st.write("점수 순위 색인")
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("순위 색인 점검"):
+                        mismatches = {}
+                        for data_partition in all_partitions(config):
+                            partition_storage = get_storage(data_partition)
+                            summary_keys = partition_storage.read('score_summary')[['회차', '과목']].drop_duplicates()
+                            for exam_round, subject in summary_keys.itertuples(index=False):
+                                count = check_index(partition_storage, exam_round, subject)
+                                if count:
+                                    mismatches[f"{partition_label(data_partition)} {exam_round} {subject}"] = count
+                        if not mismatches:
+                            st.success("순위 색인이 요약 테이블과 일치합니다.")
+                        else:
+                            st.warning(f"순위가 다른 학생 수: {mismatches}")
+                with col2:
+                    if st.button("순위 색인 재구성"):
+                        invalidate_index()
+                        st.success("순위 색인을 비웠습니다. 다음 조회 때 요약 테이블에서 다시 만듭니다.")
+
+                # 시험 구성 (subjects 레지스트리, 서버를 다시 시작해야 schema.yaml 변경이 반영됨)
+                st.write(f"시험 구성 (버전 {SCHEMA_VERSION})")
+                schema_round = st.selectbox("회차", ROUNDS, key='schema_round')
+                schema_rows = [{'과목': s, '문항 수': spec['questions'], '만점': spec['max_score'],
+                                '단답형 문항': ", ".join(map(str, spec['short_answer']))}
+                               for s in SUBJECTS for spec in [subject_spec(schema_round, s)]]
+                st.dataframe(pd.DataFrame(schema_rows), hide_index=True)
+
+                # 재실행 구간 계측
+                st.write("성능 계측")
+                measuring = st.checkbox("재실행 구간 계측 사용", value=instrumentation.enabled,
+                                        help="모든 사용자의 재실행에서 구간별 시간, 처리 행 수, 읽은 바이트를 기록합니다.")
+                if measuring != instrumentation.enabled:
+                    instrumentation.set_enabled(measuring)
+
+                stage_summary_df = instrumentation.stage_summary()
+                if stage_summary_df.empty:
+                    st.info("아직 계측 기록이 없습니다.")
+                else:
+                    st.caption("구간별 시간 (안쪽 구간 포함, 읽은 바이트는 캐시 미스로 파일을 다시 읽은 크기)")
+                    st.dataframe(stage_summary_df, hide_index=True)
+                    st.caption("가장 느린 최근 재실행")
+                    st.dataframe(instrumentation.slowest_reruns(), hide_index=True)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.download_button("계측 기록 CSV 내려받기",
+                                           instrumentation.samples().to_csv(index=False).encode('utf-8-sig'),
+                                           file_name='instrumentation.csv', mime='text/csv')
+                    with col2:
+                        if st.button("계측 기록 지우기"):
+                            instrumentation.clear()
+                            st.rerun()
+            
+            with tab3, instrumentation.section("학교/반 통계"):
+                # 반마다 요약 테이블로 만든 (회차, 과목)별 합계를 더해 학교 전체 통계 계산 (바뀐 반만 다시 계산)
+                st.subheader("학교/반 통계")
+                with instrumentation.stage('statistics', 'rollup') as s:
+                    class_stats_df, school_stats_df = rollup(config)
+                    s.record(rows=len(class_stats_df))
+                if school_stats_df.empty:
+                    st.info("아직 채점 결과가 없습니다.")
+                else:
+                    columns = ['응시 인원', '평균', '표준편차', '평균정답률']
+                    rounding = {'평균': 1, '표준편차': 1, '평균정답률': 1}
+                    st.write("학교별")
+                    st.dataframe(school_stats_df[['학교', '회차', '과목'] + columns].round(rounding), hide_index=True)
+                    st.write("반별")
+                    st.dataframe(class_stats_df[['반', '회차', '과목'] + columns].round(rounding), hide_index=True)
         
-        elif username == 'teacher':
-            st.header("교사용 관리")
+        elif role == 'teacher':
+            st.header("교사용 관리" + (f" ({partition_label(partition)})" if partition else ""))
             
-            # 탭 생성
-            tab1, tab2, tab3, tab4 = st.tabs(["정답 입력", "채점 결과", "통계 분석", "학생 정답 확인"])
+            # 화면 선택: st.tabs 는 모든 탭 본문을 매번 실행하므로, 선택한 화면만 실행하도록 라디오 버튼 사용
+            teacher_section = st.radio("화면 선택", ["정답 입력", "채점 결과", "통계 분석", "학생 정답 확인", "정오표"],
+                                       horizontal=True, key='teacher_section', label_visibility='collapsed')
+            instrumentation.set_tab(teacher_section)
             
-            with tab1:
+            if teacher_section == "정답 입력":
                 # 정답 입력
                 st.subheader("정답 입력")
-                exam_round = st.selectbox("모의고사 회차를 선택하세요", ["1차", "2차", "3차", "4차"], key='teacher_round')
+                exam_round = st.selectbox("모의고사 회차를 선택하세요", ROUNDS, key='teacher_round')
                 subject = st.selectbox(
                     "과목을 선택하세요",
-                    ["국어", "수학", "영어", "한국사", 
-                     "물리학", "화학", "생명과학", "지구과학", 
-                     "생활과 윤리", "윤리와 사상", "한국지리", "세계지리",
-                     "동아시아사", "세계사", "경제", "정치와 법", "사회문화"],
+                    SUBJECTS,
                     key='teacher_subject'
                 )
                 
-                # 과목별 문항 수 설정
-                subject_questions = {
-                    "국어": 45,
-                    "수학": 30,
-                    "영어": 45,
-                    "한국사": 20,
-                    "물리학": 20,
-                    "화학": 20,
-                    "생명과학": 20,
-                    "지구과학": 20,
-                    "생활과 윤리": 20,
-                    "윤리와 사상": 20,
-                    "한국지리": 20,
-                    "세계지리": 20,
-                    "동아시아사": 20,
-                    "세계사": 20,
-                    "경제": 20,
-                    "정치와 법": 20,
-                    "사회문화": 20
-                }
-
-                # 과목별 만점 설정
-                subject_max_scores = {
-                    "국어": 100,
-                    "수학": 100,
-                    "영어": 100,
-                    "한국사": 50,
-                    "물리학": 50,
-                    "화학": 50,
-                    "생명과학": 50,
-                    "지구과학": 50,
-                    "생활과 윤리": 50,
-                    "윤리와 사상": 50,
-                    "한국지리": 50,
-                    "세계지리": 50,
-                    "동아시아사": 50,
-                    "세계사": 50,
-                    "경제": 50,
-                    "정치와 법": 50,
-                    "사회문화": 50
-                }
-                
-                num_questions = subject_questions[subject]
-                max_score = subject_max_scores[subject]
+                # 회차/과목별 문항 수와 만점 (시험 구성 레지스트리)
+                spec = subject_spec(exam_round, subject)
+                if spec is None:
+                    st.warning(f"{exam_round} 시험 구성에 '{subject}' 과목이 없습니다.")
+                    st.stop()
+                num_questions = spec['questions']
+                max_score = spec['max_score']
                 
                 # 기존 정답 불러오기
-                answers_df = pd.read_csv(ANSWERS_FILE)
-                existing_answers = answers_df[
-                    (answers_df['회차'] == exam_round) & 
-                    (answers_df['과목'] == subject)
-                ]
+                existing_answers = storage.read('answers', where={'회차': exam_round, '과목': subject})
                 
                 # 기본 배점 설정
                 default_point = st.number_input(
@@ -250,488 +324,454 @@ try:
                     step=1
                 )
                 
-                # 정답 입력 폼
+                # 정답 입력 표 (문항별 위젯 대신 표 한 개, 폼 제출 전에는 재실행하지 않음)
+                answer_grid = answer_key_grid(existing_answers, num_questions, default_point)
                 with st.form("answer_form"):
-                    st.write("문항별 정답과 배점을 입력하세요 (기본 배점과 다른 경우에만 수정)")
-                    answers = {}
-                    points = {}  # 배점 저장용 딕셔너리
-                    
-                    for i in range(1, num_questions + 1):
-                        col1, col2 = st.columns([3, 1])
-                        with col1:
-                            # 기존 정답이 있으면 표시
-                            existing_answer = ""
-                            if not existing_answers.empty:
-                                answer_row = existing_answers[existing_answers['문항번호'] == i]
-                                if not answer_row.empty:
-                                    existing_answer = str(int(answer_row['정답'].iloc[0]))  # 소수점 제거
-                            answers[i] = st.text_input(f"{i}번", value=existing_answer)
-                        with col2:
-                            # 기존 배점이 있으면 표시, 없으면 기본 배점 사용
-                            existing_point = default_point
-                            if not existing_answers.empty:
-                                point_row = existing_answers[existing_answers['문항번호'] == i]
-                                if not point_row.empty:
-                                    existing_point = int(point_row['배점'].iloc[0])  # 정수로 변환
-                            points[i] = st.number_input(
-                                f"{i}번 배점",
-                                min_value=0,
-                                max_value=5,
-                                value=int(existing_point),
-                                step=1
-                            )
+                    st.write("표에 문항별 정답과 배점을 입력하세요 (배점은 기본 배점과 다른 경우에만 수정, 스프레드시트에서 복사해 붙여넣을 수 있습니다). "
+                             "복수 정답은 복수정답 칸에 추가로 인정할 답을 적습니다.")
+                    answer_string = st.text_input(
+                        "정답 문자열 (선택)",
+                        placeholder="예: 3142513... (빈 문항은 -, 쉼표나 공백으로 구분해도 됩니다)",
+                        help="입력하면 표의 정답 대신 이 문자열을 사용합니다."
+                    )
+                    edited_grid = st.data_editor(
+                        answer_grid,
+                        column_config={
+                            '문항번호': st.column_config.NumberColumn("문항번호", disabled=True),
+                            '정답': st.column_config.NumberColumn("정답", min_value=1, max_value=max_answer(exam_round, subject), step=1,
+                                                                help=short_answer_help(exam_round, subject)),
+                            '복수정답': st.column_config.TextColumn("복수정답", help="정답 외에 함께 인정할 답 (예: 4 또는 2/4)"),
+                            '배점': st.column_config.NumberColumn("배점", min_value=0, max_value=5, step=1, required=True)
+                        },
+                        hide_index=True,
+                        use_container_width=True,
+                        key=f"answer_grid_{exam_round}_{subject}"
+                    )
                     
+                    # 여러 반을 담당하면 같은 정답을 담당 반 모두에 저장할 수 있음 (반마다 바뀐 문항만 다시 채점)
+                    save_all_classes = len(partitions) > 1 and st.checkbox("담당 반 모두에 같은 정답 저장",
+                                                                           key='answer_all_classes')
                     submitted = st.form_submit_button("정답 저장")
                     
                     if submitted:
-                        # 배점 총합 계산
-                        total_points = sum(points.values())
-                        if abs(total_points - max_score) > 0.1:  # 부동소수점 오차 고려
-                            st.error(f"배점의 총합이 {max_score}점이 되어야 합니다. (현재: {total_points:.1f}점)")
-                            st.stop()
+                        # 정답 문자열이 있으면 표의 정답 대신 사용
+                        if answer_string.strip():
+                            try:
+                                edited_grid = edited_grid.assign(정답=parse_answer_string(answer_string, num_questions))
+                            except ValueError as e:
+                                st.error(str(e))
+                                st.stop()
                         
-                        # 기존 정답 삭제
-                        answers_df = answers_df[
-                            ~((answers_df['회차'] == exam_round) & 
-                              (answers_df['과목'] == subject))
-                        ]
+                        # 정답 범위, 배점 범위, 배점 총합을 한 번에 검사
+                        errors = validate_answer_key(edited_grid, exam_round, subject, max_score)
+                        if errors:
+                            st.error("\n\n".join(errors))
+                            st.stop()
                         
-                        # 새로운 정답 추가
-                        for i in range(1, num_questions + 1):
-                            new_row = {
-                                '회차': exam_round,
-                                '과목': subject,
-                                '문항번호': i,
-                                '정답': str(int(float(answers[i]))) if answers[i] else "",  # 소수점 제거
-                                '배점': points[i]  # 배점 추가
-                            }
-                            answers_df = pd.concat([answers_df, pd.DataFrame([new_row])], ignore_index=True)
+                        # 새로운 정답을 한 번에 구성하여 해당 회차/과목의 기존 정답과 교체
+                        total_points = point_total(edited_grid)
+                        new_rows = answer_key_rows(edited_grid, exam_round, subject)
                         
-                        answers_df.to_csv(ANSWERS_FILE, index=False)
-                        st.success(f"정답이 저장되었습니다! (총점: {total_points:.1f}점)")
+                        for target in (partitions if save_all_classes else [partition]):
+                            with instrumentation.stage('grading', 'answer_key') as s:
+                                regrade = record_answer_key(get_storage(target), exam_round, subject, new_rows)
+                                s.record(rows=regrade.responses)
+                            class_label = f"[{partition_label(target)}] " if save_all_classes else ""
+                            if regrade.version is None:
+                                st.info(f"{class_label}바뀐 정답이나 배점이 없습니다. (총점: {total_points:.1f}점)")
+                            else:
+                                st.success(f"{class_label}정답이 저장되었습니다! (총점: {total_points:.1f}점, 버전 {regrade.version}) "
+                                           f"바뀐 문항 {len(regrade.questions)}개의 답안 {regrade.responses}개를 다시 채점하여 "
+                                           f"학생 {regrade.students}명의 점수가 바뀌었습니다.")
+                        # 바뀐 문항만 다시 쓰는 것은 SQLite 뿐이고, CSV/Parquet 는 요약 파일 전체를 다시 씀
+                        if regrade.version is not None and not isinstance(storage, SqliteStorage):
+                            st.caption("CSV/Parquet 저장소는 요약 테이블 파일 전체를 다시 쓰므로 정답 수정 후 다시 채점하는 시간이 "
+                                       "전체 재구성과 비슷합니다. 응시 인원이 많으면 SQLite 저장소(STORAGE_BACKEND=sqlite)를 사용하세요.")
+
+                # 정답 변경 이력 (저장할 때마다 바뀐 문항만 버전으로 기록)
+                versions_df = answer_versions(storage, exam_round, subject)
+                if not versions_df.empty:
+                    with st.expander(f"정답 변경 이력 (버전 {len(versions_df)}개)"):
+                        if 'answer_restore_message' in st.session_state:
+                            st.success(st.session_state.pop('answer_restore_message'))
+                        st.dataframe(versions_df, hide_index=True)
+                        selected_version = st.selectbox("버전", versions_df['버전'][::-1].tolist(), key='answer_version')
+                        st.dataframe(version_changes(storage, exam_round, subject, selected_version), hide_index=True)
+                        st.button("이 버전의 정답으로 되돌리기", key='restore_answer_version',
+                                  on_click=restore_answer_version,
+                                  args=(partition, exam_round, subject, selected_version))
             
-            with tab2:
+            elif teacher_section == "채점 결과":
                 # 채점 결과 확인
                 st.subheader("채점 결과 확인")
-                if os.path.exists(RESPONSES_FILE):
-                    responses_df = pd.read_csv(RESPONSES_FILE)
-                    answers_df = pd.read_csv(ANSWERS_FILE)
-                    
-                    selected_round = st.selectbox("확인할 회차를 선택하세요", responses_df['회차'].unique())
-                    selected_subject = st.selectbox("확인할 과목을 선택하세요", responses_df['과목'].unique())
+                summary_df = storage.read('score_summary')
+                
+                selected_round = st.selectbox("확인할 회차를 선택하세요", summary_df['회차'].unique())
+                selected_subject = st.selectbox("확인할 과목을 선택하세요", summary_df['과목'].unique())
+                
+                if st.button("결과 확인"):
+                    import plotly.express as px
+                    where = {'회차': selected_round, '과목': selected_subject}
+                    filtered_answers = storage.read('answers', where=where)
                     
-                    if st.button("결과 확인"):
-                        filtered_responses = responses_df[
-                            (responses_df['회차'] == selected_round) & 
-                            (responses_df['과목'] == selected_subject)
-                        ]
-                        
-                        filtered_answers = answers_df[
-                            (answers_df['회차'] == selected_round) & 
-                            (answers_df['과목'] == selected_subject)
-                        ]
-                        
-                        # 채점 결과 계산
-                        results = []
-                        for student_id in filtered_responses['학생ID'].unique():
-                            student_responses = filtered_responses[filtered_responses['학생ID'] == student_id]
-                            correct_count = 0
-                            
-                            for _, response in student_responses.iterrows():
-                                correct_answer = filtered_answers[
-                                    filtered_answers['문항번호'] == response['문항번호']
-                                ]['정답'].iloc[0]
-                                
-                                if response['입력답'] == correct_answer:
-                                    correct_count += 1
-                            
-                            results.append({
-                                '학생ID': student_id,
-                                '맞은 개수': correct_count,
-                                '틀린 개수': len(student_responses) - correct_count,
-                                '정답률': (correct_count/len(student_responses))*100
-                            })
+                    if filtered_answers.empty:
+                        st.warning("해당 회차/과목의 정답이 아직 등록되지 않았습니다.")
+                    else:
+                        # 채점 결과 (제출 때마다 갱신되는 요약 테이블에서 조회)
+                        with instrumentation.stage('statistics', 'student_results') as s:
+                            results_df = student_results(storage.read('score_summary', where=where))
+                            s.record(rows=len(results_df))
+                        # 순위, 백분위, 표준점수, 등급 (점수 순위 색인에서 조회)
+                        with instrumentation.stage('statistics', 'standings'):
+                            ranks_df = score_standings(storage, selected_round, selected_subject, results_df['점수'])
+                            results_df = pd.concat([results_df, ranks_df.round({'백분위': 1})], axis=1)
+                        st.dataframe(results_df.sort_values('순위'), hide_index=True)
                         
-                        results_df = pd.DataFrame(results)
-                        st.dataframe(results_df)
+                        # 점수 분포와 등급컷
+                        st.subheader("점수 분포")
+                        with instrumentation.stage('chart', 'score_distribution'):
+                            dist_df, grade_df, mean, std = score_distribution(storage, selected_round, selected_subject)
+                            fig = px.bar(dist_df, x='점수', y='인원', title='점수 분포',
+                                         labels={'점수': '점수', '인원': '인원 (명)'})
+                        st.caption(f"응시 {len(results_df)}명, 평균 {mean:.1f}점, 표준편차 {std:.1f}점")
+                        st.plotly_chart(fig)
+                        st.dataframe(grade_df.round({'비율': 1}), hide_index=True)
                         
                         # 문항별 정답률 분석
                         st.subheader("문항별 정답률 분석")
-                        question_stats = []
-                        for q_num in range(1, len(filtered_answers) + 1):
-                            question_responses = filtered_responses[filtered_responses['문항번호'] == q_num]
-                            correct_count = 0
-                            for _, response in question_responses.iterrows():
-                                correct_answer = filtered_answers[
-                                    filtered_answers['문항번호'] == response['문항번호']
-                                ]['정답'].iloc[0]
-                                if response['입력답'] == correct_answer:
-                                    correct_count += 1
+                        with instrumentation.stage('statistics', 'question_accuracy'):
+                            question_stats_df = question_accuracy(storage.read('question_summary', where=where), filtered_answers)
                         
-                            question_stats.append({
-                                '문항번호': q_num,
-                                '정답률': (correct_count/len(question_responses))*100 if len(question_responses) > 0 else 0
-                            })
+                        # 문항별 정답률 시각화
+                        with instrumentation.stage('chart', 'question_accuracy'):
+                            fig = px.bar(question_stats_df, x='문항번호', y='정답률',
+                                       title='문항별 정답률',
+                                       labels={'문항번호': '문항 번호', '정답률': '정답률 (%)'})
+                        st.plotly_chart(fig)
                         
-                        question_stats_df = pd.DataFrame(question_stats)
+                        # 문항 분석: 난이도, 변별도, 점이연 상관, 선택지 분포 (응답 행렬에서 계산, 해당 부분이 바뀔 때까지 재사용)
+                        st.subheader("문항 분석")
+                        with instrumentation.stage('statistics', 'item_analysis') as s:
+                            item_df = item_analysis(storage, selected_round, selected_subject)
+                            s.record(rows=len(item_df))
+                        st.dataframe(item_df.round({'정답률': 1, '변별도': 2, '점이연 상관': 2,
+                                                    **{c: 1 for c in item_df.columns if c.endswith('선택') or c == '미응답'}}),
+                                     hide_index=True)
                         
-                        # 문항별 정답률 시각화
-                        fig = px.bar(question_stats_df, x='문항번호', y='정답률',
-                                   title='문항별 정답률',
-                                   labels={'문항번호': '문항 번호', '정답률': '정답률 (%)'})
+                        # 문항별 선택지 분포 히트맵 (○: 정답)
+                        with instrumentation.stage('chart', 'choice_heatmap'):
+                            heatmap_df = choice_heatmap_frame(item_df)
+                            fig = px.imshow(heatmap_df, text_auto='.0f', aspect='auto', color_continuous_scale='Blues',
+                                            title='문항별 선택지 분포 (%)',
+                                            labels={'x': '문항 번호', 'y': '선택지', 'color': '선택 비율 (%)'})
+                            keyed = item_df[item_df['정답'].isin(CHOICES)]
+                            fig.add_scatter(x=keyed['문항번호'], y=[f"{int(a)}번" for a in keyed['정답']], mode='markers',
+                                            marker={'symbol': 'circle-open', 'size': 18, 'color': 'red'},
+                                            name='정답', hoverinfo='skip')
                         st.plotly_chart(fig)
-            
-            with tab3:
+        
+            elif teacher_section == "통계 분석":
                 # 통계 분석
                 st.subheader("통계 분석")
-                if os.path.exists(RESPONSES_FILE):
-                    responses_df = pd.read_csv(RESPONSES_FILE)
-                    answers_df = pd.read_csv(ANSWERS_FILE)
+                summary_df = storage.read('score_summary')
+                answers_df = storage.read('answers')
+                
+                if not summary_df.empty and not answers_df.empty:
+                    # 학생 요약 테이블의 집계와 차트 (요약 테이블이 바뀔 때까지 모든 세션이 재사용)
+                    statistics, figures = storage.derived('score_summary', ('statistics_view',), build_statistics_view)
                     
-                    if not responses_df.empty and not answers_df.empty:
-                        # 과목별 평균 정답률
-                        st.subheader("과목별 평균 정답률")
-                        subject_stats = []
-                        for subject in responses_df['과목'].unique():
-                            subject_responses = responses_df[responses_df['과목'] == subject]
-                            subject_answers = answers_df[answers_df['과목'] == subject]
-                            
-                            correct_count = 0
-                            total_count = 0
-                            
-                            for _, response in subject_responses.iterrows():
-                                correct_answer = subject_answers[
-                                    subject_answers['문항번호'] == response['문항번호']
-                                ]['정답'].iloc[0]
-                                
-                                if response['입력답'] == correct_answer:
-                                    correct_count += 1
-                                total_count += 1
-                            
-                            subject_stats.append({
-                                '과목': subject,
-                                '평균정답률': (correct_count/total_count)*100 if total_count > 0 else 0
-                            })
-                        
-                        if subject_stats:
-                            subject_stats_df = pd.DataFrame(subject_stats)
-                            
-                            # 과목별 평균 정답률 시각화
-                            fig = px.bar(subject_stats_df, x='과목', y='평균정답률',
-                                        title='과목별 평균 정답률',
-                                        labels={'과목': '과목', '평균정답률': '평균 정답률 (%)'})
-                            st.plotly_chart(fig)
-                        else:
-                            st.info("아직 과목별 통계 데이터가 없습니다.")
-                        
-                        # 회차별 추이 분석
-                        st.subheader("회차별 추이 분석")
-                        round_stats = []
-                        for round_num in responses_df['회차'].unique():
-                            round_responses = responses_df[responses_df['회차'] == round_num]
-                            round_answers = answers_df[answers_df['회차'] == round_num]
-                            
-                            correct_count = 0
-                            total_count = 0
-                            
-                            for _, response in round_responses.iterrows():
-                                correct_answer = round_answers[
-                                    round_answers['문항번호'] == response['문항번호']
-                                ]['정답'].iloc[0]
-                                
-                                if response['입력답'] == correct_answer:
-                                    correct_count += 1
-                                total_count += 1
-                            
-                            round_stats.append({
-                                '회차': round_num,
-                                '평균정답률': (correct_count/total_count)*100 if total_count > 0 else 0
-                            })
-                        
-                        if round_stats:
-                            round_stats_df = pd.DataFrame(round_stats)
-                            
-                            # 회차별 추이 시각화
-                            fig = px.line(round_stats_df, x='회차', y='평균정답률',
-                                         title='회차별 평균 정답률 추이',
-                                         labels={'회차': '회차', '평균정답률': '평균 정답률 (%)'})
-                            st.plotly_chart(fig)
-                        else:
-                            st.info("아직 회차별 통계 데이터가 없습니다.")
+                    # 과목별 평균 정답률
+                    st.subheader("과목별 평균 정답률")
+                    if 'subject' in figures:
+                        st.plotly_chart(figures['subject'])
+                    else:
+                        st.info("아직 과목별 통계 데이터가 없습니다.")
+                    
+                    # 회차별 추이 분석
+                    st.subheader("회차별 추이 분석")
+                    if 'round' in figures:
+                        st.plotly_chart(figures['round'])
                     else:
-                        st.info("아직 답안이나 정답 데이터가 없습니다.")
+                        st.info("아직 회차별 통계 데이터가 없습니다.")
+                    
+                    # 과목×회차별 분석
+                    st.subheader("과목×회차별 평균 정답률")
+                    if 'subject_round' in figures:
+                        st.plotly_chart(figures['subject_round'])
+                    
+                    # 학생별 정답률
+                    st.subheader("학생별 평균 정답률")
+                    st.dataframe(statistics['student'])
                 else:
-                    st.info("아직 답안 데이터가 없습니다.")
+                    st.info("아직 답안이나 정답 데이터가 없습니다.")
             
-            with tab4:
+            elif teacher_section == "학생 정답 확인":
                 # 학생 정답 확인
                 st.subheader("학생 정답 확인")
-                if os.path.exists(STUDENT_ANSWERS_FILE):
-                    student_answers_df = pd.read_csv(STUDENT_ANSWERS_FILE)
-                    if not student_answers_df.empty:
-                        selected_round = st.selectbox("확인할 회차를 선택하세요", student_answers_df['회차'].unique(), key='teacher_check_round')
-                        selected_subject = st.selectbox("확인할 과목을 선택하세요", student_answers_df['과목'].unique(), key='teacher_check_subject')
-                        
+                student_answers_df = storage.read('student_answers')
+                if not student_answers_df.empty:
+                    selected_round = st.selectbox("확인할 회차를 선택하세요", student_answers_df['회차'].unique(), key='teacher_check_round')
+                    selected_subject = st.selectbox("확인할 과목을 선택하세요", student_answers_df['과목'].unique(), key='teacher_check_subject')
+                    
+                    with instrumentation.stage('filter', 'student_answers') as s:
                         filtered_student_answers = student_answers_df[
                             (student_answers_df['회차'] == selected_round) & 
                             (student_answers_df['과목'] == selected_subject)
                         ]
-                        
-                        if not filtered_student_answers.empty:
-                            st.dataframe(filtered_student_answers)
-                        else:
-                            st.info("해당 회차/과목에 대한 학생 정답이 없습니다.")
+                        s.record(rows=len(student_answers_df))
+                    
+                    if not filtered_student_answers.empty:
+                        st.dataframe(filtered_student_answers)
                     else:
-                        st.info("학생이 입력한 정답이 없습니다.")
+                        st.info("해당 회차/과목에 대한 학생 정답이 없습니다.")
                 else:
-                    st.info("학생 정답 파일이 없습니다.")
-        else:
-            st.header("학생용 자가채점")
-            
-            # 탐구 과목 선택
-            st.subheader("탐구 과목 선택")
-            exam_round = st.selectbox("모의고사 회차를 선택하세요", ["1차", "2차", "3차", "4차"], key='subject_round')
-            
-            # 기존 선택 과목 불러오기
-            subjects_df = pd.read_csv(STUDENT_SUBJECTS_FILE)
-            selected_subjects = subjects_df[
-                (subjects_df['학생ID'] == username) & 
-                (subjects_df['회차'] == exam_round)
-            ]
-            
-            # 탐구 과목 목록
-            science_subjects = ["물리학", "화학", "생명과학", "지구과학"]
-            social_subjects = ["생활과 윤리", "윤리와 사상", "한국지리", "세계지리",
-                             "동아시아사", "세계사", "경제", "정치와 법", "사회문화"]
+                    st.info("학생이 입력한 정답이 없습니다.")
             
-            # 기본값 설정
-            default_subject1 = selected_subjects['탐구1'].iloc[0] if not selected_subjects.empty else None
-            default_subject2 = selected_subjects['탐구2'].iloc[0] if not selected_subjects.empty else None
-            
-            # 탐구 과목 선택 폼
-            with st.form("subject_selection_form"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    subject1 = st.selectbox("탐구1 과목을 선택하세요", 
-                                          science_subjects + social_subjects,
-                                          index=(science_subjects + social_subjects).index(default_subject1) if default_subject1 else 0)
-                with col2:
-                    remaining_subjects = [s for s in science_subjects + social_subjects if s != subject1]
-                    subject2 = st.selectbox("탐구2 과목을 선택하세요", 
-                                          remaining_subjects,
-                                          index=remaining_subjects.index(default_subject2) if default_subject2 in remaining_subjects else 0)
+            elif teacher_section == "정오표":
+                # 학생 × 문항 O/X 정오표 내보내기 (학생을 나누어 만들면서 바로 파일로 씀)
+                st.subheader("정오표 내보내기")
+                export_round = st.selectbox("회차를 선택하세요", ROUNDS, key='export_round')
+                export_subject = st.selectbox("과목을 선택하세요", ["전체 과목"] + SUBJECTS, key='export_subject')
+                export_format = st.radio("파일 형식", ["CSV", "XLSX"], horizontal=True, key='export_format')
                 
-                submitted = st.form_submit_button("탐구 과목 저장")
-                
-                if submitted:
-                    # 기존 선택 삭제
-                    subjects_df = subjects_df[
-                        ~((subjects_df['학생ID'] == username) & 
-                          (subjects_df['회차'] == exam_round))
-                    ]
-                    
-                    # 새로운 선택 추가
-                    new_row = {
-                        '학생ID': username,
-                        '회차': exam_round,
-                        '탐구1': subject1,
-                        '탐구2': subject2
-                    }
-                    subjects_df = pd.concat([subjects_df, pd.DataFrame([new_row])], ignore_index=True)
-                    subjects_df.to_csv(STUDENT_SUBJECTS_FILE, index=False)
-                    st.success("탐구 과목이 저장되었습니다!")
+                if export_format == "XLSX" and not xlsx_available():
+                    st.warning("XLSX 로 내보내려면 서버에 xlsxwriter 를 설치해야 합니다. (pip install xlsxwriter)")
+                elif st.button("정오표 만들기"):
+                    subjects = round_subjects(storage, export_round,
+                                              None if export_subject == "전체 과목" else export_subject)
+                    fmt = export_format.lower()
+                    # 만드는 동안은 임시 파일에 나누어 쓰므로 메모리에 표 전체를 두지 않음. 단 st.download_button 은
+                    # 완성된 파일을 Streamlit 미디어 저장소(메모리)에 한 번 올리므로, 파일 크기만큼의 메모리는 내려받기 동안 쓰임
+                    # (메모리 상한이 그대로 지켜지는 것은 명령줄 python -m correctness_table 뿐)
+                    with tempfile.TemporaryDirectory() as export_dir:
+                        export_path = os.path.join(export_dir, f"correctness_table.{fmt}")
+                        with instrumentation.stage('export', 'correctness_table') as s:
+                            with open(export_path, 'wb') as out:
+                                count = export_correctness_table(storage, export_round, subjects,
+                                                                 student_names(config), out, fmt)
+                            s.record(rows=count, nbytes=os.path.getsize(export_path))
+                        if count:
+                            st.success(f"{', '.join(subjects)} 정오표 {count}행을 만들었습니다.")
+                            with open(export_path, 'rb') as exported:
+                                st.download_button("정오표 내려받기", exported,
+                                                   file_name=f"정오표_{export_round}_{export_subject}.{fmt}",
+                                                   mime=EXPORT_FORMATS[fmt])
+                        else:
+                            st.info("해당 회차/과목에 제출된 답안이 없습니다.")
+        else:
+            st.header("학생용 자가채점")
             
-            # 탭 생성
-            tab1, = st.tabs(["답안 입력"])  # 정답 입력 탭 제거
+            # 화면 선택 (교사 화면과 같이 선택한 화면만 실행)
+            student_section = st.radio("화면 선택", ["답안 입력", "내 성적 추이"],
+                                       horizontal=True, key='student_section', label_visibility='collapsed')
+            instrumentation.set_tab(student_section)
             
-            with tab1:
-                # 답안 입력
-                st.subheader("답안 입력")
-                exam_round = st.selectbox("모의고사 회차를 선택하세요", ["1차", "2차", "3차", "4차"], key='student_round')
-                
-                # 학생의 탐구 과목 선택 확인
-                subjects_df = pd.read_csv(STUDENT_SUBJECTS_FILE)
-                student_subjects = subjects_df[
-                    (subjects_df['학생ID'] == username) & 
-                    (subjects_df['회차'] == exam_round)
-                ]
-                
-                if student_subjects.empty:
-                    st.warning("먼저 탐구 과목을 선택해주세요!")
-                    st.stop()
+            if student_section == "내 성적 추이":
+                with instrumentation.section("내 성적 추이"):
+                    st.subheader("내 성적 추이")
+                    # 학생별 성적 이력 색인에서 조회 (다른 학생 수와 관계없이 내 응시 기록만 계산)
+                    with instrumentation.stage('statistics', 'student_history') as s:
+                        history_df = student_history(storage, username)
+                        s.record(rows=len(history_df))
+                    if history_df.empty:
+                        st.info("아직 제출한 답안이 없습니다.")
+                    else:
+                        trend_metric = st.radio("추이 기준", ["정답률", "점수"], horizontal=True, key='history_metric')
+                        import plotly.express as px
+                        with instrumentation.stage('chart', 'student_history'):
+                            fig = px.line(history_df, x='회차', y=trend_metric, color='과목', markers=True,
+                                          title=f'회차별 과목 {trend_metric}',
+                                          category_orders={'회차': ROUNDS, '과목': SUBJECTS},
+                                          labels={'정답률': '정답률 (%)', '점수': '점수'})
+                        st.plotly_chart(fig)
+                        st.dataframe(history_df.round({'정답률': 1}), hide_index=True)
+                        
+                        # 같은 과목에서 여러 회차에 걸쳐 틀린 문항번호
+                        st.subheader("반복 오답 문항")
+                        repeated_df = repeated_wrong(storage, username)
+                        if repeated_df.empty:
+                            st.info("두 회차 이상 틀린 문항이 없습니다.")
+                        else:
+                            st.dataframe(repeated_df, hide_index=True)
+            else:
                 
-                # 과목 선택 (탐구 과목은 미리 선택된 것만 표시)
-                available_subjects = ["국어", "수학", "영어", "한국사"]
-                if not student_subjects.empty:
-                    available_subjects.extend([student_subjects['탐구1'].iloc[0], student_subjects['탐구2'].iloc[0]])
+                # 탐구 과목 선택
+                st.subheader("탐구 과목 선택")
+                exam_round = st.selectbox("모의고사 회차를 선택하세요", ROUNDS, key='subject_round')
                 
-                subject = st.selectbox(
-                    "과목을 선택하세요",
-                    available_subjects,
-                    key='student_subject'
-                )
+                # 기존 선택 과목 불러오기
+                selected_subjects = storage.read('student_subjects', where={'학생ID': username, '회차': exam_round})
                 
-                # 과목별 문항 수 설정
-                subject_questions = {
-                    "국어": 45,
-                    "수학": 30,
-                    "영어": 45,
-                    "한국사": 20,
-                    "물리학": 20,
-                    "화학": 20,
-                    "생명과학": 20,
-                    "지구과학": 20,
-                    "생활과 윤리": 20,
-                    "윤리와 사상": 20,
-                    "한국지리": 20,
-                    "세계지리": 20,
-                    "동아시아사": 20,
-                    "세계사": 20,
-                    "경제": 20,
-                    "정치와 법": 20,
-                    "사회문화": 20
-                }
-
-                # 과목별 만점 설정
-                subject_max_scores = {
-                    "국어": 100,
-                    "수학": 100,
-                    "영어": 100,
-                    "한국사": 50,
-                    "물리학": 50,
-                    "화학": 50,
-                    "생명과학": 50,
-                    "지구과학": 50,
-                    "생활과 윤리": 50,
-                    "윤리와 사상": 50,
-                    "한국지리": 50,
-                    "세계지리": 50,
-                    "동아시아사": 50,
-                    "세계사": 50,
-                    "경제": 50,
-                    "정치와 법": 50,
-                    "사회문화": 50
-                }
+                # 기본값 설정
+                default_subject1 = selected_subjects['탐구1'].iloc[0] if not selected_subjects.empty else None
+                default_subject2 = selected_subjects['탐구2'].iloc[0] if not selected_subjects.empty else None
                 
-                num_questions = subject_questions[subject]
-                max_score = subject_max_scores[subject]
+                # 탐구 과목 선택 폼
+                with st.form("subject_selection_form"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        subject1 = st.selectbox("탐구1 과목을 선택하세요", 
+                                              ELECTIVE_SUBJECTS,
+                                              index=ELECTIVE_SUBJECTS.index(default_subject1) if default_subject1 in ELECTIVE_SUBJECTS else 0)
+                    with col2:
+                        remaining_subjects = [s for s in ELECTIVE_SUBJECTS if s != subject1]
+                        subject2 = st.selectbox("탐구2 과목을 선택하세요", 
+                                              remaining_subjects,
+                                              index=remaining_subjects.index(default_subject2) if default_subject2 in remaining_subjects else 0)
+                    
+                    submitted = st.form_submit_button("탐구 과목 저장")
+                    
+                    if submitted:
+                        # 기존 선택을 새로운 선택으로 교체
+                        new_row = {
+                            '학생ID': username,
+                            '회차': exam_round,
+                            '탐구1': subject1,
+                            '탐구2': subject2
+                        }
+                        storage.replace('student_subjects', {'학생ID': username, '회차': exam_round}, [new_row])
+                        st.success("탐구 과목이 저장되었습니다!")
                 
-                # 답안 입력 폼
-                with st.form("student_answer_form"):
-                    # 기존 답안 불러오기
-                    responses_df = pd.read_csv(RESPONSES_FILE)
-                    existing_responses = responses_df[
-                        (responses_df['학생ID'] == username) & 
-                        (responses_df['회차'] == exam_round) & 
-                        (responses_df['과목'] == subject)
-                    ]
+                with instrumentation.section("답안 입력"):
+                    # 답안 입력
+                    st.subheader("답안 입력")
+                    exam_round = st.selectbox("모의고사 회차를 선택하세요", ROUNDS, key='student_round')
                     
-                    answers = []
-                    for i in range(num_questions):
-                        col1, col2 = st.columns([3, 1])
-                        with col1:
-                            st.write(f"{i+1}번")
-                        with col2:
-                            # 기존 답안이 있으면 표시
-                            existing_answer = ""
-                            if not existing_responses.empty:
-                                answer_row = existing_responses[existing_responses['문항번호'] == i+1]
-                                if not answer_row.empty:
-                                    existing_answer = answer_row['입력답'].iloc[0]
-                            answer = st.text_input(f"답", value=existing_answer, key=f"student_q_{i}")
-                            answers.append(answer if answer else "")  # 빈 값 처리
+                    # 학생의 탐구 과목 선택 확인
+                    student_subjects = storage.read('student_subjects', where={'학생ID': username, '회차': exam_round})
                     
-                    submitted = st.form_submit_button("답안 제출")
+                    if student_subjects.empty:
+                        st.warning("먼저 탐구 과목을 선택해주세요!")
+                        st.stop()
                     
-                    if submitted:
-                        # 기존 답안 삭제
-                        responses_df = responses_df[
-                            ~((responses_df['학생ID'] == username) & 
-                              (responses_df['회차'] == exam_round) & 
-                              (responses_df['과목'] == subject))
-                        ]
+                    # 과목 선택 (탐구 과목은 미리 선택된 것만 표시)
+                    available_subjects = list(CORE_SUBJECTS)
+                    if not student_subjects.empty:
+                        available_subjects.extend([student_subjects['탐구1'].iloc[0], student_subjects['탐구2'].iloc[0]])
+                    
+                    subject = st.selectbox(
+                        "과목을 선택하세요",
+                        available_subjects,
+                        key='student_subject'
+                    )
+                    
+                    # 회차/과목별 문항 수와 만점 (시험 구성 레지스트리)
+                    # 저장해 둔 탐구 과목이 시험 구성 변경(schema.yaml)으로 빠졌으면 레지스트리에 없음
+                    spec = subject_spec(exam_round, subject)
+                    if spec is None:
+                        st.warning(f"{exam_round} 시험 구성에 '{subject}' 과목이 없습니다. 탐구 과목을 다시 선택해주세요.")
+                        st.stop()
+                    num_questions = spec['questions']
+                    max_score = spec['max_score']
+                    
+                    # 답안 입력 표 (문항별 위젯 대신 표 한 개, 폼 제출 전에는 재실행하지 않음)
+                    existing_responses = storage.read('responses', where={'학생ID': username, '회차': exam_round, '과목': subject})
+                    answer_grid = response_grid(existing_responses, num_questions)
+                    with st.form("student_answer_form"):
+                        answer_string = st.text_input(
+                            "답 문자열 (선택)",
+                            placeholder="예: 3142513... (빈 문항은 -, 쉼표나 공백으로 구분해도 됩니다)",
+                            help="입력하면 표의 답 대신 이 문자열을 사용합니다."
+                        )
+                        edited_grid = st.data_editor(
+                            answer_grid,
+                            column_config={
+                                '문항번호': st.column_config.NumberColumn("문항번호", disabled=True),
+                                '입력답': st.column_config.NumberColumn("답", min_value=1, max_value=max_answer(exam_round, subject), step=1,
+                                                                  help=short_answer_help(exam_round, subject))
+                            },
+                            hide_index=True,
+                            use_container_width=True,
+                            key=f"response_grid_{exam_round}_{subject}"
+                        )
                         
-                        # 새 답안 추가
-                        for i, answer in enumerate(answers):
-                            if answer:  # 답안이 있는 경우만 저장
-                                new_row = {
-                                    '학생ID': username,
-                                    '회차': exam_round,
-                                    '과목': subject,
-                                    '문항번호': i+1,
-                                    '입력답': answer
-                                }
-                                responses_df = pd.concat([responses_df, pd.DataFrame([new_row])], ignore_index=True)
-                        responses_df.to_csv(RESPONSES_FILE, index=False)
-                        st.success("답안이 저장되었습니다!")
+                        submitted = st.form_submit_button("답안 제출")
                         
-                        # 즉시 채점 결과 표시
-                        if os.path.exists(ANSWERS_FILE):
-                            answers_df = pd.read_csv(ANSWERS_FILE)
-                            filtered_answers = answers_df[
-                                (answers_df['회차'] == exam_round) & 
-                                (answers_df['과목'] == subject)
-                            ]
+                        if submitted:
+                            # 답 문자열이 있으면 표의 답 대신 사용
+                            if answer_string.strip():
+                                try:
+                                    edited_grid = edited_grid.assign(입력답=parse_answer_string(answer_string, num_questions))
+                                except ValueError as e:
+                                    st.error(str(e))
+                                    st.stop()
+                            
+                            errors = validate_responses(edited_grid, exam_round, subject)
+                            if errors:
+                                st.error("\n\n".join(errors))
+                                st.stop()
+                            answers = response_answers(edited_grid)
+                            
+                            # 답안이 있는 문항만 한 번에 구성하여 기존 답안과 교체
+                            answered = [(i+1, answer) for i, answer in enumerate(answers) if answer]
+                            new_rows = pd.DataFrame({
+                                '학생ID': username,
+                                '회차': exam_round,
+                                '과목': subject,
+                                '문항번호': [q_num for q_num, _ in answered],
+                                '입력답': [answer for _, answer in answered]
+                            }, columns=['학생ID', '회차', '과목', '문항번호', '입력답'])
+                            # 저장은 쓰기 스레드가 다른 제출과 묶어서 처리하고, 그동안 즉시 채점 결과를 먼저 표시
+                            with instrumentation.stage('grading', 'submission') as s:
+                                pending = get_submission_queue(storage).submit(username, exam_round, subject, new_rows)
+                                s.record(rows=len(new_rows))
                             
-                            if not filtered_answers.empty:
-                                correct_count = 0
-                                total_answered = 0  # 실제로 답한 문항 수
-                                for i, answer in enumerate(answers):
-                                    if answer:  # 답안이 있는 경우만 채점
-                                        total_answered += 1
-                                        correct_answer = filtered_answers[
-                                            filtered_answers['문항번호'] == i+1
-                                        ]['정답'].iloc[0]
-                                        
-                                        # 정답과 입력답을 정수로 변환하여 비교
-                                        try:
-                                            answer_int = int(float(answer))
-                                            correct_answer_int = int(float(correct_answer))
-                                            
-                                            # 디버깅을 위한 출력
-                                            st.write(f"문항 {i+1}: 입력답={answer_int}, 정답={correct_answer_int}")
-                                            
-                                            if answer_int == correct_answer_int:
-                                                correct_count += 1
-                                        except (ValueError, TypeError):
-                                            st.write(f"문항 {i+1}: 입력답 또는 정답이 숫자가 아닙니다.")
-                                
-                                if total_answered > 0:  # 답안을 하나라도 입력한 경우에만 결과 표시
+                            # 즉시 채점 결과 표시 (컴파일된 정답으로 한 번에 채점)
+                            with instrumentation.stage('grading', 'instant'):
+                                answer_key = get_compiled_key(storage, exam_round, subject)
+                                result = grade_submission(answer_key, answers) if answer_key is not None else None
+                            
+                            if answer_key is not None:
+                                if result.correct + result.wrong > 0:  # 답안을 하나라도 입력한 경우에만 결과 표시
                                     st.subheader("채점 결과")
                                     col1, col2, col3 = st.columns(3)
                                     with col1:
-                                        st.metric("맞은 개수", correct_count)
+                                        st.metric("맞은 개수", result.correct)
+                                    with col2:
+                                        st.metric("틀린 개수", result.wrong)
+                                    with col3:
+                                        st.metric("총점", f"{result.score:.1f}/{max_score}점")
+                                    
+                                    # 이번 점수의 위치 (점수 순위 색인에서 이전 점수를 빼고 계산하므로 저장 전에도 바로 표시)
+                                    with instrumentation.stage('grading', 'standing'):
+                                        position = score_standing(storage, exam_round, subject, username, result.score)
+                                    col1, col2, col3 = st.columns(3)
+                                    with col1:
+                                        st.metric("등급", f"{position.grade}등급")
                                     with col2:
-                                        st.metric("틀린 개수", total_answered - correct_count)
+                                        st.metric("백분위", f"{position.percentile:.1f}",
+                                                  help=f"응시 {position.count}명 중 {position.rank}등")
                                     with col3:
-                                        # 배점을 반영한 점수 계산
-                                        total_score = 0
-                                        for i, answer in enumerate(answers):
-                                            if answer:  # 답안이 있는 경우만 점수 계산
-                                                try:
-                                                    answer_int = int(float(answer))
-                                                    correct_answer_int = int(float(filtered_answers[
-                                                        filtered_answers['문항번호'] == i+1
-                                                    ]['정답'].iloc[0]))
-                                                    
-                                                    if answer_int == correct_answer_int:
-                                                        # 해당 문항의 배점 가져오기
-                                                        point = filtered_answers[
-                                                            filtered_answers['문항번호'] == i+1
-                                                        ]['배점'].iloc[0]
-                                                        total_score += point
-                                                except (ValueError, TypeError):
-                                                    continue
-                                        
-                                        st.metric("총점", f"{total_score:.1f}/{max_score}점")
+                                        st.metric("표준점수", "-" if position.standard_score is None else position.standard_score,
+                                                  help="절대평가 과목은 표준점수가 없습니다." if position.standard_score is None else None)
+                                    
+                                    # 문항별 정오
+                                    marks = pd.Series(result.marks).map({1: 'O', 0: 'X', NO_ANSWER: ''})
+                                    st.dataframe(pd.DataFrame({
+                                        '문항번호': range(1, num_questions + 1),
+                                        '입력답': answers,
+                                        '정오': marks.to_numpy()
+                                    }).set_index('문항번호').T)
                                 else:
                                     st.warning("답안을 입력해주세요.")
                             else:
                                 st.warning("해당 회차/과목의 정답이 아직 등록되지 않았습니다.")
+                            
+                            with instrumentation.stage('grading', 'submission wait'):
+                                try:
+                                    pending.result(timeout=SUBMISSION_TIMEOUT_SECONDS)
+                                    st.success("답안이 저장되었습니다!")
+                                except FuturesTimeoutError:
+                                    st.warning("제출이 많아 저장이 늦어지고 있습니다. 답안은 접수되었으며 곧 저장됩니다.")
+                                except Exception as e:
+                                    st.error(f"답안 저장 중 오류가 발생했습니다. 다시 제출해주세요: {str(e)}")
     elif authentication_status == False:
         st.error('아이디/비밀번호가 잘못되었습니다.')
     elif authentication_status == None:
         st.warning('아이디와 비밀번호를 입력하세요.')
 except Exception as e:
     st.error(f'로그인 중 오류가 발생했습니다: {str(e)}')
-    st.stop() 
\ No newline at end of file
+    st.stop()
+finally:
+    # st.stop() 으로 끝난 재실행도 기록
+    instrumentation.end_rerun() 
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""브라우저 없이 전체 답안을 채점하여 결과 파일로 저장하는 일괄 채점 명령
+
+저장소(STORAGE_BACKEND, DATA_DIR)에서 응답과 정답을 한 번 읽어 (회차, 과목)별로 나눈 뒤, 각 부분을 프로세스 풀에서
+병렬로 채점한다. 채점 규칙은 앱과 같다: 입력답/정답의 int(float()) 정규화(grading.normalize_choice), 문항별 배점 반영,
+회차/과목별 문항 수와 만점(subjects.question_count, subjects.max_score).
+
+    python -m batch_grading --out results               # CPU 수만큼 프로세스 사용
+    python -m batch_grading --out results --workers 8 --round 1차
+    python -m batch_grading --out results --partition 한빛고/3-1   # 학교/반 분할 하나만
+
+결과 파일
+    student_results.csv   (학생ID, 회차, 과목)별 맞은 개수, 틀린 개수, 응답 수, 정답률, 점수, 만점
+    question_results.csv  (회차, 과목, 문항번호)별 정답, 배점, 응답 수, 맞은 개수, 정답률, 1~5번 선택 인원
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from grading import NO_ANSWER
+from partitions import parse_partition
+from response_matrix import CHOICES, build_matrix
+from storage import get_storage
+from subjects import max_score, question_count
+
+STUDENT_RESULTS = 'student_results.csv'
+QUESTION_RESULTS = 'question_results.csv'
+
+STUDENT_COLUMNS = ['학생ID', '회차', '과목', '맞은 개수', '틀린 개수', '응답 수', '정답률', '점수', '만점']
+QUESTION_COLUMNS = ['회차', '과목', '문항번호', '정답', '배점', '응답 수', '맞은 개수', '정답률'] + \
+    [f"{choice}번 선택" for choice in CHOICES]
+
+
+# (회차, 과목)별 (회차, 과목, 응답, 정답) 목록. 응답이나 정답 중 하나라도 있는 부분만
+def partitions(responses, answers, rounds=None):
+    keys = ['회차', '과목']
+    if rounds:
+        responses = responses[responses['회차'].astype(str).isin(rounds)]
+        answers = answers[answers['회차'].astype(str).isin(rounds)]
+    # 작업자에게 보내는 양을 줄이기 위해 채점에 필요한 컬럼만 (입력답 정규화 등 채점은 작업자에서 병렬로)
+    response_groups = {
+        key: group[['학생ID', '문항번호', '입력답']]
+        for key, group in responses.groupby(keys, sort=False, observed=True)
+    }
+    answer_groups = {
+        key: group[['문항번호', '정답', '배점']]
+        for key, group in answers.groupby(keys, sort=False, observed=True)
+    }
+    empty_responses = pd.DataFrame(columns=['학생ID', '문항번호', '입력답'])
+    empty_answers = pd.DataFrame(columns=['문항번호', '정답', '배점'])
+    return [
+        (str(exam_round), str(subject),
+         response_groups.get((exam_round, subject), empty_responses),
+         answer_groups.get((exam_round, subject), empty_answers))
+        for exam_round, subject in sorted(set(response_groups) | set(answer_groups), key=str)
+    ]
+
+
+# (회차, 과목) 하나를 응답 행렬로 채점하여 (학생별 결과, 문항별 결과) 반환 (작업자 프로세스에서 실행)
+def grade_partition(exam_round, subject, responses, answers):
+    matrix = build_matrix(responses, answers, question_count(exam_round, subject))
+    students = matrix.student_results()
+    students.insert(1, '회차', exam_round)
+    students.insert(2, '과목', subject)
+    students.insert(5, '응답 수', matrix.answered_counts())
+    students['만점'] = max_score(exam_round, subject) or np.nan
+
+    correct, attempts = matrix.question_counts()
+    distribution = matrix.choice_distribution()
+    questions = pd.DataFrame({
+        '회차': exam_round,
+        '과목': subject,
+        '문항번호': np.arange(1, matrix.num_questions + 1),
+        '정답': pd.Series(matrix.answers).where(matrix.answers != NO_ANSWER).astype('Int64'),
+        '배점': matrix.points,
+        '응답 수': attempts,
+        '맞은 개수': correct,
+        '정답률': matrix.question_accuracy(),
+    })
+    for k, choice in enumerate(CHOICES):
+        questions[f"{choice}번 선택"] = distribution[:, k]
+    return students[STUDENT_COLUMNS], questions[QUESTION_COLUMNS]
+
+
+def _grade(task):
+    return grade_partition(*task)
+
+
+# 모든 부분을 채점하여 (학생별 결과, 문항별 결과) 반환. workers 가 1 이면 현재 프로세스에서 차례로 채점
+def grade_all(responses, answers, workers=None, rounds=None):
+    tasks = partitions(responses, answers, rounds)
+    if not tasks:
+        return pd.DataFrame(columns=STUDENT_COLUMNS), pd.DataFrame(columns=QUESTION_COLUMNS)
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers == 1:
+        results = [_grade(task) for task in tasks]
+    else:
+        # 큰 부분부터 나눠 주어 마지막에 한 작업자만 남는 시간을 줄임
+        order = sorted(range(len(tasks)), key=lambda k: -len(tasks[k][2]))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            graded = dict(zip(order, executor.map(_grade, [tasks[k] for k in order])))
+        results = [graded[k] for k in range(len(tasks))]
+    students = pd.concat([r[0] for r in results], ignore_index=True)
+    questions = pd.concat([r[1] for r in results], ignore_index=True)
+    return students, questions
+
+
+def write_results(students, questions, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    students.to_csv(os.path.join(out_dir, STUDENT_RESULTS), index=False)
+    questions.to_csv(os.path.join(out_dir, QUESTION_RESULTS), index=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='전체 답안을 (회차, 과목)별로 병렬 채점하여 결과 파일로 저장합니다.')
+    parser.add_argument('--out', default='results', help='결과 파일을 쓸 디렉토리')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본값: CPU 수)')
+    parser.add_argument('--round', action='append', dest='rounds', help='채점할 회차 (여러 번 지정 가능, 기본값: 전체)')
+    parser.add_argument('--partition', default=None, help="학교/반 분할 (예: 한빛고/3-1, 기본값: 기본 분할)")
+    args = parser.parse_args()
+
+    storage = get_storage(parse_partition(args.partition))
+    start = time.perf_counter()
+    students, questions = grade_all(storage.read('responses'), storage.read('answers'), args.workers, args.rounds)
+    write_results(students, questions, args.out)
+    keyed = questions.groupby(['회차', '과목'], sort=False)['정답'].count()
+    missing = keyed.index[keyed.to_numpy() == 0]
+    print(f"학생별 결과 {len(students)}행, 문항별 결과 {len(questions)}행 -> {args.out} ({time.perf_counter() - start:.1f}초)")
+    for exam_round, subject in missing:
+        print(f"정답이 없어 모두 오답 처리된 부분: {exam_round} {subject}")
@@ -0,0 +1 @@
+"""채점/통계 경로 성능 측정 스크립트 모음 (저장소 루트에서 python -m benchmarks.<모듈> 로 실행)"""
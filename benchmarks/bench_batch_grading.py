@@ -0,0 +1,37 @@
+"""일괄 채점(batch_grading) 프로세스 수별 소요 시간과 속도 향상
+
+    python -m benchmarks.bench_batch_grading --students 20000 --rounds 4 --workers 1 2 4 8
+"""
+import argparse
+import os
+import statistics
+import time
+
+from batch_grading import grade_all
+from benchmarks.synthetic import generate
+
+
+def run(students, rounds, workers_list, repeat):
+    tables = generate(students, rounds)
+    responses, answers = tables['responses'], tables['answers']
+    print(f"응답 {len(responses):,}행, CPU {os.cpu_count()}개")
+    baseline = None
+    for workers in workers_list:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            grade_all(responses, answers, workers)
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        baseline = baseline or median
+        print(f"프로세스 {workers:3d}개: 중앙값 {median:7.2f}s, 속도 향상 {baseline / median:5.2f}배")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, default=20_000)
+    parser.add_argument('--rounds', type=int, default=4)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.students, args.rounds, args.workers, args.repeat)
@@ -0,0 +1,95 @@
+"""공유 데이터 캐시 효과 측정: 재실행 시 읽기 지연과, 학생 30명이 동시에 제출하는 동안 교사 화면의 읽기 지연"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+
+import data_cache
+from benchmarks.bench_statistics import make_data
+from storage import CsvStorage
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _prepare(data_dir, num_rows):
+    responses, answers = make_data(num_rows)
+    storage = CsvStorage(data_dir)
+    storage.initialize()
+    responses.to_csv(storage.path('responses'), index=False)
+    answers.to_csv(storage.path('answers'), index=False)
+    return storage, responses
+
+
+def bench_rerun(storage, repeat):
+    data_cache.clear()
+    start = time.perf_counter()
+    storage.read('responses')
+    storage.read('answers')
+    cold = time.perf_counter() - start
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        storage.read('responses')
+        storage.read('answers')
+        timings.append(time.perf_counter() - start)
+    print(f"첫 읽기(파싱): {cold * 1000:.1f}ms, 이후 재실행 읽기 중앙값: {statistics.median(timings) * 1000:.3f}ms")
+
+
+def bench_concurrent(storage, responses, submitters, submissions):
+    data_cache.clear()
+    stop = threading.Event()
+    teacher_timings = []
+
+    # 교사 화면: 채점 결과/통계 탭이 하는 읽기를 반복
+    def teacher():
+        while not stop.is_set():
+            start = time.perf_counter()
+            storage.read('responses', where={'회차': '1차', '과목': '국어'})
+            storage.read('answers', where={'회차': '1차', '과목': '국어'})
+            teacher_timings.append(time.perf_counter() - start)
+            # 사용자가 위젯을 조작하는 간격
+            stop.wait(0.1)
+
+    student_ids = responses['학생ID'].unique()[:submitters]
+
+    def student(student_id):
+        rows = [
+            {'학생ID': student_id, '회차': '1차', '과목': '국어', '문항번호': q, '입력답': str(q % 5 + 1)}
+            for q in range(1, 46)
+        ]
+        for _ in range(submissions):
+            storage.replace('responses', {'학생ID': student_id, '회차': '1차', '과목': '국어'}, rows)
+
+    reader = threading.Thread(target=teacher)
+    reader.start()
+    writers = [threading.Thread(target=student, args=(student_id,)) for student_id in student_ids]
+    start = time.perf_counter()
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    reader.join()
+    print(
+        f"학생 {len(writers)}명 × {submissions}회 제출 {elapsed:.2f}s 동안 교사 읽기 {len(teacher_timings)}회: "
+        f"p50 {_percentile(teacher_timings, 0.5) * 1000:.2f}ms, p95 {_percentile(teacher_timings, 0.95) * 1000:.2f}ms "
+        f"(캐시 적재 {data_cache.stats['loads']}회)"
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200_000, help='responses.csv 응답 행 수')
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--submitters', type=int, default=30)
+    parser.add_argument('--submissions', type=int, default=2)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage, responses = _prepare(data_dir, args.rows)
+        bench_rerun(storage, args.repeat)
+        bench_concurrent(storage, responses, args.submitters, args.submissions)
@@ -0,0 +1,96 @@
+"""CSV 와 Parquet 저장소 비교: 전체 읽기 시간, DataFrame 메모리, 프로세스 상주 메모리(RSS), 조건 조회 시간"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import data_cache
+from benchmarks.bench_statistics import make_data
+from storage import CsvStorage, ParquetStorage, convert_csv_to_parquet
+
+
+def _prepare(data_dir, num_rows):
+    responses, answers = make_data(num_rows)
+    storage = CsvStorage(data_dir)
+    storage.initialize()
+    responses.to_csv(storage.path('responses'), index=False)
+    answers.to_csv(storage.path('answers'), index=False)
+    convert_csv_to_parquet(data_dir)
+    return responses
+
+
+# 현재 프로세스의 상주 메모리 (리눅스 /proc 기준, 없으면 None)
+def _rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+# 새 프로세스에서 responses 전체를 읽어 (읽기 시간, DataFrame 메모리, RSS 증가량) 측정
+def _measure_load(backend, data_dir):
+    storage = ParquetStorage(data_dir) if backend == 'parquet' else CsvStorage(data_dir)
+    # 작은 테이블을 먼저 읽어 라이브러리 적재분은 RSS 증가량에서 제외
+    storage.read('answers')
+    before = _rss_mb()
+    start = time.perf_counter()
+    df = storage.read('responses')
+    elapsed = time.perf_counter() - start
+    after = _rss_mb()
+    return {
+        'seconds': elapsed,
+        # 같은 문자열 객체를 여러 번 세므로 object 컬럼은 실제보다 크게 잡힘 (RSS 와 함께 볼 것)
+        'frame_mb': df.memory_usage(deep=True).sum() / 2**20,
+        'rss_mb': None if before is None else after - before,
+    }
+
+
+def bench_load(data_dir):
+    print(f"{'저장소':>8} {'읽기(ms)':>10} {'DataFrame(MB)':>14} {'RSS 증가(MB)':>13} {'파일(MB)':>9}")
+    for backend, storage in [('csv', CsvStorage(data_dir)), ('parquet', ParquetStorage(data_dir))]:
+        # 이미 올라온 라이브러리/캐시의 영향을 받지 않도록 백엔드마다 새 프로세스에서 측정
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_columnar', '--measure', backend, '--data-dir', data_dir],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        rss = '-' if result['rss_mb'] is None else f"{result['rss_mb']:.1f}"
+        size = os.path.getsize(storage.path('responses')) / 2**20
+        print(f"{backend:>8} {result['seconds'] * 1000:>10.1f} {result['frame_mb']:>14.1f} {rss:>13} {size:>9.1f}")
+
+
+# (회차, 과목) / (학생ID, 회차, 과목) 조건 조회: CSV 는 전체 파싱 후 필터, Parquet 은 읽을 때 필터
+def bench_filtered(data_dir, responses, repeat):
+    where_partition = {'회차': '1차', '과목': '국어'}
+    where_student = {'학생ID': responses['학생ID'].iloc[-1], '회차': '1차', '과목': '국어'}
+    for backend, storage in [('csv', CsvStorage(data_dir)), ('parquet', ParquetStorage(data_dir))]:
+        for label, where in [('회차/과목', where_partition), ('학생/회차/과목', where_student)]:
+            timings = []
+            for _ in range(repeat):
+                data_cache.clear()
+                start = time.perf_counter()
+                rows = storage.read('responses', where=where)
+                timings.append(time.perf_counter() - start)
+            print(f"{backend:>8} {label} 조회 {len(rows)}행: 최소 {min(timings) * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='responses 응답 행 수')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--measure', choices=['csv', 'parquet'], help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        print(json.dumps(_measure_load(args.measure, args.data_dir)))
+    else:
+        with tempfile.TemporaryDirectory() as data_dir:
+            responses = _prepare(data_dir, args.rows)
+            bench_load(data_dir)
+            bench_filtered(data_dir, responses, args.repeat)
@@ -0,0 +1,115 @@
+"""정답 입력(교사)/답안 입력(학생) 화면의 재실행 지연, 위젯 수, 화면 전송 크기 측정
+
+streamlit.testing 의 AppTest 로 임시 디렉토리에서 앱을 실행한다. 로그인 비용이 측정을 가리지 않도록
+비밀번호를 미리 해시한 계정 두 개만 둔 설정 파일을 사용한다.
+
+    python -m benchmarks.bench_forms
+    python -m benchmarks.bench_forms --app /path/to/other/app.py   # 다른 버전과 비교
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import bcrypt
+import yaml
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.element_tree import Block, Widget
+
+from benchmarks.synthetic import generate, write_csv
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write_config(directory):
+    password = bcrypt.hashpw(b'bench123', bcrypt.gensalt(rounds=4)).decode()
+    config = {
+        'credentials': {'usernames': {
+            'teacher': {'email': 'teacher@example.com', 'name': '교사', 'password': password},
+            'student1': {'email': 'student1@example.com', 'name': '학생', 'password': password},
+        }},
+        'cookie': {'expiry_days': 1, 'key': 'bench_forms_cookie_key_0123456789', 'name': 'bench_forms_cookie'},
+    }
+    with open(os.path.join(directory, 'config.yaml'), 'w') as f:
+        yaml.dump(config, f, allow_unicode=True)
+
+
+def _walk(node):
+    yield node
+    if isinstance(node, Block):
+        for child in node.children.values():
+            yield from _walk(child)
+
+
+# 화면 요소 수, 위젯 수, 요소/레이아웃 proto 직렬화 크기 합 (브라우저로 보내는 내용의 근사치)
+def _page_size(at):
+    elements = widgets = payload = 0
+    for node in _walk(at._tree):
+        proto = getattr(node, 'proto', None)
+        if proto is None:
+            continue
+        payload += len(proto.SerializeToString())
+        if not isinstance(node, Block):
+            elements += 1
+            widgets += isinstance(node, Widget)
+    return elements, widgets, payload
+
+
+def _login(app, username):
+    at = AppTest.from_file(app, default_timeout=120)
+    at.run()
+    at.text_input[0].input(username)
+    at.text_input[1].input('bench123')
+    at.button[0].click()
+    at.run()
+    return at
+
+
+def _rerun_timings(at, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(label, at, timings):
+    assert not at.exception, at.exception
+    elements, widgets, payload = _page_size(at)
+    print(f"{label:<18} 재실행 중앙값 {statistics.median(timings) * 1000:8.1f}ms, 최대 {max(timings) * 1000:8.1f}ms, "
+          f"요소 {elements:4d}개 (위젯 {widgets:3d}개), 전송 {payload / 1024:7.1f}KB")
+
+
+def bench_teacher(app, subject, repeat):
+    at = _login(app, 'teacher')
+    [s for s in at.selectbox if s.label == "과목을 선택하세요"][0].select(subject)
+    at.run()
+    _report(f"교사 정답 입력({subject})", at, _rerun_timings(at, repeat))
+
+
+def bench_student(app, subject, repeat):
+    at = _login(app, 'student1')
+    [b for b in at.button if b.label == "탐구 과목 저장"][0].click()
+    at.run()
+    [s for s in at.selectbox if s.label == "과목을 선택하세요"][0].select(subject)
+    at.run()
+    _report(f"학생 답안 입력({subject})", at, _rerun_timings(at, repeat))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='정답/답안 입력 화면의 재실행 지연과 전송 크기를 측정합니다.')
+    parser.add_argument('--app', default=os.path.join(REPO_DIR, 'app.py'))
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = os.path.abspath(args.app)
+    with tempfile.TemporaryDirectory() as directory:
+        _write_config(directory)
+        write_csv(generate(args.students, 1), os.path.join(directory, 'data'))
+        os.chdir(directory)
+        for subject in ["국어", "한국사"]:
+            bench_teacher(app, subject, args.repeat)
+            bench_student(app, subject, args.repeat)
@@ -0,0 +1,177 @@
+"""화면별 주요 경로의 지연(중앙값/p95)과 최대 메모리 측정
+
+합성 데이터(benchmarks.synthetic)로 저장소를 채운 뒤 다음 경로를 반복 실행한다.
+    key_save         교사 정답 저장 (요약 재계산 포함)
+    submission       학생 답안 제출 (응답 저장 + 요약 증분 갱신)
+    instant_grading  제출 직후 즉시 채점
+    tab2_grading     채점 결과 확인 탭 (학생별 결과, 문항별 정답률, 선택지 분포)
+    tab3_statistics  통계 분석 탭
+    tab4_filter      학생 정답 확인 탭 필터
+
+기본값은 매 반복 전에 공유 캐시를 비우는 최악의 경우(다른 세션이 방금 저장한 직후의 재실행)이며,
+--warm 이면 캐시를 유지한다. 최대 메모리는 tracemalloc 으로 잰 파이썬/NumPy 할당량이다.
+--output 으로 결과를 JSON 으로 저장하고 --baseline 으로 이전 결과와 비교할 수 있다.
+
+    python -m benchmarks.bench_hotpaths --students 5000 --output before.json
+    python -m benchmarks.bench_hotpaths --students 5000 --baseline before.json
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+from benchmarks.synthetic import generate, write_csv
+from grading import get_compiled_key, grade_submission, invalidate_compiled_key
+from response_matrix import load_matrix, invalidate_matrix
+from storage import CsvStorage, ParquetStorage, SqliteStorage, convert_csv_to_parquet, migrate_csv_to_sqlite
+from summary import (question_accuracy, rebuild, record_answer_key, record_submission, student_results,
+                     summary_statistics)
+
+
+def _prepare(data_dir, backend, num_students, num_rounds, seed):
+    tables = generate(num_students, num_rounds, seed)
+    write_csv(tables, data_dir)
+    if backend == 'sqlite':
+        migrate_csv_to_sqlite(data_dir)
+        storage = SqliteStorage(data_dir=data_dir)
+    elif backend == 'parquet':
+        convert_csv_to_parquet(data_dir)
+        storage = ParquetStorage(data_dir)
+    else:
+        storage = CsvStorage(data_dir)
+    storage.initialize()
+    rebuild(storage)
+    return storage, tables
+
+
+def _clear_caches():
+    data_cache.clear()
+    invalidate_matrix()
+    invalidate_compiled_key()
+
+
+# 경로별 실행 함수 (인자: 반복 번호). 반복마다 다른 학생/회차/과목을 사용
+def _hot_paths(storage, tables, seed):
+    rng = np.random.default_rng(seed)
+    answers = tables['answers']
+    partitions = answers[['회차', '과목']].drop_duplicates().to_numpy().tolist()
+    core = [(r, s) for r, s in partitions if s in ('국어', '수학', '영어', '한국사')]
+    student_ids = tables['responses']['학생ID'].unique()
+    keys = {(r, s): df for (r, s), df in answers.groupby(['회차', '과목'])}
+
+    def key_save(i):
+        exam_round, subject = partitions[i % len(partitions)]
+        record_answer_key(storage, exam_round, subject, keys[(exam_round, subject)])
+
+    def _submission_answers(i):
+        exam_round, subject = core[i % len(core)]
+        num_questions = len(keys[(exam_round, subject)])
+        return exam_round, subject, [str(v) for v in rng.integers(1, 6, num_questions)]
+
+    def submission(i):
+        exam_round, subject, submitted = _submission_answers(i)
+        student_id = student_ids[i % len(student_ids)]
+        rows = pd.DataFrame({
+            '학생ID': student_id, '회차': exam_round, '과목': subject,
+            '문항번호': range(1, len(submitted) + 1), '입력답': submitted,
+        })
+        record_submission(storage, student_id, exam_round, subject, rows)
+
+    def instant_grading(i):
+        exam_round, subject, submitted = _submission_answers(i)
+        grade_submission(get_compiled_key(storage, exam_round, subject), submitted)
+
+    def tab2_grading(i):
+        exam_round, subject = core[i % len(core)]
+        partition = {'회차': exam_round, '과목': subject}
+        student_results(storage.read('score_summary', where=partition))
+        question_accuracy(storage.read('question_summary', where=partition), storage.read('answers', where=partition))
+        load_matrix(storage, exam_round, subject).choice_distribution()
+
+    def tab3_statistics(i):
+        summary_statistics(storage.read('score_summary'))
+
+    def tab4_filter(i):
+        exam_round, subject = core[i % len(core)]
+        df = storage.read('student_answers')
+        df[(df['회차'] == exam_round) & (df['과목'] == subject)]
+
+    return {
+        'key_save': key_save,
+        'submission': submission,
+        'instant_grading': instant_grading,
+        'tab2_grading': tab2_grading,
+        'tab3_statistics': tab3_statistics,
+        'tab4_filter': tab4_filter,
+    }
+
+
+def measure(run, repeat, warm):
+    timings = []
+    for i in range(repeat):
+        if not warm:
+            _clear_caches()
+        start = time.perf_counter()
+        run(i)
+        timings.append(time.perf_counter() - start)
+    # 시간 측정과 분리하여 한 번 더 실행하며 최대 메모리 측정 (tracemalloc 은 실행을 느리게 함)
+    if not warm:
+        _clear_caches()
+    tracemalloc.start()
+    run(repeat)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'median_ms': float(np.median(timings) * 1000),
+        'p95_ms': float(np.percentile(timings, 95) * 1000),
+        'peak_mb': peak / 2**20,
+    }
+
+
+def report(results, baseline=None):
+    print(f"{'경로':<16} {'중앙값(ms)':>11} {'p95(ms)':>10} {'최대 메모리(MB)':>15}" + (f" {'중앙값 변화':>11}" if baseline else ""))
+    for name, result in results.items():
+        line = f"{name:<16} {result['median_ms']:>11.2f} {result['p95_ms']:>10.2f} {result['peak_mb']:>15.2f}"
+        if baseline and name in baseline:
+            change = result['median_ms'] / baseline[name]['median_ms'] - 1
+            line += f" {change:>+10.0%}"
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='화면별 주요 경로의 지연과 최대 메모리를 측정합니다.')
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--backend', choices=['csv', 'sqlite', 'parquet'], default='csv')
+    parser.add_argument('--warm', action='store_true', help='반복 사이에 캐시를 비우지 않음')
+    parser.add_argument('--paths', nargs='*', help='측정할 경로 (기본값: 전체)')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON 파일')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        start = time.perf_counter()
+        storage, tables = _prepare(data_dir, args.backend, args.students, args.rounds, args.seed)
+        print(f"데이터 준비 {time.perf_counter() - start:.1f}s: "
+              + ", ".join(f"{table} {len(df)}행" for table, df in tables.items()))
+        paths = _hot_paths(storage, tables, args.seed)
+        results = {
+            name: measure(run, args.repeat, args.warm)
+            for name, run in paths.items() if not args.paths or name in args.paths
+        }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    report(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, ensure_ascii=False, indent=2)
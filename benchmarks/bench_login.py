@@ -0,0 +1,91 @@
+"""계정 수별 재실행마다의 인증 준비 시간과 명단 일괄 등록의 비밀번호 해시 처리량
+
+    기존 방식  재실행마다 config.yaml 파싱 + Authenticate 생성 (모든 계정을 훑음, 평문이면 계정마다 bcrypt 해시 추가)
+    저장소     credentials.load_config() (파일이 그대로이면 stat 한 번) + make_authenticator()
+    로그인     입력한 비밀번호 하나의 bcrypt 검사 (계정 수와 무관)
+
+    python -m benchmarks.bench_login --accounts 20 1500 5000 --hash 64 --workers 1 2 4
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import bcrypt
+import streamlit_authenticator as stauth
+import yaml
+from yaml.loader import SafeLoader
+
+import credentials
+
+# 합성 계정의 해시 비용 (실제 계정은 bcrypt 기본값 12)
+BENCH_ROUNDS = 4
+
+
+def _write_config(path, num_accounts):
+    password = bcrypt.hashpw(b'student123', bcrypt.gensalt(BENCH_ROUNDS)).decode()
+    users = {f"student{i}": {'email': f"student{i}@example.com", 'name': f"학생{i}", 'password': password}
+             for i in range(1, num_accounts + 1)}
+    config = {'credentials': {'usernames': users},
+              'cookie': {'expiry_days': 30, 'key': 'bench_key', 'name': 'bench_cookie'}}
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.dump(config, f, allow_unicode=True)
+
+
+def _median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def _legacy(path):
+    with open(path) as file:
+        config = yaml.load(file, Loader=SafeLoader)
+    stauth.Authenticate(config['credentials'], config['cookie']['name'], config['cookie']['key'],
+                        config['cookie']['expiry_days'])
+
+
+def _store(path):
+    credentials.make_authenticator(credentials.load_config(path))
+
+
+def run_login(accounts_list, repeat):
+    with tempfile.TemporaryDirectory() as directory:
+        for num_accounts in accounts_list:
+            path = os.path.join(directory, f"config_{num_accounts}.yaml")
+            _write_config(path, num_accounts)
+            credentials.load_config(path)
+            legacy = _median_ms(lambda: _legacy(path), repeat)
+            store = _median_ms(lambda: _store(path), repeat)
+            users = credentials.load_config(path)['credentials']['usernames']
+            check = _median_ms(lambda: bcrypt.checkpw(b'student123', users['student1']['password'].encode()), repeat)
+            print(f"계정 {num_accounts:6,d}개: 기존 방식 {legacy:8.2f}ms, 저장소 {store:6.2f}ms, 로그인 검사 {check:6.2f}ms")
+
+
+def run_hash(num_passwords, workers_list):
+    passwords = [f"password{i}" for i in range(num_passwords)]
+    baseline = None
+    for workers in workers_list:
+        start = time.perf_counter()
+        credentials.hash_passwords(passwords, workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"비밀번호 {num_passwords}개 해시, 프로세스 {workers}개: {elapsed:6.2f}s "
+              f"(개당 {elapsed / num_passwords * 1000:5.0f}ms, 속도 향상 {baseline / elapsed:4.2f}배)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--accounts', type=int, nargs='+', default=[20, 1_500, 5_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--hash', type=int, default=32, help='해시할 비밀번호 수 (0 이면 생략)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+    print(f"CPU {os.cpu_count()}개")
+    run_login(args.accounts, args.repeat)
+    if args.hash:
+        run_hash(args.hash, sorted(set(args.workers)))
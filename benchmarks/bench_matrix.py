@@ -0,0 +1,54 @@
+"""(회차, 과목) 응답 행렬 표현의 메모리/채점 시간 비교: 긴 형식 object DataFrame 대비"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from grading import grade_responses, summarize_students
+from response_matrix import build_matrix
+
+
+def make_cohort(num_students, num_questions=45, seed=0):
+    rng = np.random.default_rng(seed)
+    answers = pd.DataFrame({'회차': '1차', '과목': '국어', '문항번호': np.arange(1, num_questions + 1),
+                            '정답': rng.integers(1, 6, size=num_questions).astype(str), '배점': 2})
+    responses = pd.DataFrame({
+        '학생ID': np.repeat([f"student{i}" for i in range(num_students)], num_questions),
+        '회차': '1차',
+        '과목': '국어',
+        '문항번호': np.tile(np.arange(1, num_questions + 1), num_students),
+        '입력답': rng.integers(1, 6, size=num_students * num_questions).astype(str),
+    })
+    return responses, answers
+
+
+def _best(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def run(sizes, repeat):
+    print(f"{'학생 수':>8} | {'DataFrame MB':>12} {'행렬 MB':>9} | {'조인 채점 ms':>11} {'행렬 적재 ms':>11} {'행렬 채점 ms':>11}")
+    for size in sizes:
+        responses, answers = make_cohort(size)
+        frame_mb = responses.memory_usage(deep=True).sum() / 2 ** 20
+        matrix = build_matrix(responses, answers)
+        matrix_mb = (matrix.choices.nbytes + matrix.answers.nbytes + matrix.points.nbytes) / 2 ** 20
+        joined = _best(lambda: summarize_students(grade_responses(responses, answers)), repeat)
+        load = _best(lambda: build_matrix(responses, answers), repeat)
+        grade = _best(lambda: (matrix.student_results(), matrix.question_accuracy(), matrix.choice_distribution()), repeat)
+        print(f"{size:>8,} | {frame_mb:>12.2f} {matrix_mb:>9.3f} | {joined:>11.1f} {load:>11.1f} {grade:>11.1f}")
+    print("행렬 MB 는 학생ID 목록을 제외한 응답/정답/배점 배열 크기")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[300, 3_000, 30_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,121 @@
+"""학교/반 분할의 요청당 비용: 학교 전체가 저장소 하나를 쓸 때 vs 반마다 저장소를 쓸 때
+
+반 크기는 고정하고 반 수(학교 크기)를 늘리며, 다른 반 학생이 방금 제출한 직후의 요청 시간을 잰다.
+저장소 하나를 쓰면 다른 반의 제출이 같은 파일을 바꾸므로 공유 캐시가 무효화되어 학교 전체를 다시 읽고,
+반마다 저장소를 쓰면 자기 반 파일만 읽는다.
+    submission        다른 반 학생의 답안 제출 (응답 저장 + 요약 증분 갱신)
+    teacher_results   그 직후 교사의 채점 결과 화면 (자기 반 (회차, 과목) 요약, 문항별 정답률, 문항 분석)
+    teacher_answers   그 직후 교사의 학생 정답 확인 화면
+
+    python -m benchmarks.bench_partitions --classes 10 40 --class-size 30 --backend csv
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate, write_csv
+from item_analysis import item_analysis
+from storage import CsvStorage, ParquetStorage, SqliteStorage, convert_csv_to_parquet, migrate_csv_to_sqlite
+from summary import question_accuracy, rebuild, record_submission, student_results
+
+EXAM_ROUND, SUBJECT = '1차', '국어'
+
+
+def _open(data_dir, backend, tables):
+    write_csv(tables, data_dir)
+    if backend == 'sqlite':
+        migrate_csv_to_sqlite(data_dir)
+        storage = SqliteStorage(data_dir=data_dir)
+    elif backend == 'parquet':
+        convert_csv_to_parquet(data_dir)
+        storage = ParquetStorage(data_dir)
+    else:
+        storage = CsvStorage(data_dir)
+    storage.initialize()
+    rebuild(storage)
+    return storage
+
+
+# 학생을 반 크기만큼 차례로 나눈 반별 테이블 (정답은 모든 반에 같은 것)
+def _split(tables, num_classes, class_size):
+    student_ids = tables['student_subjects']['학생ID'].unique()
+    split = []
+    for k in range(num_classes):
+        members = set(student_ids[k * class_size:(k + 1) * class_size])
+        split.append({
+            table: df if table == 'answers' else df[df['학생ID'].isin(members)]
+            for table, df in tables.items()
+        })
+    return split
+
+
+def _requests(storages, class_size, seed):
+    rng = np.random.default_rng(seed)
+    num_classes = len(storages)
+    key = storages[0].read('answers', where={'회차': EXAM_ROUND, '과목': SUBJECT})
+
+    # 반 k 의 저장소 (저장소가 하나면 모든 반이 같은 저장소)
+    def storage_of(k):
+        return storages[k % len(storages)]
+
+    def submission(i):
+        k = (i + 1) % num_classes
+        rows = pd.DataFrame({
+            '학생ID': f"student{k * class_size + i % class_size + 1}", '회차': EXAM_ROUND, '과목': SUBJECT,
+            '문항번호': range(1, len(key) + 1), '입력답': rng.integers(1, 6, len(key)).astype(str),
+        })
+        record_submission(storage_of(k), rows['학생ID'].iloc[0], EXAM_ROUND, SUBJECT, rows)
+
+    def teacher_results(i):
+        storage = storage_of(i % num_classes)
+        partition = {'회차': EXAM_ROUND, '과목': SUBJECT}
+        student_results(storage.read('score_summary', where=partition))
+        question_accuracy(storage.read('question_summary', where=partition), storage.read('answers', where=partition))
+        item_analysis(storage, EXAM_ROUND, SUBJECT)
+
+    def teacher_answers(i):
+        df = storage_of(i % num_classes).read('student_answers')
+        df[(df['회차'] == EXAM_ROUND) & (df['과목'] == SUBJECT)]
+
+    return submission, teacher_results, teacher_answers
+
+
+def run(classes_list, class_size, backend, repeat, seed=0):
+    print(f"{'반 수':>5} {'학생 수':>7} {'저장소':<10} {'submission':>12} {'teacher_results':>16} {'teacher_answers':>16}  (중앙값 ms)")
+    for num_classes in classes_list:
+        tables = generate(num_classes * class_size, 1, seed)
+        with tempfile.TemporaryDirectory() as data_dir:
+            layouts = {
+                '학교 하나': [_open(os.path.join(data_dir, 'school'), backend, tables)],
+                '반마다': [_open(os.path.join(data_dir, 'classes', str(k)), backend, class_tables)
+                         for k, class_tables in enumerate(_split(tables, num_classes, class_size))],
+            }
+            for name, storages in layouts.items():
+                submission, teacher_results, teacher_answers = _requests(storages, class_size, seed)
+                timings = {'submission': [], 'teacher_results': [], 'teacher_answers': []}
+                for i in range(repeat):
+                    # 다른 반의 제출 직후 교사 화면 (저장소 하나면 학교 전체 파일이 바뀐 상태)
+                    for label, func in [('submission', submission), ('teacher_results', teacher_results),
+                                        ('submission', lambda i: submission(i + repeat)),
+                                        ('teacher_answers', teacher_answers)]:
+                        start = time.perf_counter()
+                        func(i)
+                        timings[label].append(time.perf_counter() - start)
+                medians = {label: statistics.median(values) * 1000 for label, values in timings.items()}
+                print(f"{num_classes:>5} {num_classes * class_size:>7,} {name:<10} {medians['submission']:>12.1f} "
+                      f"{medians['teacher_results']:>16.1f} {medians['teacher_answers']:>16.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--classes', type=int, nargs='+', default=[10, 40, 160])
+    parser.add_argument('--class-size', type=int, default=30)
+    parser.add_argument('--backend', choices=['csv', 'sqlite', 'parquet'], default='csv')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    run(args.classes, args.class_size, args.backend, args.repeat)
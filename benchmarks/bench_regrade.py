@@ -0,0 +1,86 @@
+"""정답 수정(복수 정답 추가, 배점 정정) 후 다시 채점하는 시간: 바뀐 문항만 다시 채점 vs 부분 전체 다시 채점
+
+    변경 문항만  summary.record_answer_key() (바뀐 문항의 응답만 읽어 점수 차이를 더함, 버전 기록 포함)
+                 행렬 없음: 바뀐 문항의 응답을 저장소에서 읽음 / 행렬 있음: 캐시된 응답 행렬의 열을 사용
+    부분 전체    정답 교체 후 (회차, 과목)의 모든 응답으로 요약을 다시 계산하는 방식 (비교용)
+
+    python -m benchmarks.bench_regrade --students 1000 5000 20000 --backend sqlite --questions 1 3
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import summary
+from benchmarks.bench_hotpaths import _prepare
+from grading import invalidate_compiled_key
+from response_matrix import invalidate_matrix, load_matrix
+
+EXAM_ROUND, SUBJECT = '1차', '국어'
+
+
+def _full_regrade(storage, rows):
+    with summary._lock:
+        storage.replace('answers', {'회차': EXAM_ROUND, '과목': SUBJECT}, rows)
+        invalidate_compiled_key(EXAM_ROUND, SUBJECT)
+        invalidate_matrix(EXAM_ROUND, SUBJECT)
+        summary._rebuild_partition(storage, EXAM_ROUND, SUBJECT)
+
+
+# 반복마다 서로 다른 문항 num_questions 개에 복수 정답을 추가한 정답
+def _edited_keys(key, num_questions, repeat):
+    keys = []
+    for i in range(repeat):
+        edited = key.copy()
+        edited['정답'] = edited['정답'].astype(str)
+        questions = [(i * num_questions + k) % len(key) + 1 for k in range(num_questions)]
+        rows = edited['문항번호'].isin(questions)
+        edited.loc[rows, '정답'] = edited.loc[rows, '정답'] + '/' + (edited.loc[rows, '정답'].astype(int) % 5 + 1).astype(str)
+        keys.append(edited)
+    return keys
+
+
+def _median_ms(func, args_list):
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def run(students_list, backend, questions_list, repeat):
+    for students in students_list:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage, tables = _prepare(data_dir, backend, students, 1, 0)
+            key = storage.read('answers', where={'회차': EXAM_ROUND, '과목': SUBJECT})
+            responses = len(storage.read('responses', where={'회차': EXAM_ROUND, '과목': SUBJECT}))
+            for num_questions in questions_list:
+                edits = _edited_keys(key, num_questions, repeat)
+                results = []
+
+                def incremental_regrade(rows, cached):
+                    if not cached:
+                        invalidate_matrix(EXAM_ROUND, SUBJECT)
+                    results.append(summary.record_answer_key(storage, EXAM_ROUND, SUBJECT, rows))
+
+                uncached = _median_ms(incremental_regrade, [(rows, False) for rows in edits])
+                load_matrix(storage, EXAM_ROUND, SUBJECT)
+                cached = _median_ms(incremental_regrade, [(rows, True) for rows in reversed(edits)])
+                full = _median_ms(lambda rows: _full_regrade(storage, rows), [(key,), (edits[0],), (key,)])
+                storage.replace('answers', {'회차': EXAM_ROUND, '과목': SUBJECT}, key)
+                summary.refresh_partition(storage, EXAM_ROUND, SUBJECT)
+                affected = statistics.median(result.responses for result in results)
+                print(f"학생 {students:7,d}명 (응답 {responses:9,d}개), 문항 {num_questions}개 변경 "
+                      f"(다시 채점한 응답 {affected:7,.0f}개): 변경 문항만 {uncached:8.1f}ms (행렬 있음 {cached:8.1f}ms), "
+                      f"부분 전체 {full:8.1f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, nargs='+', default=[1_000, 5_000, 20_000])
+    parser.add_argument('--backend', choices=['csv', 'sqlite', 'parquet'], default='sqlite')
+    parser.add_argument('--questions', type=int, nargs='+', default=[1, 3])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.students, args.backend, args.questions, args.repeat)
@@ -0,0 +1,115 @@
+"""정답 저장/답안 제출 경로 지연 측정: answers.csv, responses.csv 크기가 커져도 저장 지연이 일정한지 확인"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from storage import CsvStorage, SqliteStorage, TABLES
+
+
+# 기존 방식: 문항마다 pd.concat 후 파일 전체를 다시 씀
+def legacy_save(path, where, rows):
+    df = pd.read_csv(path)
+    mask = pd.Series(True, index=df.index)
+    for column, value in where.items():
+        mask &= df[column] == value
+    df = df[~mask]
+    for row in rows.to_dict('records'):
+        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+    df.to_csv(path, index=False)
+
+
+# 행 수가 num_rows 인 answers/responses 생성 (answers 는 가상의 회차를 늘려 크기를 맞춤)
+def make_tables(num_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    num_keys = max(1, num_rows // 45)
+    answers = pd.DataFrame({
+        '회차': np.repeat([f"R{k // 17}" for k in range(num_keys)], 45),
+        '과목': np.repeat([f"과목{k % 17}" for k in range(num_keys)], 45),
+        '문항번호': np.tile(np.arange(1, 46), num_keys),
+        '정답': rng.integers(1, 6, size=num_keys * 45),
+        '배점': 2,
+    })
+    responses = pd.DataFrame({
+        '학생ID': np.repeat([f"s{k // 6}" for k in range(num_keys)], 45),
+        '회차': '1차',
+        '과목': np.repeat([f"과목{k % 6}" for k in range(num_keys)], 45),
+        '문항번호': np.tile(np.arange(1, 46), num_keys),
+        '입력답': rng.integers(1, 6, size=num_keys * 45),
+    })
+    return answers, responses
+
+
+def answer_key(round_name):
+    return pd.DataFrame({'회차': round_name, '과목': '국어', '문항번호': range(1, 46),
+                         '정답': [str(q % 5 + 1) for q in range(1, 46)], '배점': 2})
+
+
+def submission(student_id):
+    return pd.DataFrame({'학생ID': student_id, '회차': '1차', '과목': '국어', '문항번호': range(1, 46),
+                         '입력답': [str(q % 5 + 1) for q in range(1, 46)]})
+
+
+def _median_ms(func, repeat):
+    timings = []
+    for k in range(repeat):
+        start = time.perf_counter()
+        func(k)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def run(sizes, repeat):
+    header = f"{'행 수':>9} | {'기존(정답)':>10} {'기존(답안)':>10} | {'CSV 신규':>9} {'CSV 재제출':>10} | {'SQLite 신규':>11} {'SQLite 재제출':>12}"
+    print(header + '   (중앙값, ms)')
+    for size in sizes:
+        answers, responses = make_tables(size)
+        with tempfile.TemporaryDirectory() as data_dir:
+            csv = CsvStorage(data_dir)
+            csv.initialize()
+            answers.to_csv(csv.path('answers'), index=False)
+            responses.to_csv(csv.path('responses'), index=False)
+            sqlite = SqliteStorage(data_dir=data_dir)
+            sqlite.initialize()
+            for table, df in (('answers', answers), ('responses', responses)):
+                for _, chunk in df.groupby(['회차', '과목'] if table == 'answers' else ['학생ID', '과목']):
+                    where = {c: chunk[c].iloc[0] for c in (['회차', '과목'] if table == 'answers' else ['학생ID', '회차', '과목'])}
+                    sqlite.replace(table, where, chunk[TABLES[table]])
+
+            legacy_dir = os.path.join(data_dir, 'legacy')
+            os.makedirs(legacy_dir)
+            legacy_answers = os.path.join(legacy_dir, 'answers.csv')
+            legacy_responses = os.path.join(legacy_dir, 'responses.csv')
+            answers.to_csv(legacy_answers, index=False)
+            responses.to_csv(legacy_responses, index=False)
+
+            legacy_key = _median_ms(
+                lambda k: legacy_save(legacy_answers, {'회차': f"new{k}", '과목': '국어'}, answer_key(f"new{k}")), repeat)
+            legacy_submit = _median_ms(
+                lambda k: legacy_save(legacy_responses, {'학생ID': f"new{k}", '회차': '1차', '과목': '국어'},
+                                      submission(f"new{k}")), repeat)
+
+            csv.read('responses')
+            results = []
+            for storage in (csv, sqlite):
+                # 처음 제출하는 학생 / 같은 학생의 재제출
+                results.append(_median_ms(
+                    lambda k: storage.replace('responses', {'학생ID': f"new{k}", '회차': '1차', '과목': '국어'},
+                                              submission(f"new{k}")), repeat))
+                results.append(_median_ms(
+                    lambda k: storage.replace('responses', {'학생ID': 's0', '회차': '1차', '과목': '국어'},
+                                              submission('s0')), repeat))
+        print(f"{size:>9,} | {legacy_key:>10.1f} {legacy_submit:>10.1f} | {results[0]:>9.1f} {results[1]:>10.1f} | "
+              f"{results[2]:>11.1f} {results[3]:>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 200_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,52 @@
+"""점수 색인(score_index) 응시 인원별 제출 한 건의 갱신/조회 비용과, 매번 전체 정렬하는 방식과의 비교
+
+    python -m benchmarks.bench_score_index --students 1000 10000 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from score_index import ScoreIndex
+
+
+# 매 제출마다 전체 점수에서 순위를 다시 세는 방식 (비교용)
+def _naive_rank(scores, score):
+    values = np.sort(np.fromiter(scores.values(), dtype=float))
+    below = np.searchsorted(values, score, side='left')
+    equal = np.searchsorted(values, score, side='right') - below
+    return len(values) - below - equal + 1, (below + equal / 2) / len(values) * 100
+
+
+def run(students_list, operations):
+    rng = np.random.default_rng(0)
+    for students in students_list:
+        scores = {f"s{i:06d}": float(s) for i, s in enumerate(rng.integers(0, 101, students))}
+        start = time.perf_counter()
+        index = ScoreIndex('국어', scores)
+        build = time.perf_counter() - start
+
+        updates = [(f"s{rng.integers(0, students):06d}", float(rng.integers(0, 101))) for _ in range(operations)]
+        start = time.perf_counter()
+        for student_id, score in updates:
+            index.standing(score, student_id)
+            index.set(student_id, score)
+        indexed = (time.perf_counter() - start) / operations
+
+        naive_operations = max(1, min(operations, 2_000_000 // students))
+        start = time.perf_counter()
+        for student_id, score in updates[:naive_operations]:
+            scores[student_id] = score
+            _naive_rank(scores, score)
+        naive = (time.perf_counter() - start) / naive_operations
+
+        print(f"응시 {students:8,d}명: 색인 생성 {build * 1000:8.1f}ms, "
+              f"제출당 색인 {indexed * 1e6:7.1f}µs, 전체 정렬 {naive * 1e6:10.1f}µs ({naive / indexed:6.0f}배)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--operations', type=int, default=5_000)
+    args = parser.parse_args()
+    run(args.students, args.operations)
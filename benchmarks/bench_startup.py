@@ -0,0 +1,103 @@
+"""앱 첫 실행(콜드 스타트) 시간과 화면별로 불러오는 모듈의 import 시간 예산 확인
+
+경로마다 새 파이썬 프로세스에서 python -X importtime 으로 AppTest 를 실행하여, streamlit 자체를 불러온 뒤
+그 경로가 처음 불러온 최상위 모듈과 import 누적 시간을 잰다.
+    학생      로그인 → 답안 입력 화면 (plotly 를 불러오면 안 됨)
+    교사      로그인 → 통계 분석 화면 (차트를 그리므로 plotly 를 불러옴)
+학생 경로가 plotly 를 불러오거나 import 시간이 --budget-ms 를 넘으면 종료 코드 1 로 끝난다.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --budget-ms 1500 --app /path/to/other/app.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_forms import REPO_DIR, _write_config
+from benchmarks.synthetic import generate, write_csv
+
+# 학생 로그인부터 답안 입력 화면까지의 import 시간 예산 (streamlit 자체 제외, ms)
+DEFAULT_BUDGET_MS = 1500
+# 학생 경로에서 불러오면 안 되는 모듈
+STUDENT_FORBIDDEN = ['plotly']
+MARKER = '--- scenario ---'
+
+_SCENARIO = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+sys.stderr.write({marker!r} + '\\n')
+start = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=300)
+at.run()
+first_render = time.perf_counter() - start
+at.text_input[0].input({username!r}); at.text_input[1].input('bench123'); at.button[0].click(); at.run()
+{steps}
+assert not at.exception, [e.value for e in at.exception]
+print(json.dumps({{'first_render': first_render, 'total': time.perf_counter() - start,
+                  'subheaders': [s.value for s in at.subheader]}}))
+"""
+
+SCENARIOS = {
+    '학생 답안 입력': ('student1', ''),
+    '교사 통계 분석': ('teacher', "at.radio(key='teacher_section').set_value('통계 분석'); at.run()"),
+}
+
+
+# importtime 출력에서 MARKER 뒤에 처음 불러온 최상위 모듈별 누적 시간(ms)
+def _top_level_imports(stderr):
+    lines = stderr.split(MARKER, 1)[-1].splitlines()
+    imports = {}
+    for line in lines:
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if name.startswith(' ') and not name.startswith('  '):
+            imports[name.strip()] = imports.get(name.strip(), 0) + int(cumulative) / 1000
+    return imports
+
+
+def run_scenario(app, directory, username, steps):
+    code = _SCENARIO.format(marker=MARKER, app=app, username=username, steps=steps)
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, DATA_DIR=os.path.join(directory, 'data'))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=directory, env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, _top_level_imports(result.stderr)
+
+
+def run(app, students, budget_ms, top):
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        _write_config(directory)
+        write_csv(generate(students, 1), os.path.join(directory, 'data'))
+        for name, (username, steps) in SCENARIOS.items():
+            timings, imports = run_scenario(app, directory, username, steps)
+            total_ms = sum(imports.values())
+            print(f"{name}: 첫 화면 {timings['first_render']:.2f}s, 화면까지 {timings['total']:.2f}s, "
+                  f"import {total_ms:.0f}ms (모듈 {len(imports)}개)")
+            for module, ms in sorted(imports.items(), key=lambda item: -item[1])[:top]:
+                print(f"    {ms:8.1f}ms  {module}")
+            if username == 'student1':
+                loaded = [m for m in STUDENT_FORBIDDEN if any(i == m or i.startswith(m + '.') for i in imports)]
+                if loaded:
+                    failures.append(f"{name}: {', '.join(loaded)} 를 불러옴")
+                if total_ms > budget_ms:
+                    failures.append(f"{name}: import {total_ms:.0f}ms > 예산 {budget_ms}ms")
+    for failure in failures:
+        print(f"예산 초과 - {failure}")
+    return not failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--app', default=os.path.join(REPO_DIR, 'app.py'))
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=8, help='경로별로 보여 줄 느린 모듈 수')
+    args = parser.parse_args()
+    sys.exit(0 if run(os.path.abspath(args.app), args.students, args.budget_ms, args.top) else 1)
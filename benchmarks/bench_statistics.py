@@ -0,0 +1,58 @@
+"""조인 기반 기준선 집계(grading.aggregate_statistics) 성능 측정: 응답 행 수에 대해 선형으로 증가하는지 확인
+
+화면의 통계 분석 탭은 summary.summary_statistics 로 요약 테이블을 집계하며, 이 스크립트는 그 이전 경로의 기준선이다.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from grading import aggregate_statistics
+
+ROUNDS = ["1차", "2차", "3차", "4차"]
+SUBJECTS = {"국어": 45, "수학": 30, "영어": 45, "한국사": 20, "물리학": 20, "생활과 윤리": 20}
+
+
+# 응답 행 수가 대략 num_rows 가 되도록 합성 정답/응답 데이터 생성
+def make_data(num_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    answers = pd.DataFrame(
+        [
+            {'회차': r, '과목': s, '문항번호': q, '정답': int(rng.integers(1, 6)), '배점': 2}
+            for r in ROUNDS for s, n in SUBJECTS.items() for q in range(1, n + 1)
+        ]
+    )
+    questions_per_student = sum(SUBJECTS.values()) * len(ROUNDS)
+    num_students = max(1, num_rows // questions_per_student)
+    student_ids = np.array([f"student{i}" for i in range(num_students)])
+    keys = answers[['회차', '과목', '문항번호']]
+    responses = pd.DataFrame({
+        '학생ID': np.repeat(student_ids, len(keys)),
+        '회차': np.tile(keys['회차'].to_numpy(), num_students),
+        '과목': np.tile(keys['과목'].to_numpy(), num_students),
+        '문항번호': np.tile(keys['문항번호'].to_numpy(), num_students),
+        '입력답': rng.integers(1, 6, size=num_students * len(keys)).astype(str),
+    })
+    return responses, answers
+
+
+def run(sizes, repeat):
+    print(f"{'응답 행 수':>12} {'최소(초)':>10} {'행당(µs)':>10}")
+    for size in sizes:
+        responses, answers = make_data(size)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            aggregate_statistics(responses, answers)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(f"{len(responses):>12,} {best:>10.3f} {best / len(responses) * 1e6:>10.3f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[125_000, 250_000, 500_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,57 @@
+"""내 성적 추이: 전체 학생 수별 학생 한 명의 성적 이력 조회 시간
+
+    색인 조회  student_history/repeated_wrong (학생 이력 색인에 있는 경우, 화면 재실행마다의 비용)
+    첫 조회    색인에 없는 학생의 응답만 읽어 채점 (프로세스에서 학생마다 한 번)
+    전체 채점  색인 없이 매번 전체 응답과 정답을 채점해 그 학생만 골라내는 방식 (비교용)
+
+    python -m benchmarks.bench_student_history --students 1000 5000 20000 --backend csv
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+import student_history
+from benchmarks.bench_hotpaths import _prepare
+from grading import grade_responses
+
+
+def _median_ms(func, args_list):
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def _full_grading(storage, student_id):
+    graded = grade_responses(storage.read('responses'), storage.read('answers'))
+    return graded[graded['학생ID'] == student_id]
+
+
+def run(students_list, rounds, backend, repeat):
+    rng = np.random.default_rng(0)
+    for students in students_list:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage, _ = _prepare(data_dir, backend, students, rounds, 0)
+            student_ids = [f"student{i + 1}" for i in rng.choice(students, min(repeat, students), replace=False)]
+            student_history.invalidate_history()
+            first = _median_ms(student_history.student_history, [(storage, s) for s in student_ids])
+            indexed = _median_ms(lambda s: (student_history.student_history(storage, s),
+                                            student_history.repeated_wrong(storage, s)),
+                                 [(s,) for s in student_ids])
+            full = _median_ms(_full_grading, [(storage, s) for s in student_ids[:3]])
+            print(f"학생 {students:7,d}명: 색인 조회 {indexed:7.2f}ms, 첫 조회 {first:8.2f}ms, 전체 채점 {full:9.1f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, nargs='+', default=[1_000, 5_000, 20_000])
+    parser.add_argument('--rounds', type=int, default=4)
+    parser.add_argument('--backend', choices=['csv', 'sqlite', 'parquet'], default='csv')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    run(args.students, args.rounds, args.backend, args.repeat)
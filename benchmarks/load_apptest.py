@@ -0,0 +1,351 @@
+"""시험 종료 직후 제출 폭주 재현: AppTest 로 app.py 를 실제 화면 흐름대로 여러 세션에서 동시에 실행하는 부하 시험
+
+임시 디렉토리에 config.yaml 과 data/ 를 새로 만들고, 학생 세션 N명과 교사 세션 하나를 스레드로 동시에 실행한다.
+Streamlit 서버도 프로세스 하나에서 세션마다 스크립트 스레드를 돌리므로, 저장소 인스턴스와 캐시, 제출 대기열을
+모든 세션이 공유하는 실제 배포와 같은 조건이다. 네트워크 없이 실행된다.
+    학생  접속 → 로그인 → 탐구 과목 저장 → (과목 선택 → 답 문자열 입력 → 답안 제출) × 과목 수, 일부는 같은 과목 재제출
+    교사  로그인 뒤 학생들이 끝날 때까지 "채점 결과"(결과 확인)와 "통계 분석"을 번갈아 열고, 담당 반이 여럿이면 반을 바꿈
+단계마다 재실행 한 번의 지연(교사 화면은 화면 전환부터 결과 표시까지)을 재고, 끝난 뒤 디스크에서 새로 읽은 데이터로 검증한다.
+    분실  저장 완료가 표시된 제출인데 responses 에 없음
+    손상  responses 의 답이 마지막으로 저장 완료된 제출과 다름, 또는 제출하지 않은 학생의 행이 있음
+    요약  score_summary/question_summary 가 처음부터 다시 계산한 결과와 다른 행 수, 순위 색인이 어긋난 학생 수
+검증에 실패하면 종료 코드 1 을 돌려준다.
+
+    python -m benchmarks.load_apptest --students 60 --concurrency 20
+    python -m benchmarks.load_apptest --backend sqlite --classes 4 --subjects 3
+"""
+import argparse
+import os
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import bcrypt
+import numpy as np
+import pandas as pd
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner
+
+import credentials
+from benchmarks.bench_login import BENCH_ROUNDS
+from benchmarks.synthetic import _answer_key, subject_specs
+from partitions import partition_label
+from score_index import check_index
+from storage import CsvStorage, ParquetStorage, SqliteStorage, get_storage
+from subjects import CORE_SUBJECTS, short_answer_questions
+from submission_queue import get_submission_queue
+from summary import check_consistency, record_answer_key
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+EXAM_ROUND = '1차'
+SCHOOL = '부하고'
+PASSWORD = 'student123'
+TEACHER = 'loadteacher'
+SAVED_MESSAGE = "답안이 저장되었습니다!"
+STUDENT_STEPS = ['접속', '로그인', '탐구 과목 저장', '과목 선택', '답안 제출']
+TEACHER_STEPS = ['교사 로그인', '채점 결과', '통계 분석']
+
+
+class _PinnedInstance(type):
+    def __setattr__(cls, name, value):
+        if name != '_instance':
+            super().__setattr__(name, value)
+
+
+class _SharedRuntime(Runtime, metaclass=_PinnedInstance):
+    pass
+
+
+# AppTest 를 여러 스레드에서 동시에 돌리기 위한 준비 (streamlit 1.32 의 AppTest 구현 기준)
+# - AppTest.run() 은 실행할 때마다 전역 Runtime._instance 를 가짜 런타임으로 바꾸고 끝나면 None 으로 되돌리므로,
+#   먼저 끝난 세션이 다른 세션의 런타임을 지움. 가짜 런타임 하나를 모든 세션이 함께 쓰도록 고정
+# - 실행마다 새 ScriptCache 로 app.py 를 다시 컴파일하는데, 파이썬 3.11 은 여러 스레드가 동시에 컴파일하면
+#   "AST constructor recursion depth mismatch" 로 실패함. 서버처럼 컴파일한 스크립트를 모든 세션이 함께 씀
+def _share_runtime():
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    app_test.Runtime = _SharedRuntime
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+
+
+def _partitions(num_classes):
+    return [(SCHOOL, str(k + 1)) for k in range(num_classes)] or [None]
+
+
+# 학생 load1..N (반마다 차례로 배정), 모든 반을 맡은 교사 하나. 비밀번호 해시는 하나를 함께 씀
+def _write_config(num_students, partitions):
+    config = credentials._default_config()
+    config['cookie']['key'] = secrets.token_hex(32)
+    password = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(BENCH_ROUNDS)).decode()
+    users = config['credentials']['usernames']
+    users[TEACHER] = {'email': f"{TEACHER}@example.com", 'name': '부하 교사', 'password': password, 'role': 'teacher',
+                      **({'classes': [partition_label(p) for p in partitions]} if partitions[0] else {})}
+    for i in range(num_students):
+        partition = partitions[i % len(partitions)]
+        users[f"load{i + 1}"] = {'email': f"load{i + 1}@example.com", 'name': f"학생{i + 1}", 'password': password,
+                                 'role': 'student', **({'class': partition_label(partition)} if partition else {})}
+    credentials._write(config, credentials.CONFIG_PATH)
+
+
+# 반마다 핵심 과목 정답 저장 (모든 반에 같은 정답)
+def _seed_answers(partitions, rng):
+    specs = subject_specs(EXAM_ROUND)
+    for subject in CORE_SUBJECTS:
+        key = _answer_key(rng, EXAM_ROUND, subject, *specs[subject]).drop(columns='난이도')
+        for partition in partitions:
+            record_answer_key(get_storage(partition), EXAM_ROUND, subject, key)
+
+
+# 한 과목의 무작위 답 (선택형 1~5, 단답형 1~999, 약 5%는 빈 칸)
+def _random_answers(rng, subject):
+    num_questions = subject_specs(EXAM_ROUND)[subject][0]
+    short = set(short_answer_questions(EXAM_ROUND, subject))
+    return [None if rng.random() < 0.05 else str(rng.integers(1, 1000) if q in short else rng.integers(1, 6))
+            for q in range(1, num_questions + 1)]
+
+
+# 학생별 제출 목록 [(과목, 답 목록)]. 과목은 핵심 과목을 돌아가며, resubmit 비율만큼은 첫 과목을 다른 답으로 다시 제출
+def _plans(num_students, num_subjects, resubmit, rng):
+    plans = []
+    for i in range(num_students):
+        subjects = [CORE_SUBJECTS[(i + k) % len(CORE_SUBJECTS)] for k in range(num_subjects)]
+        plan = [(subject, _random_answers(rng, subject)) for subject in subjects]
+        if rng.random() < resubmit:
+            plan.append((subjects[0], _random_answers(rng, subjects[0])))
+        plans.append((f"load{i + 1}", plan))
+    return plans
+
+
+def _widget(elements, label):
+    return next(element for element in elements if element.label == label)
+
+
+# 재실행 한 번(또는 여러 번)의 지연을 기록하고, 예외나 오류 메시지가 나오면 문제 목록에 추가
+class _Session:
+    def __init__(self, name, timeout):
+        self.name = name
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.timings = defaultdict(list)
+        self.problems = []
+
+    def problem(self, label, message):
+        self.problems.append((label, self.name, str(message)[:200]))
+
+    # 위젯이 없거나(앞 화면이 실패) 재실행이 시간 안에 끝나지 않으면 실패로 기록하고 False
+    def step(self, label, *actions):
+        start = time.perf_counter()
+        try:
+            for action in actions:
+                action()
+                self.at.run()
+        except Exception as e:
+            self.problem(label, f"{type(e).__name__}: {e}")
+            return False
+        self.timings[label].append(time.perf_counter() - start)
+        messages = [e.value for e in self.at.exception] + [e.value for e in self.at.error]
+        if messages:
+            self.problem(label, messages[0])
+        return not messages
+
+    def login(self, label, username, header):
+        def submit():
+            self.at.text_input[0].input(username)
+            self.at.text_input[1].input(PASSWORD)
+            self.at.button[0].click()
+        if not (self.step('접속', lambda: None) and self.step(label, submit)):
+            return False
+        if not any(h.value.startswith(header) for h in self.at.header):
+            shown = [w.value for w in self.at.warning] + [h.value for h in self.at.header]
+            self.problem(label, f"{header} 화면이 나오지 않았습니다: {shown[:2]}")
+            return False
+        return True
+
+
+# 학생 한 명의 흐름. 저장 완료가 표시된 제출만 {(학생ID, 과목): 답 목록} 으로 돌려줌 (같은 과목은 마지막 것)
+def _student_session(username, plan, timeout):
+    session = _Session(username, timeout)
+    saved = {}
+    if not (session.login('로그인', username, "학생용 자가채점")
+            and session.step('탐구 과목 저장', lambda: _widget(session.at.button, "탐구 과목 저장").click())):
+        return session, saved
+    for subject, answers in plan:
+        def submit():
+            _widget(session.at.text_input, "답 문자열 (선택)").input(','.join(a or '-' for a in answers))
+            _widget(session.at.button, "답안 제출").click()
+        if not (session.step('과목 선택', lambda: _widget(session.at.selectbox, "과목을 선택하세요").select(subject))
+                and session.step('답안 제출', submit)):
+            saved.pop((username, subject), None)
+            break
+        if any(message.value == SAVED_MESSAGE for message in session.at.success):
+            saved[(username, subject)] = answers
+        else:
+            saved.pop((username, subject), None)
+            warnings = [w.value for w in session.at.warning]
+            session.problem('답안 제출', f"저장 완료가 표시되지 않았습니다: {subject} {warnings[:1]}")
+    return session, saved
+
+
+# 교사 흐름: stop 이 설정될 때까지 채점 결과와 통계 분석을 번갈아 열고, 과목과 (여러 반이면) 반을 돌아가며 선택
+def _teacher_session(stop, interval, timeout):
+    session = _Session(TEACHER, timeout)
+    if not session.login('교사 로그인', TEACHER, "교사용 관리"):
+        return session
+    cycle = 0
+    while not stop.is_set():
+        def select_class():
+            classes = [s for s in session.at.sidebar.selectbox if s.key == 'teacher_class']
+            if classes:
+                classes[0].select_index(cycle % len(classes[0].options))
+            session.at.radio(key='teacher_section').set_value("채점 결과")
+
+        def show_results():
+            subjects = _widget(session.at.selectbox, "확인할 과목을 선택하세요")
+            if subjects.options:
+                subjects.select_index(cycle % len(subjects.options))
+            _widget(session.at.button, "결과 확인").click()
+        if not (session.step('채점 결과', select_class, show_results)
+                and session.step('통계 분석', lambda: session.at.radio(key='teacher_section').set_value("통계 분석"))):
+            break
+        cycle += 1
+        stop.wait(interval)
+    return session
+
+
+# 검증용 저장소: 세션이 쓰던 인스턴스(캐시)가 아니라 디스크에서 새로 읽는 인스턴스
+def _fresh_storage(partition, backend):
+    data_dir = os.path.join(os.environ['DATA_DIR'], *(partition or ()))
+    if backend == 'sqlite':
+        return SqliteStorage(data_dir=data_dir)
+    if backend == 'parquet':
+        return ParquetStorage(data_dir)
+    return CsvStorage(data_dir)
+
+
+def _answer_set(answers):
+    return {(q, int(a)) for q, a in enumerate(answers, start=1) if a is not None}
+
+
+# 저장 완료된 제출과 디스크의 responses 비교, 요약 테이블과 순위 색인 점검
+def check_integrity(partitions, backend, saved, usernames):
+    lost = corrupted = 0
+    mismatches = {'score_summary': 0, 'question_summary': 0, 'rank_index': 0}
+    stored = {}
+    for partition in partitions:
+        storage = _fresh_storage(partition, backend)
+        responses = storage.read('responses', where={'회차': EXAM_ROUND})
+        numbers = pd.to_numeric(responses['입력답'], errors='coerce')
+        corrupted += int((~responses['학생ID'].isin(usernames) | numbers.isna()).sum())
+        for (student_id, subject), rows in responses.assign(입력답=numbers).groupby(['학생ID', '과목'], observed=True):
+            stored[(student_id, subject)] = {(int(q), int(a)) for q, a in zip(rows['문항번호'], rows['입력답'])
+                                             if pd.notna(a)}
+        for table, count in check_consistency(storage).items():
+            mismatches[table] += count
+        for subject in CORE_SUBJECTS:
+            mismatches['rank_index'] += check_index(get_storage(partition), EXAM_ROUND, subject)
+    for key, answers in saved.items():
+        if key not in stored:
+            lost += 1
+        elif stored[key] != _answer_set(answers):
+            corrupted += 1
+    return lost, corrupted, mismatches
+
+
+def _percentiles(values):
+    values = np.array(values) * 1000
+    return (len(values), *np.percentile(values, [50, 90, 99]), values.max()) if len(values) else (0,) + (np.nan,) * 4
+
+
+def _report(sessions, steps):
+    timings = defaultdict(list)
+    for session in sessions:
+        for label, values in session.timings.items():
+            timings[label].extend(values)
+    for label in steps:
+        count, p50, p90, p99, worst = _percentiles(timings[label])
+        print(f"  {label:<10} {count:>6,} {p50:>9.0f} {p90:>9.0f} {p99:>9.0f} {worst:>9.0f}")
+
+
+def run(num_students, concurrency, num_subjects, num_classes, backend, resubmit, interval, timeout, seed=0):
+    _share_runtime()
+    # 앱 모듈은 세션 안에서 처음 불러오는 것도 있으므로, 임시 디렉토리로 옮긴 뒤에도 찾을 수 있게 저장소 루트를 경로에 둠
+    root = os.path.dirname(APP_PATH)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    rng = np.random.default_rng(seed)
+    partitions = _partitions(num_classes)
+    plans = _plans(num_students, num_subjects, resubmit, rng)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # config.yaml 은 현재 디렉토리 기준이므로 임시 디렉토리로 옮겨서 실행
+        os.chdir(directory)
+        os.environ.update(DATA_DIR=os.path.join(directory, 'data'), STORAGE_BACKEND=backend)
+        try:
+            _write_config(num_students, partitions)
+            _seed_answers(partitions, rng)
+            print(f"저장소 {backend}, 반 {len(partitions)}개, 학생 {num_students}명 (동시 {concurrency}명), "
+                  f"제출 {sum(len(plan) for _, plan in plans)}건, CPU {os.cpu_count()}개")
+
+            stop = threading.Event()
+            with ThreadPoolExecutor(max_workers=1) as teacher_pool:
+                teacher = teacher_pool.submit(_teacher_session, stop, interval, timeout)
+                start = time.perf_counter()
+                try:
+                    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                        results = list(pool.map(lambda item: _student_session(*item, timeout), plans))
+                    elapsed = time.perf_counter() - start
+                finally:
+                    stop.set()
+                teacher_session = teacher.result()
+
+            students = [session for session, _ in results]
+            saved = {key: answers for _, result in results for key, answers in result.items()}
+            submissions = sum(len(session.timings['답안 제출']) for session in students)
+            print(f"\n소요 {elapsed:.1f}s, 답안 제출 처리량 {submissions / elapsed:.2f}건/s, "
+                  f"학생 세션 {len(students) / elapsed:.2f}명/s")
+            print(f"\n  {'단계':<10} {'횟수':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'최대 ms':>9}")
+            _report(students, STUDENT_STEPS)
+            _report([teacher_session], TEACHER_STEPS)
+
+            problems = [problem for session in students + [teacher_session] for problem in session.problems]
+            print(f"\n화면 오류 {len(problems)}건")
+            for label, name, message in problems[:10]:
+                print(f"  [{label}] {name}: {message}")
+
+            lost, corrupted, mismatches = check_integrity(partitions, backend, saved,
+                                                          {username for username, _ in plans})
+            print(f"\n저장 완료 제출 {len(saved)}건 (학생, 과목 기준): 분실 {lost}건, 손상 {corrupted}건")
+            print("요약 점검: " + ", ".join(f"{table} {count}건" for table, count in mismatches.items()))
+            return not (problems or lost or corrupted or any(mismatches.values()))
+        finally:
+            for partition in partitions:
+                get_submission_queue(get_storage(partition)).close()
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=60)
+    parser.add_argument('--concurrency', type=int, default=20, help='동시에 진행하는 학생 세션 수')
+    parser.add_argument('--subjects', type=int, default=2, choices=range(1, len(CORE_SUBJECTS) + 1),
+                        help='학생마다 제출하는 핵심 과목 수')
+    parser.add_argument('--classes', type=int, default=0, help='반 수 (0 이면 기본 분할 하나)')
+    parser.add_argument('--backend', choices=['csv', 'sqlite', 'parquet'], default='csv')
+    parser.add_argument('--resubmit', type=float, default=0.2, help='같은 과목을 다시 제출하는 학생 비율')
+    parser.add_argument('--teacher-interval', type=float, default=0.0, help='교사 화면 사이의 대기 시간(초)')
+    parser.add_argument('--timeout', type=float, default=300, help='재실행 한 번의 최대 시간(초)')
+    args = parser.parse_args()
+    ok = run(args.students, args.concurrency, args.subjects, args.classes, args.backend, args.resubmit,
+             args.teacher_interval, args.timeout)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,129 @@
+"""동시 답안 제출 부하 시험: 학생 N명(기본 300명)이 동시에 제출할 때의 지연과 처리량, 저장 결과 검증
+
+모든 스레드가 barrier 에서 동시에 출발하여 제출 대기열(submission_queue)에 답안을 넣는다.
+    접수 지연  submit() 이 돌아올 때까지 (즉시 채점 결과를 보여 주기 전까지 기다리는 시간)
+    저장 지연  저장 완료(Future)까지 (fsync 포함)
+끝난 뒤 모든 제출이 responses 에 그대로 있는지, 요약 테이블이 처음부터 다시 계산한 결과와 같은지 확인한다.
+--direct 이면 대기열 없이 각 스레드가 record_submission() 을 직접 호출하는 기존 방식과 비교한다.
+
+    python -m benchmarks.stress_submissions --backend csv --students 2000
+    python -m benchmarks.stress_submissions --backend sqlite --direct
+"""
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_hotpaths import _prepare
+from submission_queue import SubmissionQueue
+from subjects import CORE_SUBJECTS, SUBJECT_QUESTIONS
+from summary import check_consistency, record_submission
+
+
+# 제출자별 (학생ID, 회차, 과목, rows). 핵심 과목을 번갈아 쓰고 일부 학생은 같은 과목을 다시 제출
+def make_submissions(num_submitters, num_students, seed):
+    rng = np.random.default_rng(seed)
+    submissions = []
+    for i in range(num_submitters):
+        student_id = f"student{i % num_students + 1}"
+        subject = CORE_SUBJECTS[i % len(CORE_SUBJECTS)]
+        num_questions = SUBJECT_QUESTIONS[subject]
+        answered = np.flatnonzero(rng.random(num_questions) > 0.05) + 1
+        rows = pd.DataFrame({
+            '학생ID': student_id,
+            '회차': '1차',
+            '과목': subject,
+            '문항번호': answered,
+            '입력답': [str(answer) for answer in rng.integers(1, 6, len(answered))],
+        })
+        submissions.append((student_id, '1차', subject, rows))
+    return submissions
+
+
+def _percentile(values, q):
+    return float(np.percentile(values, q)) * 1000
+
+
+def run(storage, submissions, direct, fsync):
+    barrier = threading.Barrier(len(submissions))
+    accepted = [0.0] * len(submissions)
+    durable = [0.0] * len(submissions)
+    errors = []
+    submission_queue = None if direct else SubmissionQueue(storage, fsync=fsync)
+
+    def submitter(k):
+        student_id, exam_round, subject, rows = submissions[k]
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            if direct:
+                record_submission(storage, student_id, exam_round, subject, rows)
+                accepted[k] = time.perf_counter() - start
+            else:
+                pending = submission_queue.submit(student_id, exam_round, subject, rows)
+                accepted[k] = time.perf_counter() - start
+                pending.result()
+        except Exception as e:
+            errors.append(e)
+        durable[k] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=submitter, args=(k,)) for k in range(len(submissions))]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if submission_queue is not None:
+        submission_queue.close()
+
+    label = '직접 저장' if direct else f"대기열 (fsync {fsync})"
+    print(f"[{label}] 제출 {len(submissions)}건, 전체 {elapsed:.2f}s, 처리량 {len(submissions) / elapsed:.1f}건/s")
+    print(f"  접수 지연  중앙값 {statistics.median(accepted) * 1000:8.1f}ms, p95 {_percentile(accepted, 95):8.1f}ms, "
+          f"최대 {max(accepted) * 1000:8.1f}ms")
+    print(f"  저장 지연  중앙값 {statistics.median(durable) * 1000:8.1f}ms, p95 {_percentile(durable, 95):8.1f}ms, "
+          f"최대 {max(durable) * 1000:8.1f}ms")
+    if errors:
+        print(f"  오류 {len(errors)}건: {errors[0]!r}")
+    return not errors
+
+
+# 학생/과목별 마지막 제출이 responses 에 그대로 저장되었는지 확인하고, 요약 테이블 불일치 행 수 출력
+def verify(storage, submissions):
+    latest = {(student_id, exam_round, subject): rows for student_id, exam_round, subject, rows in submissions}
+    missing = 0
+    for (student_id, exam_round, subject), rows in latest.items():
+        stored = storage.read('responses', where={'학생ID': student_id, '회차': exam_round, '과목': subject})
+        expected = dict(zip(rows['문항번호'].astype(int), rows['입력답'].astype(int)))
+        saved = dict(zip(pd.to_numeric(stored['문항번호']).astype(int), pd.to_numeric(stored['입력답']).astype(int)))
+        missing += expected != saved
+    mismatches = check_consistency(storage)
+    print(f"  검증: 저장 내용이 다른 제출 {missing}건, 요약 불일치 "
+          + ', '.join(f"{table} {count}행" for table, count in mismatches.items()))
+    return missing == 0 and not any(mismatches.values())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='동시 답안 제출 부하 시험')
+    parser.add_argument('--backend', choices=['csv', 'sqlite', 'parquet'], default='csv')
+    parser.add_argument('--students', type=int, default=2000, help='기존 데이터의 학생 수')
+    parser.add_argument('--rounds', type=int, default=1)
+    parser.add_argument('--submitters', type=int, default=300)
+    parser.add_argument('--fsync', choices=['always', 'off'], default='always')
+    parser.add_argument('--direct', action='store_true', help='대기열 없이 직접 저장하는 방식도 측정')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    ok = True
+    modes = [False, True] if args.direct else [False]
+    for direct in modes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            storage, _ = _prepare(data_dir, args.backend, args.students, args.rounds, args.seed)
+            submissions = make_submissions(args.submitters, args.students, args.seed + 1)
+            ok &= run(storage, submissions, direct, args.fsync)
+            ok &= verify(storage, submissions)
+    raise SystemExit(0 if ok else 1)
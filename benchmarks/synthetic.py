@@ -0,0 +1,144 @@
+"""성능 측정용 합성 데이터 생성기
+
+기존 CSV 스키마(answers, responses, student_subjects, student_answers)를 그대로 따르며, 같은 seed 면 항상 같은 데이터를 만든다.
+학생마다 능력치, 문항마다 난이도를 두어 정답률이 현실적인 분포가 되도록 한다.
+
+    python -m benchmarks.synthetic --students 5000 --rounds 4 --out bench_data
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from storage import TABLES
+from subjects import CORE_SUBJECTS, ELECTIVE_SUBJECTS, ROUNDS, SUBJECTS, short_answer_questions, subject_spec
+
+
+# 회차의 과목별 (문항 수, 만점)
+def subject_specs(exam_round):
+    specs = {subject: subject_spec(exam_round, subject) for subject in SUBJECTS}
+    return {subject: (spec['questions'], spec['max_score']) for subject, spec in specs.items()}
+
+
+# 기본 2점에서 뒤 문항부터 1점씩 올려 만점을 맞춘 배점 (최대 4점)
+def _points(num_questions, max_score):
+    points = np.full(num_questions, 2)
+    extra = max_score - points.sum()
+    index = num_questions - 1
+    while extra > 0:
+        if points[index] < 4:
+            points[index] += 1
+            extra -= 1
+        index = (index - 1) % num_questions
+    return points
+
+
+# 단답형 문항 (정답 1~999)
+def _is_short_answer(exam_round, subject, question_numbers):
+    return np.isin(question_numbers, short_answer_questions(exam_round, subject))
+
+
+def _answer_key(rng, exam_round, subject, num_questions, max_score):
+    question_numbers = np.arange(1, num_questions + 1)
+    short = _is_short_answer(exam_round, subject, question_numbers)
+    return pd.DataFrame({
+        '회차': exam_round,
+        '과목': subject,
+        '문항번호': question_numbers,
+        '정답': np.where(short, rng.integers(1, 1000, num_questions), rng.integers(1, 6, num_questions)),
+        '배점': _points(num_questions, max_score),
+        '난이도': rng.normal(0, 1, num_questions),
+    })
+
+
+# 한 (회차, 과목)을 치른 학생들의 응답. 정답 확률은 sigmoid(능력치 - 난이도), 오답은 다른 값 중 무작위, 일부는 미응답
+def _responses(rng, key, student_ids, ability, omit_rate):
+    num_students, num_questions = len(student_ids), len(key)
+    answers = key['정답'].to_numpy()
+    probability = 1 / (1 + np.exp(key['난이도'].to_numpy()[np.newaxis, :] - ability[:, np.newaxis]))
+    correct = rng.random((num_students, num_questions)) < probability
+    short = _is_short_answer(key['회차'].iloc[0], key['과목'].iloc[0], key['문항번호'].to_numpy())
+    wrong = np.where(short, rng.integers(1, 1000, (num_students, num_questions)),
+                     (answers + rng.integers(1, 5, (num_students, num_questions)) - 1) % 5 + 1)
+    choices = np.where(correct, answers, wrong)
+    answered = rng.random((num_students, num_questions)) >= omit_rate
+    rows, columns = np.nonzero(answered)
+    return pd.DataFrame({
+        '학생ID': student_ids[rows],
+        '회차': key['회차'].iloc[0],
+        '과목': key['과목'].iloc[0],
+        '문항번호': columns + 1,
+        '입력답': choices[rows, columns].astype(str),
+    })
+
+
+# 합성 데이터 생성: 학생마다 회차별로 공통 4과목 + 탐구 2과목 응답, 일부 학생은 학생 정답도 입력
+def generate(num_students=5000, num_rounds=4, seed=0, omit_rate=0.03, student_answer_rate=0.05):
+    rng = np.random.default_rng(seed)
+    student_ids = np.array([f"student{i + 1}" for i in range(num_students)], dtype=object)
+    ability = rng.normal(0.5, 1, num_students)
+    rounds = [ROUNDS[i] if i < len(ROUNDS) else f"{i + 1}차" for i in range(num_rounds)]
+
+    answers, responses, subjects, student_answers = [], [], [], []
+    for exam_round in rounds:
+        # 학생마다 서로 다른 탐구 과목 2개
+        electives = rng.random((num_students, len(ELECTIVE_SUBJECTS))).argsort(axis=1)[:, :2]
+        subjects.append(pd.DataFrame({
+            '학생ID': student_ids,
+            '회차': exam_round,
+            '탐구1': np.array(ELECTIVE_SUBJECTS)[electives[:, 0]],
+            '탐구2': np.array(ELECTIVE_SUBJECTS)[electives[:, 1]],
+        }))
+        for subject, (num_questions, max_score) in subject_specs(exam_round).items():
+            key = _answer_key(rng, exam_round, subject, num_questions, max_score)
+            answers.append(key)
+            if subject in CORE_SUBJECTS:
+                takers = np.arange(num_students)
+            else:
+                index = ELECTIVE_SUBJECTS.index(subject)
+                takers = np.flatnonzero((electives[:, 0] == index) | (electives[:, 1] == index))
+            if len(takers) == 0:
+                continue
+            responses.append(_responses(rng, key, student_ids[takers], ability[takers], omit_rate))
+            # 학생이 입력한 정답: 대부분 실제 정답과 같고 가끔 틀림
+            reporters = takers[rng.random(len(takers)) < student_answer_rate]
+            if len(reporters):
+                reported = np.tile(key['정답'].to_numpy(), (len(reporters), 1))
+                typo = rng.random(reported.shape) < 0.02
+                reported = np.where(typo, rng.integers(1, 6, reported.shape), reported)
+                student_answers.append(pd.DataFrame({
+                    '학생ID': np.repeat(student_ids[reporters], num_questions),
+                    '회차': exam_round,
+                    '과목': subject,
+                    '문항번호': np.tile(key['문항번호'].to_numpy(), len(reporters)),
+                    '정답': reported.ravel(),
+                }))
+
+    tables = {
+        'answers': pd.concat(answers, ignore_index=True),
+        'responses': pd.concat(responses, ignore_index=True),
+        'student_subjects': pd.concat(subjects, ignore_index=True),
+        'student_answers': pd.concat(student_answers, ignore_index=True) if student_answers
+        else pd.DataFrame(columns=TABLES['student_answers']),
+    }
+    return {table: df[TABLES[table]] for table, df in tables.items()}
+
+
+def write_csv(tables, data_dir):
+    os.makedirs(data_dir, exist_ok=True)
+    for table, df in tables.items():
+        df.to_csv(os.path.join(data_dir, f"{table}.csv"), index=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='성능 측정용 합성 데이터를 CSV 로 생성합니다.')
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='bench_data', help='CSV 를 쓸 디렉토리')
+    args = parser.parse_args()
+    tables = generate(args.students, args.rounds, args.seed)
+    write_csv(tables, args.out)
+    for table, df in tables.items():
+        print(f"{table}: {len(df)}행")
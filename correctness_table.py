@@ -0,0 +1,145 @@
+"""정오표 (학생 × 문항 O/X 표) 생성과 CSV/XLSX 내보내기
+
+(회차, 과목)별 응답 행렬(response_matrix)에서 학생을 chunk_size 명씩 잘라 O/X 표를 만들고 바로 파일에 쓰므로,
+학생이 수천 명이어도 전체 정오표를 한 번에 DataFrame 으로 만들지 않는다.
+    O  정답    X  오답 (숫자가 아닌 답 포함)    빈 칸  미응답
+
+CSV 는 한 파일에 (회차, 과목)을 이어 쓰고(문항 열은 가장 긴 과목 기준), XLSX 는 (회차, 과목)마다 시트 하나를 쓴다.
+XLSX 는 xlsxwriter 가 필요하다 (pip install xlsxwriter).
+
+    python -m correctness_table --round 1차 --subject 국어 --out 정오표.csv
+    python -m correctness_table --round 1차 --format xlsx --out 정오표.xlsx   # 전체 과목
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import yaml
+from yaml.loader import SafeLoader
+
+from partitions import parse_partition
+from response_matrix import UNANSWERED, load_matrix
+from storage import get_storage
+from subjects import SUBJECTS
+
+# 한 번에 O/X 표로 만드는 학생 수
+CHUNK_SIZE = 1000
+FORMATS = {'csv': 'text/csv', 'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'}
+
+
+# 설정 파일의 계정 정보에서 학생ID → 이름
+def student_names(config):
+    users = (config or {}).get('credentials', {}).get('usernames', {})
+    return {username: info.get('name', '') for username, info in users.items()}
+
+
+# 회차의 정오표 대상 과목 (과목을 지정하지 않으면 응답이 있는 모든 과목, 과목 목록 순서)
+def round_subjects(storage, exam_round, subject=None):
+    if subject:
+        return [subject]
+    answered = set(storage.read('score_summary', where={'회차': exam_round})['과목'].astype(str))
+    return [s for s in SUBJECTS if s in answered] + sorted(answered - set(SUBJECTS))
+
+
+def _question_columns(num_questions):
+    return [f"{q}번" for q in range(1, num_questions + 1)]
+
+
+def _columns(num_questions):
+    return ['학생ID', '이름', '회차', '과목'] + _question_columns(num_questions) + ['맞은 개수', '점수']
+
+
+# (회차, 과목) 정오표를 학생 chunk_size 명씩 DataFrame 으로 생성 (학생ID 순)
+def iter_chunks(matrix, exam_round, subject, names, chunk_size=CHUNK_SIZE):
+    order = np.argsort(matrix.student_ids.astype(str), kind='stable')
+    question_columns = _question_columns(matrix.num_questions)
+    for start in range(0, len(order), chunk_size):
+        rows = order[start:start + chunk_size]
+        choices = matrix.choices[rows]
+        correct = matrix.correct(rows)
+        marks = np.where(correct, 'O', np.where(choices != UNANSWERED, 'X', ''))
+        student_ids = matrix.student_ids[rows]
+        chunk = pd.DataFrame(marks, columns=question_columns)
+        chunk.insert(0, '학생ID', student_ids)
+        chunk.insert(1, '이름', [names.get(student_id, '') for student_id in student_ids])
+        chunk.insert(2, '회차', exam_round)
+        chunk.insert(3, '과목', subject)
+        chunk['맞은 개수'] = correct.sum(axis=1)
+        chunk['점수'] = correct @ matrix.points
+        yield chunk
+
+
+# 정오표를 CSV 로 씀 (out 은 바이너리 파일 객체). 반환값은 쓴 학생 행 수
+def write_csv(storage, exam_round, subjects, names, out, chunk_size=CHUNK_SIZE):
+    matrices = [(subject, load_matrix(storage, exam_round, subject)) for subject in subjects]
+    width = max((matrix.num_questions for _, matrix in matrices), default=0)
+    columns = _columns(width)
+    # 엑셀에서 한글이 깨지지 않도록 BOM 을 붙임
+    out.write(','.join(columns).encode('utf-8-sig') + b'\n')
+    count = 0
+    for subject, matrix in matrices:
+        for chunk in iter_chunks(matrix, exam_round, subject, names, chunk_size):
+            out.write(chunk.reindex(columns=columns, fill_value='').to_csv(index=False, header=False).encode('utf-8'))
+            count += len(chunk)
+    return count
+
+
+# 정오표를 (회차, 과목)별 시트로 XLSX 에 씀 (행을 바로 임시 파일로 내보내는 constant_memory 모드)
+def write_xlsx(storage, exam_round, subjects, names, out, chunk_size=CHUNK_SIZE):
+    try:
+        import xlsxwriter
+    except ImportError as e:
+        raise ImportError("XLSX 로 내보내려면 xlsxwriter 를 설치하세요: pip install xlsxwriter") from e
+    workbook = xlsxwriter.Workbook(out, {'constant_memory': True})
+    count = 0
+    try:
+        for subject in subjects:
+            matrix = load_matrix(storage, exam_round, subject)
+            sheet = workbook.add_worksheet(f"{exam_round} {subject}"[:31])
+            sheet.write_row(0, 0, _columns(matrix.num_questions))
+            row = 1
+            for chunk in iter_chunks(matrix, exam_round, subject, names, chunk_size):
+                for values in chunk.itertuples(index=False):
+                    sheet.write_row(row, 0, [value.item() if isinstance(value, np.generic) else value
+                                             for value in values])
+                    row += 1
+                count += len(chunk)
+    finally:
+        workbook.close()
+    return count
+
+
+def xlsx_available():
+    try:
+        import xlsxwriter  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export(storage, exam_round, subjects, names, out, fmt='csv', chunk_size=CHUNK_SIZE):
+    writer = write_xlsx if fmt == 'xlsx' else write_csv
+    return writer(storage, exam_round, subjects, names, out, chunk_size)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='정오표(학생 × 문항 O/X 표)를 CSV 또는 XLSX 로 내보냅니다.')
+    parser.add_argument('--round', required=True, dest='exam_round')
+    parser.add_argument('--subject', help='과목 (기본값: 응답이 있는 전체 과목)')
+    parser.add_argument('--format', choices=list(FORMATS), default=None, help='기본값: 출력 파일 확장자')
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--config', default='config.yaml', help='학생 이름을 가져올 설정 파일')
+    parser.add_argument('--partition', default=None, help="학교/반 분할 (예: 한빛고/3-1, 기본값: 기본 분할)")
+    args = parser.parse_args()
+
+    config = None
+    if os.path.exists(args.config):
+        with open(args.config) as f:
+            config = yaml.load(f, Loader=SafeLoader)
+    fmt = args.format or ('xlsx' if args.out.endswith('.xlsx') else 'csv')
+    storage = get_storage(parse_partition(args.partition))
+    subjects = round_subjects(storage, args.exam_round, args.subject)
+    with open(args.out, 'wb') as out:
+        count = export(storage, args.exam_round, subjects, student_names(config), out, fmt)
+    print(f"정오표 {count}행 ({', '.join(subjects)}) -> {args.out}")
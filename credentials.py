@@ -0,0 +1,264 @@
+"""계정 정보(config.yaml) 저장소: bcrypt 해시만 보관하고, 프로세스마다 한 번 읽어 파일이 바뀔 때까지 재사용
+
+설정 파일은 (mtime, 크기)가 바뀌었을 때만 다시 파싱한다. 평문 비밀번호가 있으면(처음 실행하거나 직접 편집한 경우)
+읽을 때 해시로 바꿔 파일에 다시 쓰므로, 이후에는 로그인할 때마다 입력한 비밀번호 하나만 bcrypt 로 검사한다.
+
+계정 추가와 명단 일괄 등록은 비밀번호를 프로세스 풀에서 나누어 해시한 뒤 파일을 한 번만 쓴다.
+명단은 아이디, 이름, 이메일, 비밀번호 열이 있는 CSV 이다. 역할(관리자/교사/학생, 빈 칸은 학생)과
+반("학교/반", 교사는 쉼표로 여러 반) 열은 있으면 계정의 role, class/classes 로 저장한다 (partitions.py).
+
+    python -m credentials roster.csv              # 명단 일괄 등록
+    python -m credentials roster.csv --workers 8
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+import pandas as pd
+import yaml
+
+from partitions import ROLE_LABELS, account_fields
+
+CONFIG_PATH = 'config.yaml'
+ROSTER_COLUMNS = ['아이디', '이름', '이메일', '비밀번호']
+OPTIONAL_ROSTER_COLUMNS = ['역할', '반']
+# 계정 항목에 그대로 저장하는 역할/반 키 (partitions.account_fields)
+ACCOUNT_FIELDS = ['role', 'class', 'classes']
+# 이보다 적으면 프로세스를 띄우지 않고 현재 프로세스에서 해시
+PARALLEL_MIN_PASSWORDS = 8
+
+# streamlit_authenticator 와 같은 해시 판별 기준
+_BCRYPT_HASH = re.compile(r'^\$2[aby]\$\d+\$.{53}$')
+
+# libyaml 이 있으면 C 구현으로 파싱/저장 (계정 수천 개도 빠르게)
+_Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_Dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# 경로별 (파일 서명, 설정). 설정 dict 는 모든 세션이 공유하므로 계정을 바꿀 때는 새 dict 로 교체
+_configs = {}
+_configs_lock = threading.Lock()
+
+
+def _default_config():
+    return {
+        'credentials': {
+            'usernames': {
+                'admin': {
+                    'email': 'admin@example.com',
+                    'name': '관리자',
+                    'password': 'admin123'
+                }
+            }
+        },
+        'cookie': {
+            'expiry_days': 30,
+            'key': 'yeonhap_test_key_123',
+            'name': 'yeonhap_test_cookie'
+        }
+    }
+
+
+def _signature(path):
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+
+def is_hash(password):
+    return bool(_BCRYPT_HASH.match(str(password)))
+
+
+def _hash(password):
+    return bcrypt.hashpw(str(password).encode(), bcrypt.gensalt()).decode()
+
+
+# 비밀번호 목록을 해시. 많으면 프로세스 풀에서 나누어 처리 (bcrypt 는 한 개에 수백 ms 걸리는 CPU 작업)
+# 앱 서버 안에서도 쓰므로 스레드를 복제하는 fork 대신 spawn 으로 작업 프로세스를 띄움
+def hash_passwords(passwords, workers=None):
+    passwords = list(passwords)
+    workers = min(workers or os.cpu_count() or 1, len(passwords))
+    if workers <= 1 or len(passwords) < PARALLEL_MIN_PASSWORDS:
+        return [_hash(password) for password in passwords]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(_hash, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+# 평문 비밀번호를 해시로 바꿈. 바꾼 계정이 있으면 True
+def _hash_plaintext(config, workers=None):
+    users = config['credentials']['usernames']
+    plaintext = [username for username, info in users.items() if not is_hash(info['password'])]
+    for username, hashed in zip(plaintext, hash_passwords([users[u]['password'] for u in plaintext], workers)):
+        users[username]['password'] = hashed
+    return bool(plaintext)
+
+
+def _load(path):
+    with open(path, encoding='utf-8') as file:
+        config = yaml.load(file, Loader=_Loader)
+    # 로그인 폼은 아이디를 소문자로 바꿔 찾으므로 저장소도 소문자 아이디로 보관
+    users = config['credentials']['usernames']
+    config['credentials']['usernames'] = {str(username).lower(): info for username, info in users.items()}
+    return config
+
+
+def _write(config, path):
+    # streamlit_authenticator 가 세션 중에 붙이는 로그인 상태는 저장하지 않음
+    users = {username: {key: value for key, value in info.items() if key != 'logged_in'}
+             for username, info in config['credentials']['usernames'].items()}
+    data = dict(config, credentials=dict(config['credentials'], usernames=users))
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        yaml.dump(data, file, Dumper=_Dumper, allow_unicode=True, sort_keys=False)
+    os.replace(temp_path, path)
+
+
+# 설정 (모든 세션이 공유, 읽기 전용으로 사용). 파일이 바뀌지 않았으면 stat 한 번만 수행
+def load_config(path=CONFIG_PATH):
+    signature = _signature(path)
+    cached = _configs.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with _configs_lock:
+        signature = _signature(path)
+        cached = _configs.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        if signature is None:
+            config = _default_config()
+            _hash_plaintext(config)
+        else:
+            config = _load(path)
+            if _hash_plaintext(config):
+                _write(config, path)
+                signature = _signature(path)
+        _configs[path] = (signature, config)
+        return config
+
+
+# 로그인 위젯. streamlit_authenticator.Authenticate 는 생성할 때 모든 계정을 훑으며 아이디를 소문자로 바꾸고
+# 평문 비밀번호를 해시하므로, 빈 계정 목록으로 만든 뒤 이미 정리된 공유 계정 정보를 넘겨 재실행 비용을 계정 수와 무관하게 함
+def make_authenticator(config):
+    import streamlit_authenticator as stauth
+
+    authenticator = stauth.Authenticate(
+        {'usernames': {}},
+        config['cookie']['name'],
+        config['cookie']['key'],
+        config['cookie']['expiry_days']
+    )
+    authenticator.credentials = config['credentials']
+    return authenticator
+
+
+# 명단 CSV(파일 경로 또는 업로드 파일)를 읽음. 모든 값은 앞뒤 공백을 없앤 문자열, 아이디는 소문자
+def read_roster(file):
+    roster = pd.read_csv(file, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    roster.columns = [str(column).strip() for column in roster.columns]
+    for column in roster.columns:
+        roster[column] = roster[column].str.strip()
+    if '아이디' in roster.columns:
+        roster['아이디'] = roster['아이디'].str.lower()
+    return roster
+
+
+# 명단의 필수 열, 빈 칸, 명단 안의 중복 아이디, 이미 있는 아이디, 역할/반 형식을 한 번에 검사하여 오류 메시지 목록 반환
+def validate_roster(roster, usernames):
+    missing = [column for column in ROSTER_COLUMNS if column not in roster.columns]
+    if missing:
+        return [f"명단에 필요한 열이 없습니다: {', '.join(missing)}"]
+    errors = []
+    # 머리글 다음 줄이 2행
+    line_numbers = pd.Series(range(2, len(roster) + 2), index=roster.index)
+    blank = (roster[ROSTER_COLUMNS] == '').any(axis=1)
+    if blank.any():
+        errors.append(f"빈 칸이 있는 행: {', '.join(map(str, line_numbers[blank]))}행")
+    ids = roster.loc[~blank, '아이디']
+    duplicated = ids[ids.duplicated()].unique()
+    if len(duplicated):
+        errors.append(f"명단 안에서 중복된 아이디: {', '.join(duplicated)}")
+    existing = [username for username in ids.unique() if username in usernames]
+    if existing:
+        errors.append(f"이미 존재하는 아이디: {', '.join(existing)}")
+    invalid = []
+    for line_number, role, classes in zip(line_numbers, _roster_roles(roster), _roster_column(roster, '반')):
+        try:
+            account_fields(role, classes)
+        except ValueError as e:
+            invalid.append(f"{line_number}행: {e}")
+    roles = _roster_column(roster, '역할')
+    unknown = (roles != '') & ~roles.isin(list(ROLE_LABELS.values()))
+    if unknown.any():
+        errors.append(f"역할은 {', '.join(ROLE_LABELS.values())} 중 하나여야 합니다: "
+                      f"{', '.join(map(str, line_numbers[unknown]))}행")
+    if invalid:
+        errors.append("반 형식이 잘못된 행: " + "; ".join(invalid))
+    return errors
+
+
+# 선택 열 (없으면 빈 문자열)
+def _roster_column(roster, column):
+    return roster[column] if column in roster.columns else pd.Series('', index=roster.index)
+
+
+# 역할 열의 한글 이름을 role 값으로 (빈 칸이나 모르는 값은 학생)
+def _roster_roles(roster):
+    roles = {label: role for role, label in ROLE_LABELS.items()}
+    return _roster_column(roster, '역할').map(lambda label: roles.get(label, 'student'))
+
+
+# 검증한 명단을 add_accounts() 형식으로 변환
+def roster_accounts(roster):
+    return [
+        {'username': row.아이디, 'name': row.이름, 'email': row.이메일, 'password': row.비밀번호,
+         **account_fields(role, classes)}
+        for row, role, classes in zip(roster[ROSTER_COLUMNS].itertuples(index=False), _roster_roles(roster),
+                                      _roster_column(roster, '반'))
+    ]
+
+
+# 계정 여러 개를 추가: 비밀번호를 한 번에 해시하고 설정 파일을 한 번만 씀. 추가한 뒤의 설정을 반환
+# accounts 는 username, name, email, password (선택: role, class, classes)를 가진 dict 목록. 이미 있는 아이디가 있으면 ValueError
+def add_accounts(accounts, path=CONFIG_PATH, workers=None):
+    accounts = [dict(account, username=str(account['username']).strip().lower()) for account in accounts]
+    hashed = hash_passwords([account['password'] for account in accounts], workers)
+    with _configs_lock:
+        signature = _signature(path)
+        cached = _configs.get(path)
+        config = cached[1] if cached is not None and cached[0] == signature else None
+        if config is None:
+            config = _load(path) if signature is not None else _default_config()
+            _hash_plaintext(config, workers)
+        users = dict(config['credentials']['usernames'])
+        existing = [account['username'] for account in accounts if account['username'] in users]
+        if existing:
+            raise ValueError(f"이미 존재하는 아이디입니다: {', '.join(existing)}")
+        for account, password in zip(accounts, hashed):
+            users[account['username']] = {'email': account['email'], 'name': account['name'], 'password': password,
+                                          **{key: account[key] for key in ACCOUNT_FIELDS if key in account}}
+        config = dict(config, credentials=dict(config['credentials'], usernames=users))
+        _write(config, path)
+        _configs[path] = (_signature(path), config)
+        return config
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='명단 CSV(아이디, 이름, 이메일, 비밀번호, 선택: 역할, 반)의 계정을 한 번에 등록합니다.')
+    parser.add_argument('roster')
+    parser.add_argument('--config', default=CONFIG_PATH)
+    parser.add_argument('--workers', type=int, default=None, help='비밀번호 해시 프로세스 수 (기본값: CPU 수)')
+    args = parser.parse_args()
+
+    roster = read_roster(args.roster)
+    errors = validate_roster(roster, load_config(args.config)['credentials']['usernames'])
+    if errors:
+        parser.exit(1, "\n".join(errors) + "\n")
+    start = time.perf_counter()
+    add_accounts(roster_accounts(roster), args.config, args.workers)
+    print(f"계정 {len(roster)}개 등록 ({time.perf_counter() - start:.1f}s) -> {args.config}")
@@ -0,0 +1,129 @@
+"""데이터 파일 읽기 결과를 프로세스 전체(모든 세션)에서 공유하는 캐시
+
+캐시 항목은 (파일 경로, mtime, 크기)로 검증하며, 앱이 직접 쓴 경우에는 invalidate()로 즉시 무효화한다.
+외부에서 파일을 바꾼 경우를 위한 stat 확인은 REVALIDATE_SECONDS 간격으로만 수행하므로
+그 사이의 재실행(rerun)은 디스크에 접근하지 않는다.
+"""
+import os
+import threading
+import time
+
+import pandas as pd
+
+import instrumentation
+
+# 캐시된 DataFrame 을 얕은 복사본(view)으로 나눠주므로, 호출한 쪽의 수정이 캐시에 번지지 않도록
+# copy-on-write 모드를 사용한다 (pandas 2.x)
+# 이 설정은 프로세스 전체의 pandas 동작을 바꾼다. 그래도 앱(app.py) 시작 시가 아니라 여기서 켜는 이유는,
+# 저장소를 쓰는 모든 진입점(앱, summary/batch_grading/correctness_table 명령줄, benchmarks)이 이 캐시의 얕은 복사본을
+# 받기 때문이다. 어느 한 곳이라도 꺼진 채로 받은 DataFrame 을 고치면 모든 세션이 공유하는 캐시가 조용히 바뀐다.
+# 이 모듈을 불러오는 프로세스는 copy-on-write 를 전제로 해야 한다 (pandas 3.0 에서는 기본 동작).
+pd.set_option('mode.copy_on_write', True)
+
+# 외부 변경 여부(stat)를 다시 확인하는 최소 간격(초)
+REVALIDATE_SECONDS = float(os.getenv('DATA_CACHE_REVALIDATE_SECONDS', '2.0'))
+
+
+class _Entry:
+    def __init__(self, frame, signature, checked_at, derived=None):
+        self.frame = frame
+        self.signature = signature
+        self.checked_at = checked_at
+        # frame 으로부터 계산한 보조 구조 (키 집합 등). frame 이 바뀌면 함께 버려짐
+        self.derived = derived or {}
+
+
+_entries = {}
+_entries_lock = threading.Lock()
+# 같은 키를 여러 세션이 동시에 읽을 때 한 번만 파싱하도록 키별 잠금
+_load_locks = {}
+# invalidate() 호출 횟수. 적재 도중 무효화가 일어났는지 판단하는 데 사용
+_generation = 0
+
+# 캐시 적중/적재 횟수 (성능 확인용)
+stats = {'hits': 0, 'loads': 0}
+
+
+# 파일들의 (mtime, 크기) 조합. 없는 파일은 None
+def _signature(paths):
+    signature = []
+    for path in paths:
+        try:
+            info = os.stat(path)
+            signature.append((info.st_mtime_ns, info.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _load_lock(key):
+    with _entries_lock:
+        return _load_locks.setdefault(key, threading.Lock())
+
+
+# key 에 해당하는 DataFrame 을 반환. paths 의 mtime/크기가 바뀌었거나 무효화된 경우에만 loader() 호출
+def cached(key, paths, loader):
+    now = time.monotonic()
+    entry = _entries.get(key)
+    if entry is not None and now - entry.checked_at < REVALIDATE_SECONDS:
+        stats['hits'] += 1
+        return entry.frame.copy(deep=False)
+
+    with _load_lock(key):
+        entry = _entries.get(key)
+        signature = _signature(paths)
+        if entry is not None and entry.signature == signature:
+            entry.checked_at = time.monotonic()
+            stats['hits'] += 1
+            return entry.frame.copy(deep=False)
+
+        generation = _generation
+        frame = loader()
+        stats['loads'] += 1
+        # 적재 도중 앱이 파일을 썼다면 다음 호출에서 바로 stat 으로 다시 확인하도록 표시
+        checked_at = time.monotonic() if generation == _generation else float('-inf')
+        _entries[key] = _Entry(frame, signature, checked_at)
+        return frame.copy(deep=False)
+
+
+# dtype 은 pd.read_csv 에 그대로 넘김 (같은 경로는 항상 같은 dtype 으로 읽어야 함)
+def read_csv(path, dtype=None):
+    return cached(('csv', path), [path], lambda: _load_csv(path, dtype))
+
+
+def _load_csv(path, dtype=None):
+    instrumentation.record(nbytes=os.path.getsize(path))
+    return pd.read_csv(path, dtype=dtype)
+
+
+# 캐시된 frame 으로부터 만든 보조 구조를 반환 (처음 요청할 때 build(frame) 로 한 번만 계산)
+def derived(key, name, build):
+    entry = _entries.get(key)
+    if entry is None:
+        raise KeyError(key)
+    if name not in entry.derived:
+        entry.derived[name] = build(entry.frame)
+    return entry.derived[name]
+
+
+# 앱이 직접 파일을 쓴 직후, 쓴 내용(frame)으로 캐시를 바로 갱신. 함께 갱신한 보조 구조는 derived 로 넘김
+def put(key, paths, frame, derived=None):
+    global _generation
+    with _entries_lock:
+        _generation += 1
+        _entries[key] = _Entry(frame, _signature(paths), time.monotonic(), derived)
+
+
+# 앱이 직접 파일을 쓴 뒤 호출. key 가 튜플 접두사이면 해당하는 항목 모두 제거
+def invalidate(*prefix):
+    global _generation
+    with _entries_lock:
+        _generation += 1
+        for key in list(_entries):
+            if key[:len(prefix)] == prefix:
+                del _entries[key]
+
+
+def clear():
+    with _entries_lock:
+        _entries.clear()
@@ -0,0 +1,213 @@
+"""모의고사 채점 로직 (Streamlit 화면과 분리된 재사용 가능한 함수 모음)"""
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from subjects import SCHEMA_VERSION
+
+# 응답과 정답을 연결하는 키
+KEY_COLUMNS = ['회차', '과목', '문항번호']
+# 복수 정답 구분자: 정답 "2/4" 는 2번과 4번을 모두 정답으로 인정 (첫 번째 답이 대표 정답)
+ACCEPTED_SEPARATOR = '/'
+
+
+# 입력답/정답을 int(float()) 규칙과 동일하게 정수로 정규화 (변환 불가 값은 NaN)
+def normalize_choice(values):
+    return np.trunc(pd.to_numeric(values, errors='coerce').astype(float))
+
+
+# 정답 값 하나를 인정하는 답의 튜플로 변환 (int(float()) 정규화, 순서 유지, 빈 값이나 숫자가 아닌 답은 제외)
+def accepted_answers(value):
+    if isinstance(value, str):
+        tokens = value.split(ACCEPTED_SEPARATOR)
+    elif pd.isna(value):
+        return ()
+    else:
+        tokens = [value]
+    answers = []
+    for token in tokens:
+        try:
+            answer = int(float(token))
+        except (ValueError, TypeError, OverflowError):
+            continue
+        if answer not in answers:
+            answers.append(answer)
+    return tuple(answers)
+
+
+# 정답 열에서 복수 정답인 값만 {값: 인정하는 답 frozenset} (대부분의 정답은 하나이므로 구분자가 있는 문자열만 확인)
+def multiple_answers(values):
+    return {value: frozenset(accepted_answers(value))
+            for value in pd.unique(values) if isinstance(value, str) and ACCEPTED_SEPARATOR in value}
+
+
+# 조인 키의 자료형 통일 (CSV 파싱 결과에 따라 문항번호가 float/object가 될 수 있음)
+def _align_keys(df):
+    df = df.copy()
+    df['회차'] = df['회차'].astype(str)
+    df['과목'] = df['과목'].astype(str)
+    df['문항번호'] = pd.to_numeric(df['문항번호'], errors='coerce').astype('Int64')
+    return df
+
+
+# 응답 전체를 정답과 (회차, 과목, 문항번호)로 한 번만 조인하여 문항별 정오와 득점을 계산
+def grade_responses(responses_df, answers_df):
+    answer_key = _align_keys(answers_df[KEY_COLUMNS + ['정답', '배점']])
+    answer_key = answer_key.drop_duplicates(KEY_COLUMNS, keep='last')
+    graded = _align_keys(responses_df).merge(answer_key, on=KEY_COLUMNS, how='left')
+
+    given = normalize_choice(graded['입력답'])
+    expected = normalize_choice(graded['정답'])
+    # NaN 비교는 항상 False 이므로 정답이 없거나 숫자가 아닌 응답은 오답 처리
+    correct = (given == expected).to_numpy(copy=True)
+    # 복수 정답 문항의 응답만 인정하는 답 집합으로 다시 확인
+    multiple = multiple_answers(answer_key['정답'])
+    if multiple:
+        rows = graded['정답'].isin(list(multiple)).to_numpy()
+        correct[rows] = [choice in multiple[value] for choice, value
+                         in zip(given.to_numpy()[rows], graded['정답'].to_numpy()[rows])]
+    graded['정오'] = correct
+    points = pd.to_numeric(graded['배점'], errors='coerce').fillna(0)
+    graded['득점'] = points.where(graded['정오'], 0)
+    return graded
+
+
+# ---- 기준선(baseline) 전용 참고 구현 ----
+# 화면은 summary.py 의 요약 테이블(score_summary, question_summary)을 읽으므로 아래 세 집계 함수는
+# benchmarks/ 에서 조인 기반 채점과 비교하는 기준선으로만 쓰인다. 결과는 summary.py 의 student_results,
+# question_accuracy, summary_statistics 와 같아야 하며 tests/test_summary.py 가 이를 확인한다.
+# 집계 규칙을 바꿀 때는 summary.py 를 먼저 고치고 이쪽을 맞춘다 (새 호출부에서 사용하지 말 것).
+
+# [기준선 전용] 채점된 응답으로부터 학생별 맞은 개수, 틀린 개수, 정답률, 배점 반영 점수 집계 (→ summary.student_results)
+def summarize_students(graded):
+    summary = graded.groupby('학생ID', sort=False, observed=True).agg(
+        correct=('정오', 'sum'),
+        answered=('정오', 'size'),
+        score=('득점', 'sum'),
+    )
+    return pd.DataFrame({
+        '학생ID': summary.index,
+        '맞은 개수': summary['correct'].to_numpy(),
+        '틀린 개수': (summary['answered'] - summary['correct']).to_numpy(),
+        '정답률': (summary['correct'] / summary['answered'] * 100).to_numpy(),
+        '점수': summary['score'].to_numpy(),
+    })
+
+
+# [기준선 전용] 채점된 응답으로부터 문항별 정답률 계산 (응답이 없는 문항은 0%, → summary.question_accuracy)
+def question_accuracy(graded, answers_df):
+    question_numbers = pd.to_numeric(answers_df['문항번호'], errors='coerce').dropna().astype(int)
+    question_numbers = np.sort(question_numbers.unique())
+    accuracy = graded.groupby('문항번호', observed=True)['정오'].mean() * 100
+    accuracy.index = accuracy.index.astype(int)
+    return pd.DataFrame({
+        '문항번호': question_numbers,
+        '정답률': accuracy.reindex(question_numbers, fill_value=0).to_numpy(),
+    })
+
+
+# 정답률 집계 (맞은 개수 / 응답 수)
+def _accuracy_by(graded, columns):
+    grouped = graded.groupby(columns, sort=True, observed=True)['정오']
+    stats = pd.DataFrame({'맞은 개수': grouped.sum(), '응답 수': grouped.size()})
+    stats['평균정답률'] = stats['맞은 개수'] / stats['응답 수'] * 100
+    return stats.reset_index()
+
+
+# [기준선 전용] 모든 응답을 한 번 채점한 뒤 groupby로 과목별/회차별/과목×회차별/학생별 정답률 산출
+# (→ summary.summary_statistics)
+def aggregate_statistics(responses_df, answers_df):
+    graded = grade_responses(responses_df, answers_df)
+    return {
+        'subject': _accuracy_by(graded, ['과목']),
+        'round': _accuracy_by(graded, ['회차']),
+        'subject_round': _accuracy_by(graded, ['회차', '과목']),
+        'student': _accuracy_by(graded, ['학생ID']),
+    }
+
+
+# 문항번호를 인덱스로 바로 찾을 수 있게 배열로 변환한 (회차, 과목) 정답
+# choices[q] : q번 정답 (int(float()) 정규화, 정답이 없으면 NO_ANSWER, 복수 정답이면 대표 정답), points[q] : q번 배점
+# accepted : 복수 정답 문항만 {q: 인정하는 답 frozenset}
+CompiledKey = namedtuple('CompiledKey', ['choices', 'points', 'accepted'])
+NO_ANSWER = -1
+
+# 즉시 채점 결과. marks[i] 는 i+1번 문항의 정오 (1: 정답, 0: 오답, NO_ANSWER: 미응답)
+SubmissionResult = namedtuple('SubmissionResult', ['correct', 'wrong', 'score', 'marks'])
+
+
+def compile_answer_key(answers_df):
+    question_numbers = pd.to_numeric(answers_df['문항번호'], errors='coerce')
+    valid = question_numbers.notna()
+    question_numbers = question_numbers[valid].astype(int).to_numpy()
+    size = int(question_numbers.max()) + 1 if len(question_numbers) else 1
+    choices = np.full(size, NO_ANSWER, dtype=np.int16)
+    points = np.zeros(size, dtype=np.float32)
+    expected = normalize_choice(answers_df['정답'][valid]).to_numpy()
+    has_answer = ~np.isnan(expected)
+    choices[question_numbers[has_answer]] = expected[has_answer].astype(np.int16)
+    points[question_numbers] = pd.to_numeric(answers_df['배점'][valid], errors='coerce').fillna(0).to_numpy()
+    accepted = {}
+    multiple = multiple_answers(answers_df['정답'][valid])
+    if multiple:
+        for q_num, value in zip(question_numbers, answers_df['정답'][valid]):
+            if isinstance(value, str) and multiple.get(value):
+                accepted[int(q_num)] = multiple[value]
+                choices[q_num] = accepted_answers(value)[0]
+    return CompiledKey(choices, points, accepted)
+
+
+# 프로세스 전체에서 공유하는 컴파일된 정답 캐시: (저장소, 회차, 과목, 시험 구성 버전) → CompiledKey (정답이 없으면 None)
+_compiled_keys = {}
+_compiled_keys_lock = threading.Lock()
+# 컴파일 도중에 무효화되었으면 캐시에 넣지 않기 위한 세대 번호
+_compiled_generation = 0
+
+
+def get_compiled_key(storage, exam_round, subject):
+    cache_key = (id(storage), exam_round, subject, SCHEMA_VERSION)
+    compiled = _compiled_keys.get(cache_key)
+    if compiled is None and cache_key not in _compiled_keys:
+        generation = _compiled_generation
+        answers_df = storage.read('answers', where={'회차': exam_round, '과목': subject})
+        compiled = compile_answer_key(answers_df) if not answers_df.empty else None
+        with _compiled_keys_lock:
+            if generation == _compiled_generation:
+                _compiled_keys[cache_key] = compiled
+    return compiled
+
+
+# 교사가 정답을 저장하면 해당 (회차, 과목)의 컴파일 결과를 버림. 인자가 없으면 전체
+def invalidate_compiled_key(exam_round=None, subject=None):
+    global _compiled_generation
+    with _compiled_keys_lock:
+        _compiled_generation += 1
+        for cache_key in list(_compiled_keys):
+            if exam_round is None or cache_key[1:3] == (exam_round, subject):
+                del _compiled_keys[cache_key]
+
+
+# 제출한 답안(answers[i] 가 i+1번 답, 빈 문자열은 미응답)을 한 번 훑으며 채점
+def grade_submission(compiled, answers):
+    choices, points, accepted = compiled
+    marks = np.full(len(answers), NO_ANSWER, dtype=np.int8)
+    correct = 0
+    answered = 0
+    score = 0.0
+    for i, answer in enumerate(answers):
+        if not answer:
+            continue
+        answered += 1
+        q_num = i + 1
+        try:
+            is_correct = q_num < len(choices) and choices[q_num] != NO_ANSWER and (
+                int(float(answer)) == choices[q_num] or int(float(answer)) in accepted.get(q_num, ()))
+        except (ValueError, TypeError):
+            is_correct = False
+        marks[i] = 1 if is_correct else 0
+        if is_correct:
+            correct += 1
+            score += float(points[q_num])
+    return SubmissionResult(correct, answered - correct, score, marks)
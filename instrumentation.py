@@ -0,0 +1,216 @@
+"""재실행(rerun)별 구간 계측
+
+설정 로드, 인증, 데이터 읽기, 필터링, 채점, 통계, 차트 생성 등 각 구간의 실행 시간, 처리 행 수, 읽은 바이트를
+프로세스 내 고리 버퍼에 기록한다. 관리자 "시스템 설정" 탭에서 구간별 p50/p95 와 가장 느린 재실행을 확인하고
+CSV 로 내려받을 수 있다.
+
+    with instrumentation.stage('grading', 'submission') as s:
+        ...
+        s.record(rows=len(rows))
+
+계측이 꺼져 있으면 stage() 는 아무 일도 하지 않는 공용 객체를 돌려주므로 비용은 함수 호출 한 번이다.
+구간은 중첩될 수 있으며 각 구간의 시간은 안쪽 구간을 포함한다.
+"""
+import itertools
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+import pandas as pd
+
+# 환경 변수 INSTRUMENTATION=1 이면 시작부터 계측 (관리자 화면에서 켜고 끌 수 있음)
+enabled = os.getenv('INSTRUMENTATION', '0') == '1'
+
+# 고리 버퍼 크기: 오래된 기록부터 버려짐
+STAGE_SAMPLES = 20_000
+RERUN_SAMPLES = 2_000
+
+Sample = namedtuple('Sample', ['rerun', 'timestamp', 'role', 'tab', 'stage', 'detail', 'seconds', 'rows', 'bytes'])
+RerunSample = namedtuple('RerunSample', ['rerun', 'timestamp', 'role', 'tab', 'seconds', 'stages'])
+
+_samples = deque(maxlen=STAGE_SAMPLES)
+_reruns = deque(maxlen=RERUN_SAMPLES)
+_rerun_ids = itertools.count(1)
+# 스크립트 스레드별 현재 재실행과 열린 구간
+_local = threading.local()
+
+
+class _Rerun:
+    def __init__(self):
+        self.id = next(_rerun_ids)
+        self.start = time.perf_counter()
+        self.role = ''
+        self.tab = ''
+        self.stages = 0
+        # 탭(section)별 소요 시간. 가장 오래 걸린 탭을 재실행의 탭으로 기록
+        self.tab_seconds = {}
+
+
+class _Stage:
+    __slots__ = ('name', 'detail', 'rows', 'bytes', 'start')
+
+    def __init__(self, name, detail):
+        self.name = name
+        self.detail = detail
+        self.rows = 0
+        self.bytes = 0
+
+    def record(self, rows=0, nbytes=0):
+        self.rows += rows
+        self.bytes += nbytes
+
+    def __enter__(self):
+        _stack().append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        _stack().pop()
+        rerun = getattr(_local, 'rerun', None)
+        if rerun is not None:
+            rerun.stages += 1
+        _samples.append(Sample(
+            rerun.id if rerun else 0, time.time(), rerun.role if rerun else '', rerun.tab if rerun else '',
+            self.name, self.detail, seconds, self.rows, self.bytes,
+        ))
+        return False
+
+
+class _Section(_Stage):
+    """탭 하나의 실행 구간. 안에서 기록되는 구간에 탭 이름을 붙인다"""
+    __slots__ = ('previous_tab',)
+
+    def __enter__(self):
+        rerun = getattr(_local, 'rerun', None)
+        self.previous_tab = rerun.tab if rerun else ''
+        if rerun is not None:
+            rerun.tab = self.detail
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        super().__exit__(*exc_info)
+        rerun = getattr(_local, 'rerun', None)
+        if rerun is not None:
+            rerun.tab_seconds[self.detail] = rerun.tab_seconds.get(self.detail, 0) + seconds
+            rerun.tab = self.previous_tab
+        return False
+
+
+class _NullStage:
+    def record(self, rows=0, nbytes=0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def set_enabled(value):
+    global enabled
+    enabled = bool(value)
+
+
+# 구간 계측 context manager. detail 은 테이블 이름처럼 같은 구간을 나눠 보는 데 쓰는 부가 정보
+def stage(name, detail=''):
+    if not enabled:
+        return _NULL_STAGE
+    return _Stage(name, detail)
+
+
+# 탭 구간: 그 안의 구간들은 이 탭에서 실행된 것으로 기록
+def section(tab):
+    if not enabled:
+        return _NULL_STAGE
+    return _Section('tab', tab)
+
+
+# 현재 열린 가장 안쪽 구간에 처리 행 수/읽은 바이트 추가 (구간 밖이거나 계측이 꺼져 있으면 무시)
+def record(rows=0, nbytes=0):
+    if enabled:
+        stack = _stack()
+        if stack:
+            stack[-1].record(rows, nbytes)
+
+
+# 스크립트 시작 시 호출. 계측이 꺼져 있으면 아무것도 기록하지 않음
+def begin_rerun():
+    _local.rerun = _Rerun() if enabled else None
+    _local.stack = []
+
+
+def set_role(role):
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is not None:
+        rerun.role = role
+
+
+# 한 화면만 실행하는 재실행에서 그 화면 이름 기록 (section() 을 쓰지 않는 경우)
+def set_tab(tab):
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is not None:
+        rerun.tab = tab
+
+
+# 스크립트 끝(st.stop() 포함)에서 호출
+def end_rerun():
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is None:
+        return
+    _local.rerun = None
+    tab = max(rerun.tab_seconds, key=rerun.tab_seconds.get) if rerun.tab_seconds else rerun.tab
+    _reruns.append(RerunSample(rerun.id, time.time(), rerun.role, tab, time.perf_counter() - rerun.start, rerun.stages))
+
+
+def clear():
+    _samples.clear()
+    _reruns.clear()
+
+
+def samples():
+    return pd.DataFrame(list(_samples), columns=Sample._fields)
+
+
+def reruns():
+    return pd.DataFrame(list(_reruns), columns=RerunSample._fields)
+
+
+# 구간(및 detail)별 횟수, p50/p95 시간(ms), 평균 처리 행 수, 읽은 바이트 합계
+def stage_summary():
+    df = samples()
+    if df.empty:
+        return df
+    df['ms'] = df['seconds'] * 1000
+    grouped = df.groupby(['stage', 'detail'], sort=True)['ms']
+    summary = pd.DataFrame({
+        '횟수': grouped.size(),
+        'p50(ms)': grouped.median(),
+        'p95(ms)': grouped.quantile(0.95),
+        '평균 행 수': df.groupby(['stage', 'detail'], sort=True)['rows'].mean(),
+        '읽은 바이트': df.groupby(['stage', 'detail'], sort=True)['bytes'].sum(),
+    })
+    return summary.reset_index()
+
+
+# 가장 느린 최근 재실행 (역할, 탭 포함)
+def slowest_reruns(limit=10):
+    df = reruns()
+    if df.empty:
+        return df
+    df['ms'] = df['seconds'] * 1000
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+    return df.nlargest(limit, 'ms')[['rerun', 'timestamp', 'role', 'tab', 'ms', 'stages']]
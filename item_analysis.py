@@ -0,0 +1,94 @@
+"""(회차, 과목) 문항 분석: 난이도(정답률), 상하위 27% 변별도, 점이연 상관, 선택지 분포
+
+학생 × 문항 응답 행렬(response_matrix)에서 한 번에 계산한다. 결과는 (회차, 과목)별로 캐시하며,
+응답이나 정답이 바뀌어 그 부분의 행렬이 다시 만들어졌을 때만 새로 계산한다.
+
+    정답률      응시자 중 정답자 비율 (%, 미응답은 오답)
+    변별도      총점 상위 27% 집단 정답률 - 하위 27% 집단 정답률 (-1 ~ 1)
+    점이연 상관  문항 정오(0/1)와 그 문항을 뺀 총점의 상관계수
+    n번 선택    선택지별 선택 비율 (%), 미응답 비율 포함
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from grading import NO_ANSWER
+from response_matrix import CHOICES, UNANSWERED, load_matrix
+
+# 상하위 집단 비율
+GROUP_RATIO = 0.27
+
+# (저장소, 회차, 과목)별 (행렬, 분석 결과). 행렬 객체가 바뀌었으면(무효화 후 재생성) 다시 계산
+_results = {}
+_results_lock = threading.Lock()
+
+
+def _choice_columns():
+    return [f"{choice}번 선택" for choice in CHOICES]
+
+
+# 상관계수 (열 단위). 분산이 0 인 열은 NaN
+def _column_correlation(x, y):
+    x = x - x.mean(axis=0)
+    y = y - y.mean(axis=0)
+    denominator = np.sqrt((x * x).sum(axis=0) * (y * y).sum(axis=0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, (x * y).sum(axis=0) / denominator, np.nan)
+
+
+# 응답 행렬로 문항별 분석 표 계산
+def analyze(matrix):
+    num_students, num_questions = matrix.choices.shape
+    correct = matrix.correct()
+    scored = correct * matrix.points[np.newaxis, :]
+    totals = scored.sum(axis=1)
+
+    # 총점 순으로 상하위 27% (동점은 행 순서대로)
+    group_size = int(round(num_students * GROUP_RATIO))
+    if num_students >= 2 and group_size >= 1:
+        order = np.argsort(totals, kind='stable')
+        discrimination = correct[order[-group_size:]].mean(axis=0) - correct[order[:group_size]].mean(axis=0)
+    else:
+        discrimination = np.full(num_questions, np.nan)
+
+    point_biserial = _column_correlation(correct.astype(float), totals[:, np.newaxis] - scored)
+
+    students = max(num_students, 1)
+    distribution = matrix.choice_distribution() * 100.0 / students
+    unanswered = (matrix.choices == UNANSWERED).sum(axis=0) * 100.0 / students
+
+    result = pd.DataFrame({
+        '문항번호': np.arange(1, num_questions + 1),
+        '정답': pd.Series(matrix.answers).where(matrix.answers != NO_ANSWER).astype('Int64'),
+        '배점': matrix.points,
+        '응시자 수': num_students,
+        '정답률': correct.sum(axis=0) * 100.0 / students,
+        '변별도': discrimination,
+        '점이연 상관': point_biserial,
+    })
+    for k, column in enumerate(_choice_columns()):
+        result[column] = distribution[:, k]
+    result['미응답'] = unanswered
+    return result
+
+
+# (회차, 과목) 문항 분석 결과 (캐시 사용)
+def item_analysis(storage, exam_round, subject):
+    matrix = load_matrix(storage, exam_round, subject)
+    cache_key = (id(storage), exam_round, subject)
+    cached = _results.get(cache_key)
+    if cached is not None and cached[0] is matrix:
+        return cached[1]
+    result = analyze(matrix)
+    with _results_lock:
+        _results[cache_key] = (matrix, result)
+    return result
+
+
+# 히트맵용 (선택지 × 문항) 선택 비율 표. 행 이름은 선택지, 열 이름은 문항번호
+def choice_heatmap_frame(result):
+    columns = _choice_columns() + ['미응답']
+    frame = result.set_index('문항번호')[columns].T
+    frame.index = [column.replace(' 선택', '') for column in columns]
+    return frame
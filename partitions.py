@@ -0,0 +1,155 @@
+"""학교/반 단위 데이터 분할: 반마다 별도의 저장소를 쓰고, 계정의 역할과 반으로 읽고 쓸 분할을 정함
+
+분할은 "학교/반" 문자열로 적고, 그 저장소는 <DATA_DIR>/<학교>/<반>/ 아래에 만든다 (storage.get_storage(partition)).
+반이 없는 계정(기존 계정)은 기본 분할(<DATA_DIR> 바로 아래, 지금까지의 데이터)을 쓴다.
+
+config.yaml 계정 항목 (모두 선택)
+    role: teacher                      # admin / teacher / student. 없으면 아이디 admin, teacher 는 그 역할, 나머지는 학생
+    classes: [한빛고/3-1, 한빛고/3-2]    # 교사가 담당하는 반
+    class: 한빛고/3-1                   # 학생의 반
+
+학생은 자기 반 저장소에만 쓰고 교사는 담당 반 저장소만 읽으므로, 요청마다 읽고 쓰는 양은 학교 전체가 아니라 반 크기에 비례한다.
+관리자의 학교 전체 통계는 반마다 score_summary 로 만든 합계(반이 바뀔 때까지 storage.derived 로 재사용)를 더해서 계산한다.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from storage import get_storage
+
+ROLE_LABELS = {'admin': '관리자', 'teacher': '교사', 'student': '학생'}
+PARTITION_SEPARATOR = '/'
+DEFAULT_LABEL = '기본'
+# 학교/반 이름은 디렉토리 이름이 되므로 경로에 쓸 수 없는 문자와 . 으로 시작하는 이름은 허용하지 않음
+_INVALID_NAME = re.compile(r'[\\/:*?"<>|]|^\.')
+# 교사의 여러 반은 쉼표나 세미콜론으로 구분
+_CLASS_LIST_SEPARATOR = re.compile(r'[,;]')
+
+# 반 하나의 (회차, 과목)별 합계. 더하기만 하면 학교 전체의 평균, 표준편차, 정답률을 다시 계산할 수 있는 값
+AGGREGATE_COLUMNS = ['응시 인원', '점수 합', '점수 제곱합', '맞은 개수', '응답 수']
+
+
+# "학교/반" → (학교, 반). 빈 값은 기본 분할(None), 형식이 틀리면 ValueError
+def parse_partition(text):
+    text = '' if text is None else str(text).strip()
+    if not text:
+        return None
+    parts = [part.strip() for part in text.split(PARTITION_SEPARATOR)]
+    if len(parts) != 2 or not all(parts) or any(_INVALID_NAME.search(part) for part in parts):
+        raise ValueError(f"반은 '학교/반' 형식이어야 합니다: {text}")
+    return tuple(parts)
+
+
+def partition_label(partition):
+    return PARTITION_SEPARATOR.join(partition) if partition else DEFAULT_LABEL
+
+
+def account_role(username, info):
+    role = (info or {}).get('role')
+    if role in ROLE_LABELS:
+        return role
+    return username if username in ('admin', 'teacher') else 'student'
+
+
+# 계정이 읽고 쓰는 분할 목록 (교사는 담당 반, 학생은 자기 반, 반이 없으면 기본 분할)
+def account_partitions(username, info):
+    info = info or {}
+    role = account_role(username, info)
+    if role == 'teacher':
+        return [parse_partition(label) for label in info.get('classes') or []] or [None]
+    if role == 'student':
+        return [parse_partition(info.get('class'))]
+    return [None]
+
+
+# 계정 추가 화면/명단의 역할과 반 입력을 config.yaml 계정 항목으로 변환 (반 형식이 틀리면 ValueError)
+def account_fields(role, classes=''):
+    labels = [partition_label(parse_partition(label)) for label in _CLASS_LIST_SEPARATOR.split(classes or '')
+              if label.strip()]
+    if role == 'student':
+        if len(labels) > 1:
+            raise ValueError(f"학생은 반을 하나만 지정할 수 있습니다: {classes}")
+        return {'role': role, **({'class': labels[0]} if labels else {})}
+    if role == 'teacher' and labels:
+        return {'role': role, 'classes': labels}
+    return {'role': role}
+
+
+# 마지막으로 검사한 config 와 그 결과. config 는 config.yaml 이 바뀔 때까지 같은 객체를 재사용하므로 읽을 때마다 한 번만 검사
+_checked = (None, {})
+
+
+# 반 형식이 잘못된 계정: {아이디: 오류 메시지}. 손으로 고친 config.yaml 항목은 account_fields 검사를 거치지 않음
+def invalid_accounts(config):
+    global _checked
+    checked_config, errors = _checked
+    if checked_config is not config:
+        errors = {}
+        for username, info in config['credentials']['usernames'].items():
+            try:
+                account_partitions(username, info)
+            except ValueError as e:
+                errors[username] = str(e)
+        _checked = (config, errors)
+    return errors
+
+
+# 계정에 나오는 모든 분할 (기본 분할 포함, 학교/반 순서). 반 형식이 잘못된 계정은 건너뜀 (invalid_accounts 로 확인)
+def all_partitions(config):
+    partitions = {None}
+    invalid = invalid_accounts(config)
+    for username, info in config['credentials']['usernames'].items():
+        if username not in invalid:
+            partitions.update(account_partitions(username, info))
+    return sorted(partitions, key=lambda partition: partition or ())
+
+
+# 반 하나의 score_summary 로 (회차, 과목)별 합계 계산
+def partition_aggregate(summary_df):
+    scores = pd.to_numeric(summary_df['점수'], errors='coerce').fillna(0).astype(float)
+    frame = pd.DataFrame({
+        '회차': summary_df['회차'].astype(str).to_numpy(),
+        '과목': summary_df['과목'].astype(str).to_numpy(),
+        '점수': scores.to_numpy(),
+        '점수 제곱': (scores ** 2).to_numpy(),
+        '맞은 개수': pd.to_numeric(summary_df['맞은 개수'], errors='coerce').fillna(0).to_numpy(),
+        '응답 수': pd.to_numeric(summary_df['응답 수'], errors='coerce').fillna(0).to_numpy(),
+    })
+    grouped = frame.groupby(['회차', '과목'], sort=True)
+    return pd.DataFrame({
+        '응시 인원': grouped.size(),
+        '점수 합': grouped['점수'].sum(),
+        '점수 제곱합': grouped['점수 제곱'].sum(),
+        '맞은 개수': grouped['맞은 개수'].sum(),
+        '응답 수': grouped['응답 수'].sum(),
+    }, columns=AGGREGATE_COLUMNS).reset_index()
+
+
+# 합계에 평균, 표준편차(모표준편차), 평균정답률 열을 붙임
+def _with_statistics(totals):
+    count = totals['응시 인원'].to_numpy(dtype=float)
+    mean = np.divide(totals['점수 합'].to_numpy(dtype=float), count, out=np.zeros(len(totals)), where=count > 0)
+    square_mean = np.divide(totals['점수 제곱합'].to_numpy(dtype=float), count, out=np.zeros(len(totals)),
+                            where=count > 0)
+    answered = totals['응답 수'].to_numpy(dtype=float)
+    return totals.assign(
+        평균=mean,
+        표준편차=np.sqrt(np.clip(square_mean - mean ** 2, 0, None)),
+        평균정답률=np.divide(totals['맞은 개수'].to_numpy(dtype=float) * 100, answered, out=np.zeros(len(totals)),
+                        where=answered > 0),
+    )
+
+
+# 관리자용 학교/반 통계: (반별 표, 학교별 표). 반별 합계를 학교와 (회차, 과목)으로 묶어 더함
+def rollup(config):
+    aggregates = []
+    for partition in all_partitions(config):
+        aggregate = get_storage(partition).derived('score_summary', ('partition_aggregate',), partition_aggregate)
+        aggregates.append(aggregate.assign(학교=partition[0] if partition else DEFAULT_LABEL,
+                                           반=partition_label(partition)))
+    by_class = pd.concat(aggregates, ignore_index=True)
+    by_class = by_class[by_class['응시 인원'] > 0]
+    by_school = by_class.groupby(['학교', '회차', '과목'], sort=True)[AGGREGATE_COLUMNS].sum().reset_index()
+    by_class = by_class[['학교', '반', '회차', '과목'] + AGGREGATE_COLUMNS]
+    return _with_statistics(by_class.reset_index(drop=True)), _with_statistics(by_school)
@@ -0,0 +1,172 @@
+"""(회차, 과목) 응답을 학생 × 문항 정수 행렬로 표현하고, 브로드캐스팅으로 채점/통계를 계산"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from grading import NO_ANSWER, compile_answer_key, normalize_choice
+from subjects import SCHEMA_VERSION, question_count
+
+# 행렬 원소의 특수값: 미응답, 숫자로 해석할 수 없는 응답(응답했지만 오답 처리)
+UNANSWERED = -1
+INVALID = -2
+
+# 선택지 분포를 셀 때 사용하는 선택지
+CHOICES = np.arange(1, 6)
+
+
+class ResponseMatrix:
+    """학생 × 문항 응답 행렬과 같은 길이의 정답/배점 벡터"""
+
+    def __init__(self, student_ids, choices, answers, points, accepted=None):
+        self.student_ids = student_ids  # (학생 수,) 학생ID
+        self.choices = choices          # (학생 수, 문항 수) int8 (값이 크면 int16), UNANSWERED/INVALID 포함
+        self.answers = answers          # (문항 수,) 정답 (복수 정답이면 대표 정답), 정답이 없으면 NO_ANSWER
+        self.points = points            # (문항 수,) 배점
+        self.accepted = accepted or {}  # 복수 정답 문항만 {열 번호: 인정하는 답 배열}
+
+    @property
+    def num_questions(self):
+        return self.choices.shape[1]
+
+    # 응답한 칸 (숫자가 아닌 응답 포함)
+    def answered(self):
+        return self.choices != UNANSWERED
+
+    # 정답인 칸 (rows 를 주면 그 학생 행만, 복수 정답 문항은 인정하는 답 모두)
+    def correct(self, rows=None):
+        choices = self.choices if rows is None else self.choices[rows]
+        correct = (choices == self.answers[np.newaxis, :]) & (self.answers != NO_ANSWER)[np.newaxis, :]
+        for column, values in self.accepted.items():
+            correct[:, column] = np.isin(choices[:, column], values)
+        return correct
+
+    def correct_counts(self):
+        return self.correct().sum(axis=1)
+
+    def answered_counts(self):
+        return self.answered().sum(axis=1)
+
+    # 배점을 반영한 학생별 총점
+    def total_scores(self):
+        return self.correct() @ self.points
+
+    # 문항별 (맞은 개수, 응답 수)
+    def question_counts(self):
+        return self.correct().sum(axis=0), self.answered().sum(axis=0)
+
+    # 문항별 정답률 (%), 응답이 없는 문항은 0
+    def question_accuracy(self):
+        correct, attempts = self.question_counts()
+        return np.divide(correct * 100.0, attempts, out=np.zeros(self.num_questions), where=attempts > 0)
+
+    # (문항 수, 5) 문항별 1~5번 선택 인원
+    def choice_distribution(self):
+        return (self.choices[:, :, np.newaxis] == CHOICES[np.newaxis, np.newaxis, :]).sum(axis=0)
+
+    # 학생별 결과 표 (채점 결과 탭 형식)
+    def student_results(self):
+        correct = self.correct_counts()
+        answered = self.answered_counts()
+        return pd.DataFrame({
+            '학생ID': self.student_ids,
+            '맞은 개수': correct,
+            '틀린 개수': answered - correct,
+            '정답률': np.divide(correct * 100.0, answered, out=np.zeros(len(correct)), where=answered > 0),
+            '점수': self.total_scores(),
+        })
+
+    def nbytes(self):
+        return self.choices.nbytes + self.answers.nbytes + self.points.nbytes + self.student_ids.nbytes
+
+
+# 한 (회차, 과목)의 응답(긴 형식)과 정답으로 행렬 생성
+def build_matrix(responses_df, answers_df, num_questions=None):
+    compiled = compile_answer_key(answers_df) if not answers_df.empty else None
+    question_numbers = pd.to_numeric(responses_df['문항번호'], errors='coerce')
+    valid = question_numbers.notna() & (question_numbers >= 1)
+    question_numbers = question_numbers[valid].astype(int).to_numpy()
+    student_codes, student_ids = pd.factorize(responses_df['학생ID'][valid])
+
+    width = num_questions or 0
+    if compiled is not None:
+        width = max(width, len(compiled.choices) - 1)
+    if len(question_numbers):
+        width = max(width, int(question_numbers.max()))
+
+    values = normalize_choice(responses_df['입력답'][valid]).to_numpy()
+    values = np.where(np.isnan(values) | (values < 0), INVALID, values)
+    # 보통은 1~5 이므로 int8, 수학 단답형처럼 큰 값이 있으면 int16
+    dtype = np.int8 if len(values) == 0 or (values.max() <= 127 and values.min() >= -128) else np.int16
+    choices = np.full((len(student_ids), width), UNANSWERED, dtype=dtype)
+    choices[student_codes, question_numbers - 1] = values.astype(dtype)
+
+    answers, points, accepted = _key_vectors(compiled, width)
+    return ResponseMatrix(np.asarray(student_ids, dtype=object), choices, answers, points, accepted)
+
+
+# 컴파일된 정답을 너비 width 의 (정답, 배점, 복수 정답) 벡터로 변환
+def _key_vectors(compiled, width):
+    answers = np.full(width, NO_ANSWER, dtype=np.int16)
+    points = np.zeros(width, dtype=np.float32)
+    accepted = {}
+    if compiled is not None:
+        size = len(compiled.choices) - 1
+        answers[:size] = compiled.choices[1:]
+        points[:size] = compiled.points[1:]
+        accepted = {q_num - 1: np.array(sorted(values)) for q_num, values in compiled.accepted.items()}
+    return answers, points, accepted
+
+
+# 프로세스 전체에서 공유하는 (저장소, 회차, 과목, 시험 구성 버전)별 행렬 캐시. 처음 요청할 때 저장소에서 읽어 만듦
+# 행렬 너비는 시험 구성의 문항 수 (응답이나 정답에 더 큰 문항번호가 있으면 그만큼)
+_matrices = {}
+_matrices_lock = threading.Lock()
+# 만드는 도중에 무효화되었으면 캐시에 넣지 않기 위한 세대 번호
+_generation = 0
+
+
+def load_matrix(storage, exam_round, subject):
+    cache_key = (id(storage), exam_round, subject, SCHEMA_VERSION)
+    matrix = _matrices.get(cache_key)
+    if matrix is None:
+        generation = _generation
+        partition = {'회차': exam_round, '과목': subject}
+        matrix = build_matrix(storage.read('responses', where=partition), storage.read('answers', where=partition),
+                              question_count(exam_round, subject))
+        with _matrices_lock:
+            if generation == _generation:
+                _matrices[cache_key] = matrix
+    return matrix
+
+
+# 이미 캐시된 행렬 (없으면 만들지 않고 None)
+def cached_matrix(storage, exam_round, subject):
+    return _matrices.get((id(storage), exam_round, subject, SCHEMA_VERSION))
+
+
+# 해당 (회차, 과목)의 응답이나 정답이 바뀌면 호출. 인자가 없으면 전체
+def invalidate_matrix(exam_round=None, subject=None):
+    global _generation
+    with _matrices_lock:
+        _generation += 1
+        for cache_key in list(_matrices):
+            if exam_round is None or cache_key[1:3] == (exam_round, subject):
+                del _matrices[cache_key]
+
+
+# 정답만 바뀌었을 때: 캐시된 행렬의 응답은 그대로 두고 정답/배점 벡터만 교체 (응답 수와 무관하게 문항 수만큼의 작업)
+def replace_matrix_key(storage, exam_round, subject, answers_df):
+    global _generation
+    compiled = compile_answer_key(answers_df) if not answers_df.empty else None
+    cache_key = (id(storage), exam_round, subject, SCHEMA_VERSION)
+    with _matrices_lock:
+        _generation += 1
+        matrix = _matrices.get(cache_key)
+        if matrix is None:
+            return
+        if compiled is not None and len(compiled.choices) - 1 > matrix.num_questions:
+            del _matrices[cache_key]
+            return
+        _matrices[cache_key] = ResponseMatrix(matrix.student_ids, matrix.choices,
+                                              *_key_vectors(compiled, matrix.num_questions))
@@ -0,0 +1,266 @@
+"""(회차, 과목)별 점수 순위 색인: 백분위, 표준점수, 9등급
+
+점수 구간(0.5점 단위)별 인원을 Fenwick 트리(누적합 트리)에 담아, 학생 한 명의 점수 갱신과 순위 조회를
+O(log 점수 범위)로 처리한다. 응시 인원이 늘어도 제출 한 건의 비용은 늘지 않는다.
+평균/표준편차는 점수 합과 제곱합으로 함께 갱신한다.
+
+    백분위    (나보다 낮은 인원 + 같은 점수 인원의 절반) / 응시 인원 × 100
+    표준점수  척도 평균 + 척도 표준편차 × (점수 - 평균) / 표준편차 (subjects.STANDARD_SCORE_SCALES)
+    등급      나보다 높은 인원의 비율로 4/11/23/40/60/77/89/96% 경계 적용 (동점자는 높은 등급)
+              영어/한국사 같은 절대평가 과목은 원점수 하한(subjects.ABSOLUTE_GRADE_CUTS)으로 매기고 표준점수는 없음
+
+색인은 프로세스마다 score_summary 에서 처음 필요할 때 만들고, 학생 제출 때 summary.record_submissions() 가
+갱신한다. 정답 저장이나 요약 재구성처럼 부분 전체가 바뀌면 invalidate_index() 로 버리고 다음 조회 때 다시 만든다.
+"""
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from subjects import ABSOLUTE_GRADE_CUTS, STANDARD_SCORE_SCALES
+
+# 상대평가 1~8등급의 상위 누적 비율(%) 경계
+GRADE_CUTS = np.array([4, 11, 23, 40, 60, 77, 89, 96])
+# 점수 구간 단위 (배점이 정수이므로 0.5점 단위면 충분)
+SCORE_RESOLUTION = 2
+INITIAL_BUCKETS = 256
+
+Standing = namedtuple('Standing', ['count', 'rank', 'percentile', 'standard_score', 'grade'])
+
+
+class FenwickTree:
+    """구간 [0, size) 의 인원 수. 한 칸 더하기와 앞부분 합을 O(log size)에"""
+
+    def __init__(self, counts):
+        self.size = len(counts)
+        tree = [0] + [int(c) for c in counts]
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def add(self, index, delta):
+        i = index + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    # [0, index] 합 (index 가 음수이면 0)
+    def prefix(self, index):
+        total = 0
+        i = min(index + 1, self.size)
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+def _bucket(score):
+    return max(int(round(float(score) * SCORE_RESOLUTION)), 0)
+
+
+def _grade_by_share(share_above):
+    return np.searchsorted(GRADE_CUTS, share_above, side='right') + 1
+
+
+class ScoreIndex:
+    def __init__(self, subject, scores=None):
+        self.subject = subject
+        self._buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        buckets = {student_id: _bucket(score) for student_id, score in (scores or {}).items() if pd.notna(score)}
+        counts = np.zeros(max([INITIAL_BUCKETS] + [b + 1 for b in buckets.values()]), dtype=np.int64)
+        for student_id, bucket in buckets.items():
+            counts[bucket] += 1
+            self._add_moments(bucket, 1)
+        self._buckets = buckets
+        self._counts = counts
+        self._tree = FenwickTree(counts)
+
+    def _add_moments(self, bucket, sign):
+        score = bucket / SCORE_RESOLUTION
+        self.count += sign
+        self.total += sign * score
+        self.total_squares += sign * score * score
+
+    def _grow(self, bucket):
+        size = max(bucket + 1, len(self._counts) * 2)
+        self._counts = np.concatenate([self._counts, np.zeros(size - len(self._counts), dtype=np.int64)])
+        self._tree = FenwickTree(self._counts)
+
+    # 학생 점수 추가/변경 (None 이면 삭제)
+    def set(self, student_id, score):
+        old = self._buckets.pop(student_id, None)
+        if old is not None:
+            self._counts[old] -= 1
+            self._tree.add(old, -1)
+            self._add_moments(old, -1)
+        if score is None or pd.isna(score):
+            return
+        bucket = _bucket(score)
+        if bucket >= len(self._counts):
+            self._grow(bucket)
+        self._buckets[student_id] = bucket
+        self._counts[bucket] += 1
+        self._tree.add(bucket, 1)
+        self._add_moments(bucket, 1)
+
+    def mean_std(self, count=None, total=None, total_squares=None):
+        count = self.count if count is None else count
+        total = self.total if total is None else total
+        total_squares = self.total_squares if total_squares is None else total_squares
+        if count == 0:
+            return np.nan, np.nan
+        mean = total / count
+        return mean, float(np.sqrt(max(total_squares / count - mean * mean, 0.0)))
+
+    def _standard_score(self, score, mean, std):
+        scale = STANDARD_SCORE_SCALES.get(self.subject)
+        if scale is None or np.isnan(mean):
+            return None
+        scale_mean, scale_std = scale
+        return int(round(scale_mean + scale_std * (score - mean) / std)) if std > 0 else scale_mean
+
+    # 학생이 score 점을 받았을 때의 위치 (이전 점수가 있으면 그 점수를 빼고 계산). 제출 직후 저장 전에도 사용
+    def standing(self, score, student_id=None):
+        bucket = _bucket(score)
+        score = bucket / SCORE_RESOLUTION
+        below = self._tree.prefix(bucket - 1)
+        equal = self._tree.prefix(bucket) - below
+        count, total, total_squares = self.count, self.total, self.total_squares
+        old = self._buckets.get(student_id)
+        if old is not None:
+            below -= old < bucket
+            equal -= old == bucket
+            count -= 1
+            total -= old / SCORE_RESOLUTION
+            total_squares -= (old / SCORE_RESOLUTION) ** 2
+        count += 1
+        equal += 1
+        total += score
+        total_squares += score * score
+        above = count - below - equal
+        mean, std = self.mean_std(count, total, total_squares)
+        return Standing(
+            count=count,
+            rank=above + 1,
+            percentile=(below + equal / 2) / count * 100,
+            standard_score=self._standard_score(score, mean, std),
+            grade=self._grade(score, above / count * 100),
+        )
+
+    def _grade(self, score, share_above):
+        cuts = ABSOLUTE_GRADE_CUTS.get(self.subject)
+        if cuts is not None:
+            return int(np.searchsorted(-np.asarray(cuts), -score, side='left') + 1)
+        return int(_grade_by_share(share_above))
+
+    # 여러 점수의 (순위, 백분위, 표준점수, 등급)을 한 번에 (교사 화면용, 색인에 이미 들어 있는 점수)
+    def standings(self, scores):
+        buckets = np.array([_bucket(score) for score in scores], dtype=np.int64)
+        counts = self._counts
+        cumulative = np.cumsum(counts)
+        count = max(self.count, 1)
+        equal = counts[buckets]
+        below = cumulative[buckets] - equal
+        above = self.count - cumulative[buckets]
+        values = buckets / SCORE_RESOLUTION
+        mean, std = self.mean_std()
+        scale = STANDARD_SCORE_SCALES.get(self.subject)
+        if scale is None or np.isnan(mean):
+            standard = pd.array([pd.NA] * len(buckets), dtype='Int64')
+        elif std > 0:
+            standard = pd.array(np.round(scale[0] + scale[1] * (values - mean) / std).astype(int), dtype='Int64')
+        else:
+            standard = pd.array(np.full(len(buckets), scale[0]), dtype='Int64')
+        cuts = ABSOLUTE_GRADE_CUTS.get(self.subject)
+        if cuts is not None:
+            grades = np.searchsorted(-np.asarray(cuts), -values, side='left') + 1
+        else:
+            grades = _grade_by_share(above / count * 100)
+        return pd.DataFrame({
+            '순위': above + 1,
+            '백분위': (below + equal / 2) / count * 100,
+            '표준점수': standard,
+            '등급': grades,
+        })
+
+    # 점수별 인원 (인원이 있는 점수만)
+    def distribution(self):
+        buckets = np.flatnonzero(self._counts)
+        return pd.DataFrame({'점수': buckets / SCORE_RESOLUTION, '인원': self._counts[buckets]})
+
+    # 등급별 인원과 최저 점수(등급컷)
+    def grade_table(self):
+        distribution = self.distribution()
+        if distribution.empty:
+            return pd.DataFrame(columns=['등급', '최저 점수', '인원', '비율'])
+        distribution['등급'] = self.standings(distribution['점수'])['등급'].to_numpy()
+        grouped = distribution.groupby('등급', sort=True)
+        table = pd.DataFrame({'최저 점수': grouped['점수'].min(), '인원': grouped['인원'].sum()}).reset_index()
+        table['비율'] = table['인원'] / self.count * 100
+        return table
+
+
+# (저장소, 회차, 과목)별 색인
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _build(storage, exam_round, subject):
+    rows = storage.read('score_summary', where={'회차': exam_round, '과목': subject})
+    return ScoreIndex(subject, dict(zip(rows['학생ID'], pd.to_numeric(rows['점수'], errors='coerce'))))
+
+
+# 색인을 만들거나 가져와 func(index) 실행 (색인 조회/갱신은 잠금 안에서)
+def _with_index(storage, exam_round, subject, func):
+    key = (id(storage), exam_round, subject)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = _build(storage, exam_round, subject)
+        return func(index)
+
+
+def standing(storage, exam_round, subject, student_id, score):
+    return _with_index(storage, exam_round, subject, lambda index: index.standing(score, student_id))
+
+
+def standings(storage, exam_round, subject, scores):
+    return _with_index(storage, exam_round, subject, lambda index: index.standings(scores))
+
+
+# 교사 화면용 (점수 분포, 등급별 표, 평균, 표준편차)
+def distribution(storage, exam_round, subject):
+    return _with_index(storage, exam_round, subject,
+                       lambda index: (index.distribution(), index.grade_table()) + index.mean_std())
+
+
+# 학생 제출로 바뀐 점수 반영 {학생ID: 점수 또는 None(삭제)}. 아직 만들지 않은 색인은 다음 조회 때 저장소에서 만듦
+def update_scores(storage, exam_round, subject, scores):
+    with _indexes_lock:
+        index = _indexes.get((id(storage), exam_round, subject))
+        if index is not None:
+            for student_id, score in scores.items():
+                index.set(student_id, score)
+
+
+# 색인을 버리고 다음 조회 때 score_summary 에서 다시 만듦. 인자가 없으면 전체
+def invalidate_index(exam_round=None, subject=None):
+    with _indexes_lock:
+        for key in list(_indexes):
+            if exam_round is None or key[1:] == (exam_round, subject):
+                del _indexes[key]
+
+
+# 증분 갱신한 색인과 score_summary 로 새로 만든 색인의 (학생별 순위) 비교. 어긋난 학생 수 반환
+def check_index(storage, exam_round, subject):
+    rows = storage.read('score_summary', where={'회차': exam_round, '과목': subject})
+    scores = pd.to_numeric(rows['점수'], errors='coerce')
+    fresh = _build(storage, exam_round, subject).standings(scores)
+    live = standings(storage, exam_round, subject, scores)
+    return int((fresh['순위'].to_numpy() != live['순위'].to_numpy()).sum())
@@ -0,0 +1,606 @@
+"""데이터 저장소: 기존 CSV 파일 방식, 내장 SQLite 방식, 열 지향(Parquet) 방식을 같은 인터페이스로 제공"""
+import argparse
+import io
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+import data_cache
+import instrumentation
+
+# 테이블별 컬럼
+TABLES = {
+    'answers': ['회차', '과목', '문항번호', '정답', '배점'],
+    'responses': ['학생ID', '회차', '과목', '문항번호', '입력답'],
+    'student_answers': ['학생ID', '회차', '과목', '문항번호', '정답'],
+    'student_subjects': ['학생ID', '회차', '탐구1', '탐구2'],
+    # 채점 결과 요약 (summary.py 가 증분 갱신)
+    'score_summary': ['학생ID', '회차', '과목', '맞은 개수', '응답 수', '점수'],
+    'question_summary': ['회차', '과목', '문항번호', '맞은 개수', '응답 수'],
+    # 정답 변경 이력: 저장할 때마다 바뀐 문항만 (answer_versions.py)
+    'answer_history': ['회차', '과목', '버전', '문항번호', '이전 정답', '이전 배점', '정답', '배점', '저장 시각'],
+}
+
+# 테이블별 기본 키 (SQLite 인덱스 및 upsert 기준)
+PRIMARY_KEYS = {
+    'answers': ['회차', '과목', '문항번호'],
+    'responses': ['학생ID', '회차', '과목', '문항번호'],
+    'student_answers': ['학생ID', '회차', '과목', '문항번호'],
+    'student_subjects': ['학생ID', '회차'],
+    'score_summary': ['학생ID', '회차', '과목'],
+    'question_summary': ['회차', '과목', '문항번호'],
+    'answer_history': ['회차', '과목', '버전', '문항번호'],
+}
+
+# SQLite 컬럼 타입
+COLUMN_TYPES = {
+    '학생ID': 'TEXT',
+    '회차': 'TEXT',
+    '과목': 'TEXT',
+    '문항번호': 'INTEGER',
+    '정답': 'TEXT',
+    '배점': 'NUMERIC',
+    '입력답': 'TEXT',
+    '탐구1': 'TEXT',
+    '탐구2': 'TEXT',
+    '맞은 개수': 'INTEGER',
+    '응답 수': 'INTEGER',
+    '점수': 'NUMERIC',
+    '버전': 'INTEGER',
+    '이전 정답': 'TEXT',
+    '이전 배점': 'NUMERIC',
+    '저장 시각': 'TEXT',
+}
+
+# Parquet 컬럼 타입: 반복되는 키 문자열은 사전(categorical) 인코딩, 숫자는 작은 정수형
+COLUMNAR_TYPES = {
+    '학생ID': 'category',
+    '회차': 'category',
+    '과목': 'category',
+    '문항번호': 'Int8',
+    '정답': 'string',    # 복수 정답("2/4")이 있으므로 문자열
+    '배점': 'Int8',
+    '입력답': 'Int16',
+    '탐구1': 'category',
+    '탐구2': 'category',
+    '맞은 개수': 'Int32',
+    '응답 수': 'Int32',
+    '점수': 'float32',
+    '버전': 'Int32',
+    '이전 정답': 'string',
+    '이전 배점': 'Int8',
+    '저장 시각': 'category',
+}
+
+# CSV 에서 항상 문자열로 읽는 키 컬럼. 숫자로만 된 학생ID("20101")가 정수로 읽히면 키 비교가 어긋나
+# 재제출이 덧붙이기로 처리되어 행이 중복되고, read(where={'학생ID': '20101'}) 도 빈 결과가 됨
+CSV_DTYPES = {'학생ID': str, '회차': str, '과목': str}
+
+DEFAULT_DATA_DIR = 'data'
+DEFAULT_DB_NAME = 'yeonhap.db'
+DEFAULT_PARQUET_DIR = 'parquet'
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+# 조건(where)에 해당하는 행 마스크. 값이 리스트/튜플이면 그중 하나와 같은 행 (SQL 의 IN)
+def _match(df, where):
+    mask = pd.Series(True, index=df.index)
+    for column, value in (where or {}).items():
+        if isinstance(value, (list, tuple)):
+            mask &= df[column].isin(value)
+        else:
+            mask &= df[column] == value
+    return mask
+
+
+# 공유 캐시 키에 넣을 조건 (리스트 값은 튜플로)
+def _where_key(where):
+    return tuple(sorted((column, tuple(value) if isinstance(value, list) else value)
+                        for column, value in (where or {}).items()))
+
+
+# columns 값 조합이 keys 중 하나인 행 마스크 (여러 where 조건을 한 번에 검사)
+def _match_any(df, columns, keys):
+    if df.empty or not keys:
+        return pd.Series(False, index=df.index)
+    index = pd.MultiIndex.from_arrays([df[column] for column in columns])
+    return pd.Series(index.isin(list(keys)), index=df.index)
+
+
+# 테이블에 존재하는 columns 값 조합의 집합
+def _key_set(df, columns):
+    return set(zip(*(df[column] for column in columns)))
+
+
+# replace_many 인자 정리: 같은 키가 여러 번 있으면 마지막 교체만 반영. (where 컬럼, {키: rows}) 반환
+def _latest_replacements(table, replacements):
+    where_columns = tuple(replacements[0][0])
+    latest = {}
+    for where, rows in replacements:
+        if tuple(where) != where_columns:
+            raise ValueError("replace_many 의 where 조건은 모두 같은 컬럼이어야 합니다.")
+        latest[tuple(where.values())] = pd.DataFrame(rows, columns=TABLES[table])
+    return where_columns, latest
+
+
+class CsvStorage:
+    """data/ 아래 CSV 파일을 테이블로 사용하는 저장소 (기존 방식)"""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR):
+        self.data_dir = data_dir
+        # 같은 프로세스 안의 세션끼리 읽기-수정-쓰기가 겹치지 않도록 파일별 잠금
+        self._locks = {table: threading.Lock() for table in TABLES}
+
+    def path(self, table):
+        return os.path.join(self.data_dir, f"{table}.csv")
+
+    # 데이터 파일이 없으면 생성
+    def initialize(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        for table, columns in TABLES.items():
+            if not os.path.exists(self.path(table)):
+                pd.DataFrame({column: [] for column in columns}).to_csv(self.path(table), index=False)
+
+    # 캐시된 테이블에서 조건에 맞는 행을 골라 반환 (파일이 바뀌지 않았으면 디스크를 읽지 않음)
+    def read(self, table, where=None):
+        with instrumentation.stage('read', table) as s:
+            df = data_cache.read_csv(self.path(table), CSV_DTYPES)
+            if where:
+                with instrumentation.stage('filter', table):
+                    df = df[_match(df, where)]
+            s.record(rows=len(df))
+        return df
+
+    # 테이블 전체로부터 계산한 값을 테이블이 바뀔 때까지 공유 캐시에 보관 (처음 요청할 때 build(df) 로 계산)
+    def derived(self, table, name, build):
+        path = self.path(table)
+        return _derived(('csv', path), name, build, data_cache.read_csv(path, CSV_DTYPES))
+
+    # where 조건에 해당하는 기존 행을 지우고 rows 로 교체 (한 번의 삭제 + 삽입). where 가 비어 있으면 테이블 전체 교체
+    def replace(self, table, where, rows):
+        path = self.path(table)
+        rows = _as_parsed(pd.DataFrame(rows, columns=TABLES[table]))
+        where_columns = tuple(where)
+        where_key = tuple(where.values())
+        index_name = ('keys',) + where_columns
+        with self._locks[table]:
+            df = data_cache.read_csv(path, CSV_DTYPES)
+            # where 컬럼 값 조합의 집합 (캐시된 테이블당 한 번만 계산하고 이후 저장 때마다 갱신)
+            key_index = data_cache.derived(('csv', path), index_name, lambda frame: _key_set(frame, where_columns))
+            if where and where_key not in key_index and list(df.columns) == TABLES[table]:
+                # 처음 저장하는 키이면 파일 끝에 새 행만 덧붙임 (기존 데이터 크기와 무관)
+                rows.to_csv(path, mode='a', header=False, index=False)
+                df = pd.concat([df, rows], ignore_index=True) if not df.empty else rows
+            else:
+                df = df[~_match(df, where)]
+                df = pd.concat([df, rows], ignore_index=True) if not df.empty else rows
+                _write_csv(df, path)
+            if rows.empty:
+                key_index.discard(where_key)
+            else:
+                key_index.add(where_key)
+            # 방금 쓴 내용으로 캐시를 갱신하여 다음 읽기에서 파일 전체를 다시 파싱하지 않음
+            data_cache.put(('csv', path), [path], df, derived={index_name: key_index})
+
+    # 같은 컬럼의 where 조건 여러 개에 대한 replace 를 파일 쓰기 한 번으로 처리 (모두 새 키이면 덧붙이기)
+    def replace_many(self, table, replacements):
+        if not replacements:
+            return
+        path = self.path(table)
+        where_columns, latest = _latest_replacements(table, replacements)
+        rows = _as_parsed(pd.concat(latest.values(), ignore_index=True))
+        keys = set(latest)
+        index_name = ('keys',) + where_columns
+        with self._locks[table]:
+            df = data_cache.read_csv(path, CSV_DTYPES)
+            key_index = data_cache.derived(('csv', path), index_name, lambda frame: _key_set(frame, where_columns))
+            appended = key_index.isdisjoint(keys) and list(df.columns) == TABLES[table]
+            if appended:
+                rows.to_csv(path, mode='a', header=False, index=False)
+            else:
+                df = df[~_match_any(df, where_columns, keys)]
+            df = pd.concat([df, rows], ignore_index=True) if not df.empty else rows
+            if not appended:
+                _write_csv(df, path)
+            key_index -= keys
+            key_index |= _key_set(rows, where_columns)
+            data_cache.put(('csv', path), [path], df, derived={index_name: key_index})
+
+    # 쓴 파일을 디스크에 반영 (정전 시에도 남도록)
+    def sync(self, tables):
+        for table in tables:
+            _fsync(self.path(table))
+
+
+class SqliteStorage:
+    """인덱스가 있는 내장 SQLite 데이터베이스 저장소"""
+
+    def __init__(self, db_path=None, data_dir=DEFAULT_DATA_DIR):
+        self.data_dir = data_dir
+        self.db_path = db_path or os.path.join(data_dir, DEFAULT_DB_NAME)
+
+    def _connect(self):
+        # 세션(스레드)마다 짧게 연결을 열고 닫음. 잠금 경합 시 최대 30초 대기
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    # 테이블과 인덱스 생성
+    def initialize(self):
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        connection = self._connect()
+        try:
+            # 읽기와 쓰기가 서로를 막지 않도록 WAL 모드 사용
+            connection.execute('PRAGMA journal_mode = WAL')
+            for table, columns in TABLES.items():
+                column_sql = ', '.join(f"{_quote(c)} {COLUMN_TYPES[c]}" for c in columns)
+                key_sql = ', '.join(_quote(c) for c in PRIMARY_KEYS[table])
+                connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ({column_sql}, PRIMARY KEY ({key_sql}))"
+                )
+            # 교사 화면의 (회차, 과목) 조회용 보조 인덱스
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS responses_round_subject ON responses ("회차", "과목", "문항번호")'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS student_answers_round_subject ON student_answers ("회차", "과목")'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS score_summary_round_subject ON score_summary ("회차", "과목")'
+            )
+            connection.commit()
+        finally:
+            connection.close()
+
+    # 조회 결과는 데이터베이스 파일(및 WAL)의 mtime/크기로 검증되는 공유 캐시에 보관
+    def read(self, table, where=None):
+        key = ('sqlite', self.db_path, table) + _where_key(where)
+        paths = [self.db_path, self.db_path + '-wal']
+        with instrumentation.stage('read', table) as s:
+            df = data_cache.cached(key, paths, lambda: self._query(table, where))
+            s.record(rows=len(df))
+        return df
+
+    def derived(self, table, name, build):
+        return _derived(('sqlite', self.db_path, table), name, build, self.read(table))
+
+    def _query(self, table, where):
+        columns = TABLES[table]
+        sql = f"SELECT {', '.join(_quote(c) for c in columns)} FROM {table}"
+        params = []
+        if where:
+            conditions = []
+            for column, value in where.items():
+                if isinstance(value, (list, tuple)):
+                    conditions.append(f"{_quote(column)} IN ({', '.join('?' * len(value))})" if value else '0')
+                    params.extend(value)
+                else:
+                    conditions.append(f"{_quote(column)} = ?")
+                    params.append(value)
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        connection = self._connect()
+        try:
+            return pd.read_sql_query(sql, connection, params=params)
+        finally:
+            connection.close()
+
+    # where 조건의 행을 rows 로 교체: 키가 같은 행은 upsert, rows 에 없는 기존 행은 삭제 (한 트랜잭션)
+    # where 가 비어 있으면 테이블 전체 교체
+    def replace(self, table, where, rows):
+        self._write(table, [(where, rows)])
+
+    # 같은 컬럼의 where 조건 여러 개에 대한 replace 를 한 트랜잭션으로 처리
+    def replace_many(self, table, replacements):
+        if replacements:
+            self._write(table, replacements)
+
+    def _write(self, table, replacements):
+        connection = self._connect()
+        try:
+            with connection:
+                for where, rows in replacements:
+                    _replace_rows(connection, table, where, rows)
+        finally:
+            connection.close()
+            data_cache.invalidate('sqlite', self.db_path)
+
+    # 커밋할 때 SQLite 가 WAL 을 fsync 하므로 (synchronous 기본값 FULL) 추가로 할 일이 없음
+    def sync(self, tables):
+        pass
+
+
+def _replace_rows(connection, table, where, rows):
+    columns = TABLES[table]
+    keys = PRIMARY_KEYS[table]
+    rows = pd.DataFrame(rows, columns=columns)
+    records = [tuple(_to_sql_value(v) for v in row) for row in rows.itertuples(index=False)]
+
+    where_sql = ' AND '.join(f"{_quote(c)} = ?" for c in where)
+    placeholders = ', '.join('?' for _ in columns)
+    updates = ', '.join(f"{_quote(c)} = excluded.{_quote(c)}" for c in columns if c not in keys)
+    upsert_sql = (
+        f"INSERT INTO {table} ({', '.join(_quote(c) for c in columns)}) VALUES ({placeholders}) "
+        f"ON CONFLICT ({', '.join(_quote(c) for c in keys)}) "
+        + (f"DO UPDATE SET {updates}" if updates else 'DO NOTHING')
+    )
+
+    # where 에 포함되지 않은 키 컬럼 기준으로 이번 rows 에 없는 기존 행 삭제
+    remaining = [c for c in keys if c not in where]
+    delete_sql = f"DELETE FROM {table}" + (f" WHERE {where_sql}" if where else '')
+    params = list(where.values())
+    if where and remaining and records:
+        key_index = [columns.index(c) for c in remaining]
+        row_sql = '(' + ', '.join('?' for _ in remaining) + ')'
+        delete_sql += (
+            f" AND ({', '.join(_quote(c) for c in remaining)}) NOT IN "
+            f"(VALUES {', '.join(row_sql for _ in records)})"
+        )
+        params += [record[i] for record in records for i in key_index]
+    connection.execute(delete_sql, params)
+    connection.executemany(upsert_sql, records)
+
+
+# 새 행을 CSV 로 썼다가 다시 읽은 것과 같은 자료형으로 변환 (캐시 내용이 파일을 다시 읽은 결과와 일치하도록)
+def _as_parsed(rows):
+    if rows.empty:
+        return rows
+    return pd.read_csv(io.StringIO(rows.to_csv(index=False)), dtype=CSV_DTYPES)
+
+
+class ParquetStorage:
+    """테이블마다 Parquet 파일 하나를 쓰는 열 지향 저장소 (pyarrow 필요)
+
+    키 컬럼은 사전 인코딩되어 메모리를 적게 쓰고, 조건 조회는 행 그룹 통계를 이용해 필요한 부분만 읽는다.
+    입력답은 정수로 저장하므로 숫자가 아닌 값은 결측값이 된다 (채점 시 오답 처리되는 것과 같음).
+    정답은 복수 정답("2/4")을 담을 수 있도록 문자열로 저장한다.
+    """
+
+    # 조건 조회 시 건너뛸 수 있도록 키 순서로 정렬해 저장하는 행 그룹 크기
+    ROW_GROUP_SIZE = 50_000
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, parquet_dir=None):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Parquet 저장소를 사용하려면 pyarrow 를 설치하세요: pip install pyarrow") from e
+        self.data_dir = data_dir
+        self.parquet_dir = parquet_dir or os.path.join(data_dir, DEFAULT_PARQUET_DIR)
+        self._locks = {table: threading.Lock() for table in TABLES}
+
+    def path(self, table):
+        return os.path.join(self.parquet_dir, f"{table}.parquet")
+
+    def initialize(self):
+        os.makedirs(self.parquet_dir, exist_ok=True)
+        for table, columns in TABLES.items():
+            if not os.path.exists(self.path(table)):
+                self._write(table, pd.DataFrame({column: [] for column in columns}))
+
+    def _write(self, table, df):
+        df = to_columnar(df, table).sort_values(PRIMARY_KEYS[table], ignore_index=True)
+        # 다른 세션이 읽는 도중에 파일이 바뀌지 않도록 임시 파일에 쓴 뒤 교체
+        temp_path = self.path(table) + '.tmp'
+        df.to_parquet(temp_path, index=False, row_group_size=self.ROW_GROUP_SIZE)
+        os.replace(temp_path, self.path(table))
+
+    # 조건 조회는 pyarrow 필터로 읽을 때 걸러내고(predicate pushdown), 결과는 공유 캐시에 보관
+    def read(self, table, where=None):
+        path = self.path(table)
+        key = ('parquet', path) + _where_key(where)
+        filters = [(column, 'in', list(value)) if isinstance(value, (list, tuple)) else (column, '==', value)
+                   for column, value in where.items()] if where else None
+        with instrumentation.stage('read', table) as s:
+            df = data_cache.cached(key, [path], lambda: _read_parquet(path, filters))
+            s.record(rows=len(df))
+        return df
+
+    def derived(self, table, name, build):
+        return _derived(('parquet', self.path(table)), name, build, self.read(table))
+
+    def replace(self, table, where, rows):
+        rows = to_columnar(pd.DataFrame(rows, columns=TABLES[table]), table)
+        with self._locks[table]:
+            df = data_cache.cached(('parquet', self.path(table)), [self.path(table)],
+                                   lambda: _read_parquet(self.path(table)))
+            df = df[~_match(df, where)] if where else df.iloc[0:0]
+            self._write(table, pd.concat([df, rows], ignore_index=True) if not df.empty else rows)
+            data_cache.invalidate('parquet', self.path(table))
+
+    # 같은 컬럼의 where 조건 여러 개에 대한 replace 를 파일 쓰기 한 번으로 처리
+    def replace_many(self, table, replacements):
+        if not replacements:
+            return
+        where_columns, latest = _latest_replacements(table, replacements)
+        rows = to_columnar(pd.concat(latest.values(), ignore_index=True), table)
+        with self._locks[table]:
+            df = data_cache.cached(('parquet', self.path(table)), [self.path(table)],
+                                   lambda: _read_parquet(self.path(table)))
+            df = df[~_match_any(df, where_columns, set(latest))]
+            self._write(table, pd.concat([df, rows], ignore_index=True) if not df.empty else rows)
+            data_cache.invalidate('parquet', self.path(table))
+
+    def sync(self, tables):
+        for table in tables:
+            _fsync(self.path(table))
+
+
+# DataFrame 을 Parquet 저장용 자료형으로 변환 (숫자가 아닌 입력답은 결측값)
+def to_columnar(df, table):
+    df = df[TABLES[table]].copy()
+    for column in df.columns:
+        dtype = COLUMNAR_TYPES[column]
+        if dtype == 'category':
+            # 빈 테이블도 문자열 사전으로 저장해야 조건 조회(문자열 비교)가 됨
+            df[column] = (df[column].astype(str) if len(df) else df[column].astype('string')).astype('category')
+        elif dtype == 'string':
+            df[column] = df[column].map(_as_text, na_action='ignore').astype('string')
+        else:
+            values = pd.to_numeric(df[column], errors='coerce')
+            if dtype.startswith('Int'):
+                values = values.round()
+            df[column] = values.astype(dtype)
+    return df
+
+
+# 문자열 컬럼 값: 정수로 읽힌 숫자는 "3.0" 이 아닌 "3" 으로
+def _as_text(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _read_parquet(path, filters=None):
+    instrumentation.record(nbytes=os.path.getsize(path))
+    return _remove_unused_categories(pd.read_parquet(path, filters=filters))
+
+
+# 필터로 일부만 읽어도 categorical 에는 전체 범주가 남으므로 정리 (groupby 결과에 빈 범주가 섞이지 않도록)
+def _remove_unused_categories(df):
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].cat.remove_unused_categories()
+    return df
+
+
+# 캐시 항목의 보조 구조로 보관. 읽은 직후 다른 세션이 써서 항목이 무효화되었으면 보관하지 않고 바로 계산
+def _derived(key, name, build, df):
+    try:
+        return data_cache.derived(key, name, build)
+    except KeyError:
+        return build(df)
+
+
+# 파일 전체를 다시 쓸 때는 같은 디렉토리의 임시 파일에 쓰고 fsync 한 뒤 교체. 도중에 종료되어도 기존 파일
+# (이미 저장 완료를 알린 제출)이 남고, 다른 세션이 반쯤 쓴 파일을 읽지 않음
+def _write_csv(df, path):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+        df.to_csv(f, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    _fsync_dir(os.path.dirname(path) or '.')
+
+
+# 교체(rename)한 디렉토리 항목을 디스크에 반영 (디렉토리를 열 수 없는 Windows 에서는 생략)
+def _fsync_dir(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _fsync(path):
+    if os.path.exists(path):
+        with open(path, 'rb+') as f:
+            os.fsync(f.fileno())
+
+
+# numpy 스칼라/결측값을 sqlite3 가 받는 파이썬 값으로 변환
+def _to_sql_value(value):
+    if pd.isna(value):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+# 프로세스 전체에서 공유하는 저장소 인스턴스 (세션 간 잠금 공유)
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+# 환경 변수(STORAGE_BACKEND, DATA_DIR, SQLITE_PATH, PARQUET_DIR)에 따라 저장소 반환. 기본값은 기존과 같은 CSV
+# partition 이 (학교, 반)이면 <DATA_DIR>/<학교>/<반>/ 아래의 그 반 저장소 (SQLITE_PATH, PARQUET_DIR 은 기본 분할에만 적용)
+def get_storage(partition=None):
+    backend = os.getenv('STORAGE_BACKEND', 'csv').lower()
+    data_dir = os.getenv('DATA_DIR', DEFAULT_DATA_DIR)
+    sqlite_path, parquet_dir = os.getenv('SQLITE_PATH'), os.getenv('PARQUET_DIR')
+    if partition:
+        data_dir = os.path.join(data_dir, *partition)
+        sqlite_path = parquet_dir = None
+    key = (backend, data_dir, sqlite_path, parquet_dir)
+    with _instances_lock:
+        if key not in _instances:
+            if backend == 'sqlite':
+                storage = SqliteStorage(sqlite_path, data_dir=data_dir)
+            elif backend == 'parquet':
+                storage = ParquetStorage(data_dir, parquet_dir)
+            elif backend == 'csv':
+                storage = CsvStorage(data_dir)
+            else:
+                raise ValueError(f"지원하지 않는 저장소 종류입니다: {backend}")
+            storage.initialize()
+            _instances[key] = storage
+        return _instances[key]
+
+
+# 기존 CSV 파일을 SQLite 로 한 번에 옮김 (키가 같은 행은 CSV 의 마지막 행을 사용)
+def migrate_csv_to_sqlite(data_dir=DEFAULT_DATA_DIR, db_path=None):
+    source = CsvStorage(data_dir)
+    target = SqliteStorage(db_path, data_dir=data_dir)
+    target.initialize()
+    counts = {}
+    connection = target._connect()
+    try:
+        with connection:
+            for table, columns in TABLES.items():
+                if not os.path.exists(source.path(table)):
+                    counts[table] = 0
+                    continue
+                df = source.read(table)
+                df = df.dropna(subset=PRIMARY_KEYS[table]).drop_duplicates(PRIMARY_KEYS[table], keep='last')
+                records = [tuple(_to_sql_value(v) for v in row) for row in df[columns].itertuples(index=False)]
+                connection.execute(f"DELETE FROM {table}")
+                connection.executemany(
+                    f"INSERT INTO {table} ({', '.join(_quote(c) for c in columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    records,
+                )
+                counts[table] = len(records)
+    finally:
+        connection.close()
+        data_cache.invalidate('sqlite', target.db_path)
+    return counts
+
+
+# 기존 CSV 파일을 Parquet 파일로 변환 (키가 같은 행은 CSV 의 마지막 행을 사용)
+def convert_csv_to_parquet(data_dir=DEFAULT_DATA_DIR, parquet_dir=None):
+    source = CsvStorage(data_dir)
+    target = ParquetStorage(data_dir, parquet_dir)
+    os.makedirs(target.parquet_dir, exist_ok=True)
+    counts = {}
+    for table, columns in TABLES.items():
+        if os.path.exists(source.path(table)):
+            df = source.read(table)
+            df = df.dropna(subset=PRIMARY_KEYS[table]).drop_duplicates(PRIMARY_KEYS[table], keep='last')
+        else:
+            df = pd.DataFrame({column: [] for column in columns})
+        target._write(table, df)
+        counts[table] = len(df)
+    data_cache.invalidate('parquet')
+    return counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='CSV 데이터를 SQLite 데이터베이스나 Parquet 파일로 옮깁니다.')
+    parser.add_argument('command', choices=['migrate', 'convert-parquet'])
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--db', default=None, help='migrate 대상, 기본값: <data-dir>/yeonhap.db')
+    parser.add_argument('--parquet-dir', default=None, help='convert-parquet 대상, 기본값: <data-dir>/parquet')
+    args = parser.parse_args()
+    if args.command == 'migrate':
+        counts = migrate_csv_to_sqlite(args.data_dir, args.db)
+    else:
+        counts = convert_csv_to_parquet(args.data_dir, args.parquet_dir)
+    for table, count in counts.items():
+        print(f"{table}: {count}행 이전")
@@ -0,0 +1,175 @@
+"""학생별 성적 이력 색인: 학생ID → (회차, 과목)별 점수, 맞은 개수, 응답 수, 틀린 문항
+
+"내 성적 추이" 화면은 이 색인만 읽으므로, 다른 학생이 몇 명이든 학생 한 명의 응시 기록 수만큼만 계산한다.
+학생의 이력은 처음 조회할 때 그 학생의 응답만 읽어 채점해 만들고, 이후에는 다음 두 곳에서 갱신한다.
+    답안 제출   summary.record_submissions() 가 이번 채점 결과로 그 (회차, 과목)을 교체
+    정답 변경   summary.record_answer_key() 가 바뀐 문항만 다시 채점한 결과로 색인에 있는 학생들의 기록을 고침
+    요약 복구   summary._rebuild_partition() 이 다시 만든 응답 행렬로 색인에 있는 학생들의 그 (회차, 과목)을 교체
+요약 재구성(summary.rebuild)은 invalidate_history() 로 전체를 버린다.
+"""
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from grading import NO_ANSWER, grade_responses
+from subjects import ROUNDS, SUBJECTS, max_score
+
+Attempt = namedtuple('Attempt', ['score', 'correct', 'answered', 'wrong'])
+
+# 반복 오답으로 볼 최소 회차 수
+REPEATED_WRONG_ROUNDS = 2
+
+# (저장소, 학생ID)별 {(회차, 과목): Attempt}
+_histories = {}
+_histories_lock = threading.Lock()
+# 만드는 도중에 그 학생의 제출이나 정답 변경이 있었으면 색인에 넣지 않기 위한 세대 번호
+_student_generations = {}
+_generation = 0
+
+
+# 한 (학생, 회차, 과목)의 채점 결과(grade_responses 형식)를 Attempt 로. 정답이 아직 없는 문항은 틀린 문항에서 제외
+def _attempt(graded):
+    question_numbers = pd.to_numeric(graded['문항번호'], errors='coerce')
+    wrong = question_numbers[~graded['정오'].to_numpy(dtype=bool) & graded['정답'].notna().to_numpy()]
+    wrong = wrong.dropna().astype(int)
+    return Attempt(
+        score=float(graded['득점'].sum()),
+        correct=int(graded['정오'].sum()),
+        answered=len(graded),
+        wrong=tuple(sorted(wrong.unique().tolist())),
+    )
+
+
+def _build(storage, student_id):
+    responses = storage.read('responses', where={'학생ID': student_id})
+    if responses.empty:
+        return {}
+    graded = grade_responses(responses, storage.read('answers'))
+    return {(str(exam_round), str(subject)): _attempt(rows)
+            for (exam_round, subject), rows in graded.groupby(['회차', '과목'], sort=False, observed=True)}
+
+
+def _history(storage, student_id):
+    key = (id(storage), student_id)
+    history = _histories.get(key)
+    if history is None:
+        generation = (_generation, _student_generations.get(key, 0))
+        history = _build(storage, student_id)
+        with _histories_lock:
+            if generation == (_generation, _student_generations.get(key, 0)):
+                _histories[key] = history
+    return history
+
+
+def _round_order(exam_round):
+    return ROUNDS.index(exam_round) if exam_round in ROUNDS else len(ROUNDS)
+
+
+def _subject_order(subject):
+    return SUBJECTS.index(subject) if subject in SUBJECTS else len(SUBJECTS)
+
+
+# 학생의 (회차, 과목)별 성적 표 (회차, 과목 순)
+def student_history(storage, student_id):
+    history = _history(storage, student_id)
+    keys = sorted(history, key=lambda key: (_round_order(key[0]), _subject_order(key[1]), key))
+    attempts = [history[key] for key in keys]
+    correct = np.array([a.correct for a in attempts], dtype=int)
+    answered = np.array([a.answered for a in attempts], dtype=int)
+    return pd.DataFrame({
+        '회차': [exam_round for exam_round, _ in keys],
+        '과목': [subject for _, subject in keys],
+        '점수': [a.score for a in attempts],
+        '만점': [max_score(exam_round, subject) for exam_round, subject in keys],
+        '맞은 개수': correct,
+        '틀린 개수': answered - correct,
+        '정답률': np.divide(correct * 100.0, answered, out=np.zeros(len(keys)), where=answered > 0),
+        '틀린 문항': [', '.join(map(str, a.wrong)) for a in attempts],
+    }, columns=['회차', '과목', '점수', '만점', '맞은 개수', '틀린 개수', '정답률', '틀린 문항'])
+
+
+# 같은 과목에서 min_rounds 개 이상의 회차에 틀린 문항번호 (틀린 회차가 많은 순)
+def repeated_wrong(storage, student_id, min_rounds=REPEATED_WRONG_ROUNDS):
+    rounds_by_question = {}
+    for (exam_round, subject), attempt in _history(storage, student_id).items():
+        for question in attempt.wrong:
+            rounds_by_question.setdefault((subject, question), []).append(exam_round)
+    rows = [(subject, question, len(rounds), ', '.join(sorted(rounds, key=_round_order)))
+            for (subject, question), rounds in rounds_by_question.items() if len(rounds) >= min_rounds]
+    rows.sort(key=lambda row: (-row[2], _subject_order(row[0]), row[1]))
+    return pd.DataFrame(rows, columns=['과목', '문항번호', '틀린 횟수', '틀린 회차'])
+
+
+# 학생 제출 반영 {(학생ID, 회차, 과목): 채점 결과}. 빈 채점 결과는 그 (회차, 과목) 기록 삭제
+def update_history(storage, graded_by_key):
+    with _histories_lock:
+        for (student_id, exam_round, subject), graded in graded_by_key.items():
+            key = (id(storage), student_id)
+            _student_generations[key] = _student_generations.get(key, 0) + 1
+            history = _histories.get(key)
+            if history is None:
+                continue
+            if graded.empty:
+                history.pop((exam_round, subject), None)
+            else:
+                history[(exam_round, subject)] = _attempt(graded)
+
+
+# 정답이 바뀐 (회차, 과목)을 다시 만든 응답 행렬로 색인에 있는 학생들만 다시 채점
+def refresh_history(storage, exam_round, subject, matrix):
+    global _generation
+    with _histories_lock:
+        _generation += 1
+        loaded = [key for key in _histories if key[0] == id(storage)]
+        if not loaded:
+            return
+        positions = {student_id: i for i, student_id in enumerate(matrix.student_ids)}
+        correct = matrix.correct()
+        answered = matrix.answered()
+        keyed = matrix.answers != NO_ANSWER
+        for key in loaded:
+            history = _histories[key]
+            row = positions.get(key[1])
+            if row is None:
+                history.pop((exam_round, subject), None)
+                continue
+            history[(exam_round, subject)] = Attempt(
+                score=float(correct[row] @ matrix.points),
+                correct=int(correct[row].sum()),
+                answered=int(answered[row].sum()),
+                wrong=tuple((np.flatnonzero(answered[row] & ~correct[row] & keyed) + 1).tolist()),
+            )
+
+
+# 바뀐 문항만 다시 채점한 결과 반영. regraded 는 그 문항 응답별 학생ID, 문항번호, 정오, 채점됨(정답 있음),
+# 득점 변화, 맞은 개수 변화. 색인에 있는 학생만 점수/맞은 개수를 더하고 틀린 문항 목록을 고침
+def regrade_history(storage, exam_round, subject, regraded):
+    global _generation
+    with _histories_lock:
+        _generation += 1
+        loaded = {key[1]: history for key, history in _histories.items()
+                  if key[0] == id(storage) and (exam_round, subject) in history}
+        if not loaded:
+            return
+        regraded = regraded[regraded['학생ID'].isin(list(loaded))]
+        for student_id, rows in regraded.groupby('학생ID', sort=False, observed=True):
+            history = loaded[student_id]
+            attempt = history[(exam_round, subject)]
+            questions = pd.to_numeric(rows['문항번호']).astype(int)
+            wrong = set(attempt.wrong) - set(questions)
+            wrong |= set(questions[~rows['정오'].to_numpy(dtype=bool) & rows['채점됨'].to_numpy(dtype=bool)])
+            history[(exam_round, subject)] = attempt._replace(
+                score=attempt.score + float(rows['득점 변화'].sum()),
+                correct=attempt.correct + int(rows['맞은 개수 변화'].sum()),
+                wrong=tuple(sorted(wrong)),
+            )
+
+
+# 색인을 모두 버리고 다음 조회 때 다시 만듦
+def invalidate_history():
+    global _generation
+    with _histories_lock:
+        _generation += 1
+        _histories.clear()
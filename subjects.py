@@ -0,0 +1,133 @@
+"""모의고사 시험 구성 레지스트리: 회차, 과목, 과목별 문항 수/만점/단답형 문항, 탐구 과목 목록, 등급 방식
+
+앱 화면, 채점, 통계, 일괄 채점이 모두 이 모듈을 읽는다. 기본 구성(DEFAULT_SCHEMA)에 EXAM_SCHEMA 환경 변수
+(기본값 schema.yaml)가 가리키는 YAML 파일이 있으면 덮어써서, 프로세스마다 import 할 때 한 번만 만든다.
+
+    rounds: [1차, 2차, 3차, 4차, 5차]           # 회차 목록 (바꾸면 전체 교체)
+    subjects:                                   # 과목별 기본값 (적은 항목만 덮어씀)
+      수학: {questions: 30, max_score: 100, short_answer: [16, 17, 18, 19, 20, 21, 22, 29, 30]}
+    electives: {과학탐구: [...], 사회탐구: [...]}  # 탐구 과목 목록 (바꾸면 전체 교체)
+    overrides:                                  # 회차별 덮어쓰기
+      5차:
+        수학: {short_answer: [22, 29, 30]}
+
+회차별 값은 subject_spec()/question_count()/max_score()/short_answer_questions() 로 읽고, 모듈 상수(SUBJECT_QUESTIONS 등)는
+덮어쓰기 전의 과목별 기본값이다. SCHEMA_VERSION 은 적용된 구성의 해시로, 구성에 따라 달라지는 캐시의 키에 넣는다.
+"""
+import copy
+import hashlib
+import json
+import os
+
+import yaml
+
+SCHEMA_PATH = os.getenv('EXAM_SCHEMA', 'schema.yaml')
+
+DEFAULT_SCHEMA = {
+    'rounds': ["1차", "2차", "3차", "4차"],
+    'core': ["국어", "수학", "영어", "한국사"],
+    # 탐구 선택 과목 (분류별)
+    'electives': {
+        "과학탐구": ["물리학", "화학", "생명과학", "지구과학"],
+        "사회탐구": ["생활과 윤리", "윤리와 사상", "한국지리", "세계지리",
+                 "동아시아사", "세계사", "경제", "정치와 법", "사회문화"],
+    },
+    # 과목별 문항 수, 만점, 단답형 문항번호 (탐구 과목은 'elective' 값을 사용)
+    'subjects': {
+        "국어": {'questions': 45, 'max_score': 100},
+        "수학": {'questions': 30, 'max_score': 100, 'short_answer': [16, 17, 18, 19, 20, 21, 22, 29, 30]},
+        "영어": {'questions': 45, 'max_score': 100},
+        "한국사": {'questions': 20, 'max_score': 50},
+    },
+    'elective': {'questions': 20, 'max_score': 50},
+    'overrides': {},
+}
+
+# 절대평가 과목의 1~8등급 하한 점수 (그 아래는 9등급). 표준점수 없이 원점수로 등급을 매김
+ABSOLUTE_GRADE_CUTS = {
+    "영어": [90, 80, 70, 60, 50, 40, 30, 20],
+    "한국사": [40, 35, 30, 25, 20, 15, 10, 5],
+}
+
+
+# 기본 구성에 파일 내용을 덮어씀 (subjects 는 과목별 항목 단위, 나머지는 통째로)
+def _merge(schema, override):
+    schema = copy.deepcopy(schema)
+    for key, value in (override or {}).items():
+        if key == 'subjects':
+            for subject, spec in value.items():
+                schema['subjects'][subject] = {**schema['subjects'].get(subject, {}), **spec}
+        elif key == 'elective':
+            schema['elective'] = {**schema['elective'], **value}
+        else:
+            schema[key] = value
+    return schema
+
+
+def load_schema(path=SCHEMA_PATH):
+    override = None
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            override = yaml.safe_load(f)
+    return _merge(DEFAULT_SCHEMA, override)
+
+
+def schema_version(schema):
+    text = json.dumps(schema, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+SCHEMA = load_schema()
+SCHEMA_VERSION = schema_version(SCHEMA)
+
+# 덮어쓰기에만 있는 회차도 회차 목록 뒤에 붙임
+ROUNDS = list(SCHEMA['rounds']) + [r for r in SCHEMA['overrides'] if r not in SCHEMA['rounds']]
+CORE_SUBJECTS = list(SCHEMA['core'])
+ELECTIVE_GROUPS = {group: list(subjects) for group, subjects in SCHEMA['electives'].items()}
+ELECTIVE_SUBJECTS = [subject for subjects in ELECTIVE_GROUPS.values() for subject in subjects]
+SUBJECTS = CORE_SUBJECTS + ELECTIVE_SUBJECTS
+
+
+def _base_spec(subject):
+    spec = SCHEMA['subjects'].get(subject)
+    if spec is None and subject in ELECTIVE_SUBJECTS:
+        spec = SCHEMA['elective']
+    return spec
+
+
+# (회차, 과목)의 문항 수, 만점, 단답형 문항번호. 모르는 과목이면 None
+def subject_spec(exam_round, subject):
+    spec = _base_spec(subject)
+    override = SCHEMA['overrides'].get(exam_round, {}).get(subject)
+    if spec is None and override is None:
+        return None
+    spec = {'short_answer': [], **(spec or {}), **(override or {})}
+    spec['short_answer'] = sorted(int(q) for q in spec['short_answer'])
+    return spec
+
+
+def question_count(exam_round, subject):
+    spec = subject_spec(exam_round, subject)
+    return spec['questions'] if spec else None
+
+
+def max_score(exam_round, subject):
+    spec = subject_spec(exam_round, subject)
+    return spec['max_score'] if spec else None
+
+
+def short_answer_questions(exam_round, subject):
+    spec = subject_spec(exam_round, subject)
+    return spec['short_answer'] if spec else []
+
+
+# 과목별 기본값 (회차별 덮어쓰기 전)
+SUBJECT_QUESTIONS = {subject: _base_spec(subject)['questions'] for subject in SUBJECTS}
+SUBJECT_MAX_SCORES = {subject: _base_spec(subject)['max_score'] for subject in SUBJECTS}
+
+# 상대평가 과목의 표준점수 척도 (평균, 표준편차)
+STANDARD_SCORE_SCALES = {
+    "국어": (100, 20),
+    "수학": (100, 20),
+    **{subject: (50, 10) for subject in ELECTIVE_SUBJECTS},
+}
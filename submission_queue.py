@@ -0,0 +1,251 @@
+"""학생 답안 제출 대기열과 전용 쓰기 스레드
+
+모든 세션의 제출을 프로세스 하나의 대기열에 넣고, 쓰기 스레드 하나가 그동안 쌓인 제출을 묶어
+summary.record_submissions() 로 한 번에 저장한다 (테이블마다 파일 쓰기/트랜잭션 한 번).
+submit() 은 바로 Future 를 돌려주므로, 제출한 세션은 즉시 채점 결과를 먼저 보여 주고 저장 완료는 그 뒤에 기다린다.
+
+    pending = get_submission_queue(storage).submit(student_id, exam_round, subject, rows)
+    ...  # 즉시 채점 결과 표시
+    pending.result(timeout=30)  # 저장 완료(또는 저장 중 발생한 예외)
+
+내구성: 제출은 대기열에 넣기 전에 저널 파일(<DATA_DIR>/submissions.journal)에 JSON 한 줄로 추가한다.
+SUBMISSION_FSYNC=always(기본값)이면 쓰기 스레드가 묶음마다 저널을 한 번 fsync 한 뒤 저장하고, 저장한 데이터 파일도
+fsync 한 다음에 Future 를 완료한다. 즉 저장 완료를 알린 제출은 전원이 꺼져도 남는다. off 이면 fsync 하지 않는다.
+저장을 마친 묶음은 저널에 커밋 표시를 남기고, 대기열이 비면 저널을 비운다. 프로세스가 도중에 종료되면 다음 시작 시
+커밋 표시가 없는 제출을 다시 저장하고 해당 (회차, 과목)의 요약을 다시 계산한다.
+
+실패 처리: 묶음 저장이 실패하면 응답만 저장되고 요약은 갱신되지 않았을 수 있으므로 묶음의 (회차, 과목) 요약을
+저장된 응답으로 다시 계산한 뒤, 묶음의 제출을 하나씩 다시 저장한다. 그래도 실패한 제출만 해당 세션에 예외로 알린다.
+요약 재계산마저 실패한 (회차, 과목)은 저널에 복구 표시를 남겨 다음 묶음 저장 때나 다음 시작 시 다시 계산한다.
+"""
+import json
+import os
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from storage import TABLES
+from summary import record_submissions, refresh_partition
+
+JOURNAL_NAME = 'submissions.journal'
+# 저널/데이터 파일 fsync 정책: always 또는 off
+FSYNC_POLICY = os.getenv('SUBMISSION_FSYNC', 'always').lower()
+# 한 번에 묶어 저장하는 최대 제출 수
+MAX_BATCH = 500
+# 제출이 기록되는 테이블 (fsync 대상)
+SUBMISSION_TABLES = ['responses', 'score_summary', 'question_summary']
+
+_Submission = namedtuple('_Submission', ['seq', 'student_id', 'exam_round', 'subject', 'rows', 'future'])
+_STOP = object()
+
+
+# numpy 스칼라를 JSON 으로 쓸 수 있는 파이썬 값으로 변환
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"JSON 으로 저장할 수 없는 값입니다: {value!r}")
+
+
+def _rows_from_json(rows):
+    return pd.DataFrame(rows, columns=TABLES['responses'])
+
+
+class SubmissionQueue:
+    def __init__(self, storage, journal_path=None, fsync=None, max_batch=MAX_BATCH):
+        if (fsync or FSYNC_POLICY) not in ('always', 'off'):
+            raise ValueError(f"SUBMISSION_FSYNC 는 always 또는 off 여야 합니다: {fsync or FSYNC_POLICY}")
+        self.storage = storage
+        self.journal_path = journal_path or os.path.join(storage.data_dir, JOURNAL_NAME)
+        self.fsync = (fsync or FSYNC_POLICY) == 'always'
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        # 저널 추가와 대기열 넣기를 같은 순서로 하기 위한 잠금
+        self._journal_lock = threading.Lock()
+        self._last_seq = 0
+        self._committed_seq = 0
+        # 요약 재계산이 실패해 아직 저장된 응답과 맞지 않을 수 있는 (회차, 과목) (쓰기 스레드에서만 변경)
+        self._unrepaired = set()
+        # 시작 시 복구하지 못한 제출: (학생ID, 회차, 과목, 예외) 목록
+        self.recovery_failures = []
+        self._journal = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.journal_path)), exist_ok=True)
+        self._recover()
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._append_repairs()
+        self._thread = threading.Thread(target=self._run, name='submission-writer', daemon=True)
+        self._thread.start()
+
+    # 제출을 저널에 기록하고 대기열에 넣음. 저장이 끝나면 채점 결과(DataFrame)로 완료되는 Future 반환
+    def submit(self, student_id, exam_round, subject, rows):
+        rows = pd.DataFrame(rows, columns=TABLES['responses'])
+        future = Future()
+        with self._journal_lock:
+            self._last_seq += 1
+            seq = self._last_seq
+            self._append({
+                'seq': seq,
+                '학생ID': student_id,
+                '회차': exam_round,
+                '과목': subject,
+                'rows': rows.to_numpy().tolist(),
+            })
+            self._queue.put(_Submission(seq, student_id, exam_round, subject, rows, future))
+        return future
+
+    # 대기 중인 제출을 모두 저장한 뒤 쓰기 스레드를 멈춤
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._journal.close()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _append(self, entry):
+        self._journal.write(json.dumps(entry, ensure_ascii=False, default=_json_value) + '\n')
+        self._journal.flush()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            # 쓰는 동안 쌓인 제출을 한 묶음으로 (기다리지 않고 이미 들어온 것만)
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        if self._unrepaired:
+            self._repair(set(self._unrepaired))
+        with instrumentation.stage('grading', 'submission batch') as s:
+            try:
+                if self.fsync:
+                    os.fsync(self._journal.fileno())
+                results = self._save(batch)
+                s.record(rows=sum(len(b.rows) for b in batch))
+            except Exception as e:
+                # 응답만 저장되었을 수 있으므로 요약을 먼저 맞춘 뒤, 한 제출의 실패가 묶음 전체를 실패시키지 않도록 하나씩 다시 저장
+                self._repair({(b.exam_round, b.subject) for b in batch})
+                results = [e] if len(batch) == 1 else [self._save_one(b) for b in batch]
+        self._commit(batch[-1].seq)
+        for b, result in zip(batch, results):
+            if isinstance(result, Exception):
+                b.future.set_exception(result)
+            else:
+                b.future.set_result(result)
+
+    def _save(self, batch):
+        graded = record_submissions(self.storage, [(b.student_id, b.exam_round, b.subject, b.rows) for b in batch])
+        if self.fsync:
+            self.storage.sync(SUBMISSION_TABLES)
+        return graded
+
+    # 제출 하나를 저장. 실패하면 해당 (회차, 과목) 요약을 다시 계산하고 예외를 반환
+    def _save_one(self, submission):
+        try:
+            return self._save([submission])[0]
+        except Exception as e:
+            self._repair({(submission.exam_round, submission.subject)})
+            return e
+
+    # (회차, 과목) 요약을 저장된 응답으로 다시 계산. 실패한 부분은 저널에 복구 표시를 남기고 나중에 다시 시도
+    def _repair(self, partitions):
+        for exam_round, subject in partitions:
+            try:
+                refresh_partition(self.storage, exam_round, subject)
+            except Exception:
+                if (exam_round, subject) not in self._unrepaired:
+                    self._unrepaired.add((exam_round, subject))
+                    if self._journal is not None:
+                        with self._journal_lock:
+                            self._append({'repair': [exam_round, subject]})
+            else:
+                self._unrepaired.discard((exam_round, subject))
+
+    # 아직 복구하지 못한 (회차, 과목)을 저널에 기록 (저널을 비운 뒤에도 남도록)
+    def _append_repairs(self):
+        for exam_round, subject in sorted(self._unrepaired):
+            self._append({'repair': [exam_round, subject]})
+
+    # 커밋 표시를 남기고, 모든 제출이 저장되었으면 저널을 비움
+    def _commit(self, seq):
+        with self._journal_lock:
+            self._committed_seq = seq
+            if self._committed_seq == self._last_seq:
+                self._journal.seek(0)
+                self._journal.truncate()
+                self._append_repairs()
+                if self.fsync:
+                    os.fsync(self._journal.fileno())
+            else:
+                self._append({'committed': seq})
+
+    # 이전 프로세스가 저장하지 못한 제출을 다시 저장
+    def _recover(self):
+        if not os.path.exists(self.journal_path):
+            return
+        entries = []
+        committed = 0
+        repairs = set()
+        with open(self.journal_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 기록 도중 끊긴 마지막 줄
+                if 'committed' in entry:
+                    committed = max(committed, entry['committed'])
+                elif 'repair' in entry:
+                    repairs.add(tuple(entry['repair']))
+                else:
+                    entries.append(entry)
+        entries = [e for e in entries if e['seq'] > committed]
+        submissions = [(e['학생ID'], e['회차'], e['과목'], _rows_from_json(e['rows'])) for e in entries]
+        if submissions:
+            # 저장할 수 없는 제출이 있어도 시작은 실패하지 않도록, 묶음이 실패하면 하나씩 저장하고 실패한 제출은 기록만 남김
+            try:
+                record_submissions(self.storage, submissions)
+            except Exception:
+                for submission in submissions:
+                    try:
+                        record_submissions(self.storage, [submission])
+                    except Exception as e:
+                        self.recovery_failures.append((*submission[:3], e))
+        # 응답만 저장되고 요약 갱신 전에 끊겼을 수 있으므로 해당 부분의 요약을 다시 계산
+        self._repair(repairs | {(e['회차'], e['과목']) for e in entries})
+        if entries:
+            try:
+                self.storage.sync(SUBMISSION_TABLES)
+            except OSError:
+                pass  # 저장은 끝났고 디스크 반영만 실패. 다음 묶음 저장의 sync 에서 다시 반영
+        open(self.journal_path, 'w').close()
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+# 저장소별로 프로세스 전체에서 하나인 제출 대기열
+def get_submission_queue(storage):
+    with _queues_lock:
+        if id(storage) not in _queues:
+            _queues[id(storage)] = SubmissionQueue(storage)
+        return _queues[id(storage)]
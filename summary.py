@@ -0,0 +1,376 @@
+"""채점 결과 요약 테이블 관리
+
+score_summary    : (학생ID, 회차, 과목)별 맞은 개수, 응답 수, 점수
+question_summary : (회차, 과목, 문항번호)별 맞은 개수, 응답 수
+
+학생 제출과 정답 저장 때마다 해당 부분만 증분 갱신하므로, 교사 화면은 전체 응답을 다시 채점하지 않고
+요약 테이블만 읽는다. 정답을 고치면 바뀐 문항의 응답만 다시 채점하여 학생 점수에 차이만큼 더한다.
+rebuild()/check_consistency()로 처음부터 다시 계산해 비교/복구할 수 있다.
+"""
+import argparse
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from answer_versions import answer_key_changes, point_value, record_version
+from grading import accepted_answers, grade_responses, invalidate_compiled_key, normalize_choice
+from partitions import parse_partition
+from response_matrix import UNANSWERED, cached_matrix, invalidate_matrix, load_matrix, replace_matrix_key
+from score_index import invalidate_index, update_scores
+from storage import TABLES, get_storage
+from student_history import invalidate_history, refresh_history, regrade_history, update_history
+
+STUDENT_KEY = ['학생ID', '회차', '과목']
+QUESTION_KEY = ['회차', '과목', '문항번호']
+
+# 응답/요약을 함께 갱신하는 구간을 직렬화 (같은 문항 카운터를 동시에 고쳐 쓰지 않도록)
+_lock = threading.Lock()
+# 프로세스당 한 번만 요약 테이블 존재 여부를 확인
+_ensured = set()
+
+# 정답 저장 결과: 새 버전(바뀐 문항이 없으면 None), 바뀐 문항번호, 다시 채점한 응답 수, 점수가 바뀐 학생 수
+RegradeResult = namedtuple('RegradeResult', ['version', 'questions', 'responses', 'students'])
+
+
+def _student_rows(graded):
+    if graded.empty:
+        return pd.DataFrame(columns=TABLES['score_summary'])
+    grouped = graded.groupby(STUDENT_KEY, sort=False, observed=True)
+    rows = pd.DataFrame({
+        '맞은 개수': grouped['정오'].sum(),
+        '응답 수': grouped['정오'].size(),
+        '점수': grouped['득점'].sum(),
+    }).reset_index()
+    return rows[TABLES['score_summary']]
+
+
+def _question_rows(graded):
+    if graded.empty:
+        return pd.DataFrame(columns=TABLES['question_summary'])
+    grouped = graded.groupby(QUESTION_KEY, sort=True, observed=True)
+    rows = pd.DataFrame({
+        '맞은 개수': grouped['정오'].sum(),
+        '응답 수': grouped['정오'].size(),
+    }).reset_index()
+    return rows[TABLES['question_summary']]
+
+
+# 문항별 카운터를 문항번호 기준 Series 두 개(맞은 개수, 응답 수)로 변환
+def _question_counts(rows):
+    rows = rows.assign(문항번호=pd.to_numeric(rows['문항번호']).astype(int)).set_index('문항번호')
+    return rows[['맞은 개수', '응답 수']].astype(int)
+
+
+# 학생 한 명의 (회차, 과목) 답안 제출: 응답 저장 + 학생 요약 교체 + 문항 카운터에 (새 채점 - 이전 채점) 반영
+def record_submission(storage, student_id, exam_round, subject, rows):
+    return record_submissions(storage, [(student_id, exam_round, subject, rows)])[0]
+
+
+# 여러 답안 제출을 한 번에 저장: 테이블마다 쓰기 한 번, (회차, 과목)마다 채점/카운터 갱신 한 번
+# submissions 는 (학생ID, 회차, 과목, rows) 목록. 같은 학생/회차/과목이 여러 번 있으면 마지막 제출이 저장된다.
+# 제출 순서대로 각 제출의 채점 결과 목록을 반환
+def record_submissions(storage, submissions):
+    latest = {}
+    for student_id, exam_round, subject, rows in submissions:
+        latest[(student_id, exam_round, subject)] = pd.DataFrame(rows, columns=TABLES['responses'])
+    partitions = {}
+    for student_id, exam_round, subject in latest:
+        partitions.setdefault((exam_round, subject), []).append(student_id)
+
+    graded_by_key = {}
+    with _lock:
+        # 이전 채점은 이번에 제출한 학생의 응답만 읽음 (같은 (회차, 과목)의 다른 학생 응답은 읽지 않음)
+        previous = {
+            (exam_round, subject): storage.read('responses', where={'회차': exam_round, '과목': subject,
+                                                                    '학생ID': student_ids})
+            for (exam_round, subject), student_ids in partitions.items()
+        }
+        storage.replace_many('responses', [(dict(zip(STUDENT_KEY, key)), rows) for key, rows in latest.items()])
+
+        score_replacements = []
+        question_replacements = []
+        for (exam_round, subject), student_ids in partitions.items():
+            partition = {'회차': exam_round, '과목': subject}
+            invalidate_matrix(exam_round, subject)
+            answers = storage.read('answers', where=partition)
+            previous_graded = grade_responses(previous[(exam_round, subject)], answers)
+            # 이번 제출들을 한 번에 채점한 뒤 학생별로 나눔
+            graded = grade_responses(
+                pd.concat([latest[(student_id, exam_round, subject)] for student_id in student_ids], ignore_index=True),
+                answers,
+            )
+            by_student = dict(tuple(graded.groupby('학생ID', sort=False, observed=True)))
+            student_rows = dict(tuple(_student_rows(graded).groupby('학생ID', sort=False, observed=True)))
+            for student_id in student_ids:
+                key = (student_id, exam_round, subject)
+                graded_by_key[key] = by_student.get(student_id, graded.iloc[0:0]).reset_index(drop=True)
+                score_replacements.append((
+                    dict(zip(STUDENT_KEY, key)),
+                    student_rows.get(student_id, pd.DataFrame(columns=TABLES['score_summary'])),
+                ))
+
+            counts = _question_counts(storage.read('question_summary', where=partition))
+            delta = _question_counts(_question_rows(graded)).sub(
+                _question_counts(_question_rows(previous_graded)), fill_value=0
+            )
+            counts = counts.add(delta, fill_value=0).astype(int)
+            counts = counts[counts['응답 수'] > 0].sort_index()
+            question_replacements.append((partition, pd.DataFrame({
+                '회차': exam_round,
+                '과목': subject,
+                '문항번호': counts.index,
+                '맞은 개수': counts['맞은 개수'].to_numpy(),
+                '응답 수': counts['응답 수'].to_numpy(),
+            })))
+        storage.replace_many('score_summary', score_replacements)
+        for (exam_round, subject), student_ids in partitions.items():
+            update_scores(storage, exam_round, subject, {
+                student_id: _total_score(graded_by_key[(student_id, exam_round, subject)]) for student_id in student_ids
+            })
+        storage.replace_many('question_summary', question_replacements)
+        update_history(storage, graded_by_key)
+    return [graded_by_key[(student_id, exam_round, subject)] for student_id, exam_round, subject, _ in submissions]
+
+
+# 채점 결과의 총점 (응답이 없으면 None)
+def _total_score(graded):
+    return float(graded['득점'].sum()) if not graded.empty else None
+
+
+# (회차, 과목) 정답 저장: 바뀐 문항만 새 버전으로 기록하고 그 문항의 응답만 다시 채점하여 요약에 반영
+def record_answer_key(storage, exam_round, subject, rows):
+    partition = {'회차': exam_round, '과목': subject}
+    rows = pd.DataFrame(rows, columns=TABLES['answers'])
+    with _lock:
+        previous = storage.read('answers', where=partition)
+        changes = answer_key_changes(previous, rows)
+        if changes.empty:
+            return RegradeResult(None, [], 0, 0)
+        storage.replace('answers', partition, rows)
+        version = record_version(storage, exam_round, subject, previous, changes)
+        invalidate_compiled_key(exam_round, subject)
+        # 응답은 그대로이므로 캐시된 행렬은 정답 벡터만 교체
+        replace_matrix_key(storage, exam_round, subject, rows)
+        responses, students = _regrade_questions(storage, exam_round, subject, changes)
+        return RegradeResult(version, changes['문항번호'].tolist(), responses, students)
+
+
+# 바뀐 문항의 응답 (문항번호, 학생ID, 정규화한 입력답 배열). 행렬이 캐시되어 있으면 그 열을 쓰고,
+# 없으면 한 번의 조회로 읽음 (SQLite 는 (회차, 과목, 문항번호) 인덱스 사용)
+def _changed_responses(storage, exam_round, subject, questions):
+    matrix = cached_matrix(storage, exam_round, subject)
+    if matrix is not None and max(questions) <= matrix.num_questions:
+        columns = matrix.choices[:, np.array(questions) - 1]
+        rows, cols = np.nonzero(columns != UNANSWERED)
+        return np.array(questions)[cols], matrix.student_ids[rows], columns[rows, cols]
+    responses = storage.read('responses', where={'회차': exam_round, '과목': subject, '문항번호': questions})
+    return (pd.to_numeric(responses['문항번호']).to_numpy(), responses['학생ID'].to_numpy(),
+            normalize_choice(responses['입력답']).to_numpy())
+
+
+# 바뀐 문항의 응답을 이전 정답과 새 정답으로 채점하여 응답별 (정오, 득점 변화, 맞은 개수 변화) 계산
+def _regraded_responses(storage, exam_round, subject, changes):
+    questions = [int(q_num) for q_num in changes['문항번호']]
+    q_nums, student_ids, given = _changed_responses(storage, exam_round, subject, questions)
+    parts = []
+    for change in changes.to_dict('records'):
+        q_num = int(change['문항번호'])
+        rows = q_nums == q_num
+        if not rows.any():
+            continue
+        accepted = list(accepted_answers(change['정답']))
+        was_correct = np.isin(given[rows], list(accepted_answers(change['이전 정답'])))
+        is_correct = np.isin(given[rows], accepted)
+        parts.append(pd.DataFrame({
+            '학생ID': student_ids[rows],
+            '문항번호': q_num,
+            '정오': is_correct,
+            '채점됨': bool(accepted),
+            '득점 변화': np.where(is_correct, point_value(change['배점']), 0.0)
+                        - np.where(was_correct, point_value(change['이전 배점']), 0.0),
+            '맞은 개수 변화': is_correct.astype(int) - was_correct.astype(int),
+        }))
+    if not parts:
+        return pd.DataFrame(columns=['학생ID', '문항번호', '정오', '채점됨', '득점 변화', '맞은 개수 변화'])
+    return pd.concat(parts, ignore_index=True)
+
+
+# 바뀐 문항만 다시 채점: 그 문항의 응답만 읽어 학생 점수/맞은 개수에 차이를 더하고, 그 문항의 카운터만 교체
+# (다시 채점한 응답 수, 점수가 바뀐 학생 수) 반환. 비용이 바뀐 문항의 응답 수에 비례하는 것은 SQLite 뿐이고,
+# CSV/Parquet 는 score_summary 파일 전체를 다시 쓰므로 저장 비용은 부분 전체 재구성과 비슷함
+def _regrade_questions(storage, exam_round, subject, changes):
+    partition = {'회차': exam_round, '과목': subject}
+    regraded = _regraded_responses(storage, exam_round, subject, changes)
+    if regraded.empty:
+        return 0, 0
+    deltas = regraded.groupby('학생ID', sort=False, observed=True)[['득점 변화', '맞은 개수 변화']].sum()
+    deltas = deltas[(deltas['득점 변화'] != 0) | (deltas['맞은 개수 변화'] != 0)]
+    if not deltas.empty:
+        summary_rows = storage.read('score_summary', where=partition)
+        summary_rows = summary_rows.drop_duplicates('학생ID', keep='last').set_index('학생ID', drop=False)
+        if not deltas.index.isin(summary_rows.index).all():
+            # 요약에 없는 학생이 있으면(중단된 제출 저장 등) 차이를 더할 수 없으므로 부분 전체를 다시 계산
+            invalidate_matrix(exam_round, subject)
+            _rebuild_partition(storage, exam_round, subject)
+            return len(regraded), int((deltas['득점 변화'] != 0).sum())
+        changed = deltas.index
+        summary_rows = summary_rows.astype({'맞은 개수': int}).assign(점수=pd.to_numeric(summary_rows['점수']))
+        summary_rows.loc[changed, '맞은 개수'] += deltas['맞은 개수 변화'].astype(int)
+        summary_rows.loc[changed, '점수'] += deltas['득점 변화']
+        storage.replace('score_summary', partition, summary_rows.reset_index(drop=True)[TABLES['score_summary']])
+        update_scores(storage, exam_round, subject, dict(zip(changed, summary_rows.loc[changed, '점수'])))
+
+    counts = regraded.groupby('문항번호', sort=True)['정오'].agg(['sum', 'size'])
+    storage.replace_many('question_summary', [
+        ({**partition, '문항번호': int(q_num)}, pd.DataFrame({
+            '회차': [exam_round], '과목': [subject], '문항번호': [int(q_num)],
+            '맞은 개수': [int(row['sum'])], '응답 수': [int(row['size'])],
+        }))
+        for q_num, row in counts.iterrows()
+    ])
+    regrade_history(storage, exam_round, subject, regraded)
+    return len(regraded), int((deltas['득점 변화'] != 0).sum())
+
+
+# (회차, 과목)의 요약을 저장된 응답으로 다시 계산 (중단된 제출 저장 복구용)
+def refresh_partition(storage, exam_round, subject):
+    with _lock:
+        invalidate_matrix(exam_round, subject)
+        _rebuild_partition(storage, exam_round, subject)
+
+
+# (회차, 과목) 응답 행렬로 해당 부분의 학생 요약과 문항 카운터를 다시 계산
+def _rebuild_partition(storage, exam_round, subject):
+    partition = {'회차': exam_round, '과목': subject}
+    matrix = load_matrix(storage, exam_round, subject)
+    storage.replace('score_summary', partition, pd.DataFrame({
+        '학생ID': matrix.student_ids,
+        '회차': exam_round,
+        '과목': subject,
+        '맞은 개수': matrix.correct_counts(),
+        '응답 수': matrix.answered_counts(),
+        '점수': matrix.total_scores(),
+    }, columns=TABLES['score_summary']))
+    # 점수가 바뀐 뒤에 버려야 다음 조회에서 새 점수로 다시 만듦
+    invalidate_index(exam_round, subject)
+    refresh_history(storage, exam_round, subject, matrix)
+    correct, attempts = matrix.question_counts()
+    asked = np.flatnonzero(attempts > 0)
+    storage.replace('question_summary', partition, pd.DataFrame({
+        '회차': exam_round,
+        '과목': subject,
+        '문항번호': asked + 1,
+        '맞은 개수': correct[asked],
+        '응답 수': attempts[asked],
+    }, columns=TABLES['question_summary']))
+
+
+# 전체 응답을 처음부터 채점하여 만든 요약 테이블 (저장하지 않음)
+def compute_summaries(storage):
+    graded = grade_responses(storage.read('responses'), storage.read('answers'))
+    return {'score_summary': _student_rows(graded), 'question_summary': _question_rows(graded)}
+
+
+# 요약 테이블을 처음부터 다시 계산하여 저장
+def rebuild(storage):
+    with _lock:
+        expected = compute_summaries(storage)
+        for table, rows in expected.items():
+            storage.replace(table, {}, rows)
+        invalidate_compiled_key()
+        invalidate_matrix()
+        invalidate_index()
+        invalidate_history()
+    return {table: len(rows) for table, rows in expected.items()}
+
+
+def _normalized(df, key):
+    df = df.copy()
+    for column in key:
+        df[column] = df[column].astype(str)
+    value_columns = [c for c in df.columns if c not in key]
+    df[value_columns] = df[value_columns].apply(pd.to_numeric, errors='coerce').astype(float)
+    return df.set_index(key).sort_index()
+
+
+# 저장된 요약과 처음부터 다시 계산한 요약을 비교하여 테이블별로 어긋난 행 수를 반환
+def check_consistency(storage):
+    expected = compute_summaries(storage)
+    keys = {'score_summary': STUDENT_KEY, 'question_summary': QUESTION_KEY}
+    mismatches = {}
+    for table, key in keys.items():
+        stored = _normalized(storage.read(table), key)
+        fresh = _normalized(expected[table], key)
+        joined = stored.join(fresh, how='outer', lsuffix='_stored', rsuffix='_fresh')
+        value_columns = [c for c in TABLES[table] if c not in key]
+        differs = np.zeros(len(joined), dtype=bool)
+        for column in value_columns:
+            left = joined[f"{column}_stored"].to_numpy()
+            right = joined[f"{column}_fresh"].to_numpy()
+            differs |= ~np.isclose(left, right, equal_nan=False)
+        mismatches[table] = int(differs.sum())
+    return mismatches
+
+
+# 기존 데이터에 요약 테이블이 아직 없으면(업그레이드 직후) 한 번 만들어 둠
+def ensure_built(storage):
+    if id(storage) in _ensured:
+        return
+    if storage.read('score_summary').empty and not storage.read('responses').empty:
+        rebuild(storage)
+    _ensured.add(id(storage))
+
+
+# 학생 요약 행을 채점 결과 표 형태로 변환
+def student_results(summary_rows):
+    correct = summary_rows['맞은 개수'].astype(int).to_numpy()
+    answered = summary_rows['응답 수'].astype(int).to_numpy()
+    return pd.DataFrame({
+        '학생ID': summary_rows['학생ID'].to_numpy(),
+        '맞은 개수': correct,
+        '틀린 개수': answered - correct,
+        '정답률': correct / np.maximum(answered, 1) * 100,
+        '점수': pd.to_numeric(summary_rows['점수']).to_numpy(),
+    })
+
+
+# 문항 카운터로부터 문항별 정답률 계산 (응답이 없는 문항은 0%)
+def question_accuracy(question_rows, answers_df):
+    question_numbers = np.sort(pd.to_numeric(answers_df['문항번호'], errors='coerce').dropna().astype(int).unique())
+    counts = _question_counts(question_rows)
+    accuracy = (counts['맞은 개수'] / counts['응답 수'] * 100).reindex(question_numbers, fill_value=0)
+    return pd.DataFrame({'문항번호': question_numbers, '정답률': accuracy.to_numpy()})
+
+
+def _accuracy_by(summary_df, columns):
+    grouped = summary_df.groupby(columns, sort=True, observed=True)
+    stats = pd.DataFrame({'맞은 개수': grouped['맞은 개수'].sum(), '응답 수': grouped['응답 수'].sum()})
+    stats['평균정답률'] = stats['맞은 개수'] / stats['응답 수'] * 100
+    return stats.reset_index()
+
+
+# 통계 분석 탭용 집계를 학생 요약 테이블에서 계산 (기준선 grading.aggregate_statistics 와 같은 결과)
+def summary_statistics(summary_df):
+    summary_df = summary_df.astype({'맞은 개수': int, '응답 수': int})
+    return {
+        'subject': _accuracy_by(summary_df, ['과목']),
+        'round': _accuracy_by(summary_df, ['회차']),
+        'subject_round': _accuracy_by(summary_df, ['회차', '과목']),
+        'student': _accuracy_by(summary_df, ['학생ID']),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='채점 결과 요약 테이블을 점검하거나 다시 만듭니다.')
+    parser.add_argument('command', choices=['check', 'rebuild'])
+    parser.add_argument('--partition', default=None, help="학교/반 분할 (예: 한빛고/3-1, 기본값: 기본 분할)")
+    args = parser.parse_args()
+    storage = get_storage(parse_partition(args.partition))
+    if args.command == 'check':
+        for table, count in check_consistency(storage).items():
+            print(f"{table}: 불일치 {count}행")
+    else:
+        for table, count in rebuild(storage).items():
+            print(f"{table}: {count}행 재구성")
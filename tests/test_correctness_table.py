@@ -0,0 +1,26 @@
+import pandas as pd
+
+from correctness_table import iter_chunks
+from response_matrix import load_matrix
+from storage import CsvStorage
+from summary import record_answer_key, record_submission
+
+EXAM_ROUND, SUBJECT = '1차', '한국사'
+
+
+def test_multi_answer_marks_match_summary(tmp_path):
+    storage = CsvStorage(str(tmp_path))
+    storage.initialize()
+    key = pd.DataFrame({'회차': EXAM_ROUND, '과목': SUBJECT, '문항번호': range(1, 21),
+                        '정답': ['2/4'] + ['1'] * 19, '배점': [2.5] * 20})
+    record_answer_key(storage, EXAM_ROUND, SUBJECT, key)
+    responses = pd.DataFrame({'학생ID': 's1', '회차': EXAM_ROUND, '과목': SUBJECT,
+                              '문항번호': [1, 2], '입력답': ['4', '1']})
+    record_submission(storage, 's1', EXAM_ROUND, SUBJECT, responses)
+
+    summary = storage.read('score_summary', where={'학생ID': 's1'})
+    chunk = pd.concat(iter_chunks(load_matrix(storage, EXAM_ROUND, SUBJECT), EXAM_ROUND, SUBJECT, {}))
+
+    assert chunk['1번'].iloc[0] == 'O'
+    assert int(chunk['맞은 개수'].iloc[0]) == int(summary['맞은 개수'].iloc[0]) == 2
+    assert float(chunk['점수'].iloc[0]) == float(summary['점수'].iloc[0]) == 5.0
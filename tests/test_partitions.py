@@ -0,0 +1,33 @@
+import pytest
+
+from partitions import account_partitions, all_partitions, invalid_accounts, rollup
+
+
+def _config(accounts):
+    return {'credentials': {'usernames': accounts}}
+
+
+# config.yaml 을 손으로 고쳐 반 형식이 잘못된 계정이 있어도 다른 계정의 분할과 학교 전체 통계는 그대로 동작
+def test_malformed_class_is_reported_and_skipped(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATA_DIR', str(tmp_path))
+    monkeypatch.setenv('STORAGE_BACKEND', 'csv')
+    config = _config({
+        'kim': {'role': 'teacher', 'classes': ['한빛고/3-1', '한빛고/3-2']},
+        'lee': {'role': 'student', 'class': '한빛고/3-1'},
+        'park': {'role': 'student', 'class': '한빛고-3-3'},
+        'choi': {'role': 'teacher', 'classes': ['한빛고/3-4', '../3-5']},
+    })
+
+    assert sorted(invalid_accounts(config)) == ['choi', 'park']
+    assert all_partitions(config) == [None, ('한빛고', '3-1'), ('한빛고', '3-2')]
+    by_class, by_school = rollup(config)
+    assert by_class.empty and by_school.empty
+    with pytest.raises(ValueError):
+        account_partitions('park', config['credentials']['usernames']['park'])
+
+
+def test_invalid_accounts_follows_reloaded_config():
+    config = _config({'park': {'role': 'student', 'class': '한빛고-3-3'}})
+    assert list(invalid_accounts(config)) == ['park']
+    # config.yaml 을 고쳐 다시 읽으면 새 config 객체이므로 다시 검사
+    assert invalid_accounts(_config({'park': {'role': 'student', 'class': '한빛고/3-3'}})) == {}
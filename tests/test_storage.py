@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+
+import data_cache
+from storage import CsvStorage
+from summary import record_answer_key, record_submission
+
+EXAM_ROUND, SUBJECT = '1차', '한국사'
+
+
+def _submit(storage, student_id, answers):
+    rows = pd.DataFrame({'학생ID': student_id, '회차': EXAM_ROUND, '과목': SUBJECT,
+                         '문항번호': range(1, len(answers) + 1), '입력답': answers})
+    record_submission(storage, student_id, EXAM_ROUND, SUBJECT, rows)
+
+
+def test_numeric_student_id_resubmission_replaces_rows(tmp_path):
+    storage = CsvStorage(str(tmp_path))
+    storage.initialize()
+    key = pd.DataFrame({'회차': EXAM_ROUND, '과목': SUBJECT, '문항번호': range(1, 21),
+                        '정답': ['1'] * 20, '배점': [2.5] * 20})
+    record_answer_key(storage, EXAM_ROUND, SUBJECT, key)
+    _submit(storage, '20101', ['1', '2'])
+    # 파일을 다시 읽은 상태에서 재제출 (학생ID 가 숫자로 읽히면 덧붙이기로 처리되어 중복됨)
+    data_cache.clear()
+    _submit(storage, '20101', ['1', '1', '1'])
+
+    data_cache.clear()
+    assert len(pd.read_csv(os.path.join(str(tmp_path), 'responses.csv'))) == 3
+    assert len(pd.read_csv(os.path.join(str(tmp_path), 'score_summary.csv'))) == 1
+    summary = storage.read('score_summary', where={'학생ID': '20101'})
+    assert summary['맞은 개수'].tolist() == [3]
@@ -0,0 +1,117 @@
+import json
+from concurrent.futures import Future
+
+import pandas as pd
+import pytest
+
+from storage import CsvStorage
+from submission_queue import SubmissionQueue, _Submission
+from summary import check_consistency, record_answer_key
+
+EXAM_ROUND, SUBJECT = '1차', '한국사'
+
+
+def _rows(student_id, answers):
+    return pd.DataFrame({'학생ID': student_id, '회차': EXAM_ROUND, '과목': SUBJECT,
+                         '문항번호': range(1, len(answers) + 1), '입력답': answers})
+
+
+# 'bad' 학생의 응답을 저장한 묶음에서는 question_summary 쓰기가 실패하는 저장소 (응답만 저장된 상태를 재현)
+class FailingStorage(CsvStorage):
+    def __init__(self, data_dir):
+        super().__init__(data_dir)
+        self.bad_batch = False
+        self.fail_question_summary = 0
+
+    def replace_many(self, table, replacements):
+        if table == 'responses':
+            self.bad_batch = any(where.get('학생ID') == 'bad' for where, _ in replacements)
+        if table == 'question_summary' and (self.bad_batch or self.fail_question_summary):
+            self.fail_question_summary = max(0, self.fail_question_summary - 1)
+            raise OSError('question_summary 쓰기 실패')
+        return super().replace_many(table, replacements)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = FailingStorage(str(tmp_path))
+    storage.initialize()
+    key = pd.DataFrame({'회차': EXAM_ROUND, '과목': SUBJECT, '문항번호': range(1, 21),
+                        '정답': ['1'] * 20, '배점': [2.5] * 20})
+    record_answer_key(storage, EXAM_ROUND, SUBJECT, key)
+    return storage
+
+
+def _batch(*submissions):
+    return [_Submission(seq, student_id, EXAM_ROUND, SUBJECT, _rows(student_id, answers), Future())
+            for seq, (student_id, answers) in enumerate(submissions, start=1)]
+
+
+def _assert_consistent(storage):
+    assert all(count == 0 for count in check_consistency(storage).values())
+
+
+def test_failed_batch_is_retried_one_by_one(storage):
+    submission_queue = SubmissionQueue(storage, fsync='off')
+    storage.fail_question_summary = 1
+    batch = _batch(('s1', ['1', '2']), ('s2', ['1', '1']))
+    submission_queue._write(batch)
+    submission_queue.close()
+
+    assert [len(b.future.result()) for b in batch] == [2, 2]
+    assert sorted(storage.read('score_summary')['학생ID']) == ['s1', 's2']
+    _assert_consistent(storage)
+
+
+def test_failed_submission_does_not_fail_batch_and_summaries_are_repaired(storage):
+    submission_queue = SubmissionQueue(storage, fsync='off')
+    batch = _batch(('s1', ['1', '2']), ('bad', ['1', '1']))
+    submission_queue._write(batch)
+
+    assert len(batch[0].future.result()) == 2
+    with pytest.raises(OSError):
+        batch[1].future.result()
+    # 'bad' 의 응답은 저장되었으므로 요약도 저장된 응답에 맞춰 다시 계산되어야 함
+    _assert_consistent(storage)
+    assert submission_queue.submit('s3', EXAM_ROUND, SUBJECT, _rows('s3', ['1'])).result(timeout=10) is not None
+    submission_queue.close()
+    _assert_consistent(storage)
+
+
+def test_recovery_skips_submissions_that_cannot_be_saved(storage, tmp_path):
+    journal_path = tmp_path / 'submissions.journal'
+    with open(journal_path, 'w', encoding='utf-8') as f:
+        for seq, student_id in enumerate(['s1', 'bad'], start=1):
+            entry = {'seq': seq, '학생ID': student_id, '회차': EXAM_ROUND, '과목': SUBJECT,
+                     'rows': _rows(student_id, ['1', '2']).to_numpy().tolist()}
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    submission_queue = SubmissionQueue(storage, fsync='off')
+    assert [failure[:3] for failure in submission_queue.recovery_failures] == [('bad', EXAM_ROUND, SUBJECT)]
+    assert 's1' in set(storage.read('score_summary')['학생ID'])
+    _assert_consistent(storage)
+    assert submission_queue.submit('s2', EXAM_ROUND, SUBJECT, _rows('s2', ['1'])).result(timeout=10) is not None
+    submission_queue.close()
+
+
+def test_unrepaired_partition_is_recorded_and_repaired_on_restart(storage, tmp_path, monkeypatch):
+    import submission_queue as module
+
+    def fail(storage, exam_round, subject):
+        raise OSError('요약 재계산 실패')
+
+    real_refresh = module.refresh_partition
+    monkeypatch.setattr(module, 'refresh_partition', fail)
+    submission_queue = SubmissionQueue(storage, fsync='off')
+    batch = _batch(('bad', ['1', '1']))
+    submission_queue._write(batch)
+    submission_queue.close()
+    with pytest.raises(OSError):
+        batch[0].future.result()
+    assert not all(count == 0 for count in check_consistency(storage).values())
+    with open(tmp_path / 'submissions.journal', encoding='utf-8') as f:
+        assert {'repair': [EXAM_ROUND, SUBJECT]} in [json.loads(line) for line in f]
+
+    monkeypatch.setattr(module, 'refresh_partition', real_refresh)
+    SubmissionQueue(storage, fsync='off').close()
+    _assert_consistent(storage)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+import grading
+from storage import CsvStorage
+from summary import question_accuracy, record_answer_key, record_submission, student_results, summary_statistics
+
+KEYS = {('1차', '국어'): ['3', '2/4', '1', '5'], ('2차', '국어'): ['1', '1', '2', '2']}
+SUBMISSIONS = {
+    ('s1', '1차', '국어'): ['3', '4', '2', ''],
+    ('s2', '1차', '국어'): ['3', '2', '1', '5'],
+    ('s3', '1차', '국어'): ['1', '1', '1'],
+    ('s1', '2차', '국어'): ['1', '2', '2', '2'],
+}
+
+
+def _sorted(df, columns):
+    return df.sort_values(columns).reset_index(drop=True)
+
+
+# 기준선(grading)의 조인 기반 집계가 요약 테이블 집계와 같은 결과를 내는지 확인
+def test_baseline_aggregates_match_summary_tables(tmp_path):
+    storage = CsvStorage(str(tmp_path))
+    storage.initialize()
+    for (exam_round, subject), answers in KEYS.items():
+        key = pd.DataFrame({'회차': exam_round, '과목': subject, '문항번호': range(1, len(answers) + 1),
+                            '정답': answers, '배점': [2.5] * len(answers)})
+        record_answer_key(storage, exam_round, subject, key)
+    for (student_id, exam_round, subject), answers in SUBMISSIONS.items():
+        rows = pd.DataFrame({'학생ID': student_id, '회차': exam_round, '과목': subject,
+                             '문항번호': range(1, len(answers) + 1), '입력답': answers})
+        record_submission(storage, student_id, exam_round, subject, rows)
+
+    responses, answers = storage.read('responses'), storage.read('answers')
+    summary_rows = storage.read('score_summary')
+
+    expected = summary_statistics(summary_rows)
+    for name, baseline in grading.aggregate_statistics(responses, answers).items():
+        columns = [c for c in baseline.columns if c in ('회차', '과목', '학생ID')]
+        actual = _sorted(expected[name], columns)
+        baseline = _sorted(baseline, columns)
+        assert actual[columns].astype(str).equals(baseline[columns].astype(str))
+        np.testing.assert_allclose(actual[['맞은 개수', '응답 수', '평균정답률']].to_numpy(float),
+                                   baseline[['맞은 개수', '응답 수', '평균정답률']].to_numpy(float))
+
+    where = {'회차': '1차', '과목': '국어'}
+    graded = grading.grade_responses(storage.read('responses', where), storage.read('answers', where))
+    baseline = _sorted(grading.summarize_students(graded), ['학생ID'])
+    actual = _sorted(student_results(storage.read('score_summary', where)), ['학생ID'])
+    assert actual['학생ID'].tolist() == baseline['학생ID'].astype(str).tolist()
+    np.testing.assert_allclose(actual[['맞은 개수', '틀린 개수', '정답률', '점수']].to_numpy(float),
+                               baseline[['맞은 개수', '틀린 개수', '정답률', '점수']].to_numpy(float))
+
+    answer_rows = storage.read('answers', where)
+    baseline = grading.question_accuracy(graded, answer_rows)
+    actual = question_accuracy(storage.read('question_summary', where), answer_rows)
+    assert actual['문항번호'].tolist() == baseline['문항번호'].tolist()
+    np.testing.assert_allclose(actual['정답률'].to_numpy(float), baseline['정답률'].to_numpy(float))